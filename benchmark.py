@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+X WIRELESS - Benchmarks
+=======================
+
+Micro-benchmarks on synthetic data, runnable without a wireless card.
+
+Usage:
+    python benchmark.py            # run all benchmarks
+    python benchmark.py parser     # run selected benchmarks
+"""
+
+import json
+import random
+import re
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the xwirless package to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from xwirless.parser import ScanResult, WiFiParser, WiFiNetwork
+from xwirless.scanner import WiFiScanner
+from xwirless.backends import SCAN_BACKENDS, get_backend
+from xwirless.compression import available_codecs
+from xwirless.db import InventoryDB, load_json_inventory, open_inventory
+from xwirless.report import ReportGenerator
+
+ENCRYPTION_BLOCKS = [
+    "                    Encryption key:off\n",
+    "                    Encryption key:on\n"
+    "                    IE: IEEE 802.11i/WPA2 Version 1\n"
+    "                        Group Cipher : CCMP\n"
+    "                        Pairwise Ciphers (1) : CCMP\n"
+    "                        Authentication Suites (1) : PSK\n",
+    "                    Encryption key:on\n"
+    "                    IE: WPA Version 1\n"
+    "                        Group Cipher : TKIP\n"
+    "                        Pairwise Ciphers (1) : TKIP\n"
+    "                        Authentication Suites (1) : 802.1x EAP\n",
+    "                    Encryption key:on\n",
+]
+
+
+def make_capture(cells: int, seed: int = 0) -> str:
+    """Build a synthetic ``iwlist scanning`` capture."""
+    rng = random.Random(seed)
+    lines = ["wlan0     Scan completed :\n"]
+    for i in range(cells):
+        bssid = ":".join(f"{rng.randrange(256):02X}" for _ in range(6))
+        channel = rng.choice([1, 6, 11, 36, 44, 149])
+        frequency = 2.412 + (channel - 1) * 0.005 if channel < 14 else 5.0 + channel * 0.005
+        signal = rng.randrange(-95, -25)
+        ssid = f"Network_{i}" if rng.random() > 0.1 else ""
+        lines.append(
+            f"          Cell {i + 1:02d} - Address: {bssid}\n"
+            f"                    Channel:{channel}\n"
+            f"                    Frequency:{frequency:.3f} GHz (Channel {channel})\n"
+            f"                    Quality={signal + 110}/70  Signal level={signal} dBm  \n"
+            f"{rng.choice(ENCRYPTION_BLOCKS)}"
+            f"                    ESSID:\"{ssid}\"\n"
+            f"                    Bit Rates:1 Mb/s; 2 Mb/s; 5.5 Mb/s; 11 Mb/s; 6 Mb/s\n"
+            f"                              9 Mb/s; 12 Mb/s; 18 Mb/s\n"
+            f"                    Mode:Master\n"
+            f"                    Extra:tsf=000000{i:010x}\n"
+            f"                    Extra: Last beacon: {rng.randrange(10, 5000)}ms ago\n"
+            f"                    IE: Unknown: DD180050F2020101000003A4000027A4000042435E0062322F00\n"
+        )
+    return "".join(lines)
+
+
+def legacy_parse(output: str) -> list:
+    """The original multi-regex cell parser, kept as the baseline."""
+    pattern = r'Cell \d+ - Address:'
+    cells = re.split(pattern, output)
+    cell_addresses = re.findall(pattern, output)
+    # Drop the preamble so every cell keeps its own header
+    cells = cells[1:]
+    networks = []
+    for address, content in zip(cell_addresses, cells):
+        cell = address + content
+        bssid_match = re.search(r'Address: ([0-9A-Fa-f:]{17})', cell)
+        if not bssid_match:
+            continue
+        ssid_match = re.search(r'ESSID:"([^"]*)"', cell)
+        channel_match = re.search(r'Channel (\d+)', cell)
+        freq_match = re.search(r'(\d+\.\d+) GHz', cell)
+        signal_match = re.search(r'Signal level=(-?\d+) dBm', cell)
+        quality_match = re.search(r'Quality=(\d+/\d+)', cell)
+        encryption, cipher, authentication = "Open", None, None
+        if "Encryption key:on" in cell:
+            if "WPA2" in cell or "rsn_ie" in cell:
+                encryption = "WPA2"
+            elif "WPA" in cell:
+                encryption = "WPA"
+            elif "WEP" in cell:
+                encryption = "WEP"
+            if "CCMP" in cell:
+                cipher = "CCMP"
+            elif "TKIP" in cell:
+                cipher = "TKIP"
+            if "PSK" in cell:
+                authentication = "PSK"
+            elif "EAP" in cell:
+                authentication = "EAP"
+        protocol_match = re.search(r'Protocol:(IEEE 802\.11[a-z]*)', cell)
+        networks.append(WiFiNetwork(
+            bssid=bssid_match.group(1),
+            ssid=ssid_match.group(1) if ssid_match else "Hidden",
+            channel=int(channel_match.group(1)) if channel_match else 0,
+            frequency=float(freq_match.group(1)) if freq_match else 0.0,
+            signal_level=int(signal_match.group(1)) if signal_match else -100,
+            quality=quality_match.group(1) if quality_match else "0/70",
+            encryption=encryption,
+            cipher=cipher,
+            authentication=authentication,
+            protocol=protocol_match.group(1) if protocol_match else "IEEE 802.11"
+        ))
+    return networks
+
+
+def _timed(func, *args, repeat: int = 3):
+    """Return (best seconds, result) over ``repeat`` runs."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_parser(cells: int = 10000) -> None:
+    """Compare the precompiled-pattern parser against the legacy regex parser."""
+    capture = make_capture(cells)
+    parser = WiFiParser()
+    print(f"Parser: {cells} cells, {len(capture) / 1e6:.1f} MB")
+    
+    legacy_time, legacy_networks = _timed(legacy_parse, capture)
+    new_time, scan_result = _timed(parser.parse_scan_output, capture, "wlan0")
+    assert [n.model_dump() for n in legacy_networks] == [n.model_dump() for n in scan_result.networks]
+    
+    print(f"  legacy multi-regex : {legacy_time:.3f}s  ({cells / legacy_time:,.0f} cells/s)")
+    print(f"  precompiled        : {new_time:.3f}s  ({cells / new_time:,.0f} cells/s)")
+
+
+def bench_serialize(cells: int = 10000) -> None:
+    """Parse + serialize: validated models and ``.dict()`` vs trusted models and ``to_dict()``."""
+    capture = make_capture(cells)
+    parser = WiFiParser()
+    print(f"Parse + serialize: {cells} networks")
+    
+    def before():
+        return [network.dict() for network in legacy_parse(capture)]
+    
+    def after():
+        return [network.to_dict() for network in parser.parse_scan_output(capture, "wlan0").networks]
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        before_time, before_records = _timed(before)
+    after_time, after_records = _timed(after)
+    assert before_records == after_records
+    
+    print(f"  validated + dict() : {before_time:.3f}s  ({cells / before_time:,.0f} networks/s)")
+    print(f"  trusted + to_dict(): {after_time:.3f}s  ({cells / after_time:,.0f} networks/s)")
+
+
+def bench_interface(repeat: int = 1000) -> None:
+    """Interface detection from sysfs: first call and cached calls."""
+    with tempfile.TemporaryDirectory() as root:
+        for name in ("eth0", "lo", "wlan0"):
+            (Path(root) / name).mkdir()
+            (Path(root) / name / "operstate").write_text("up\n")
+        (Path(root) / "wlan0" / "wireless").mkdir()
+        print(f"Interface detection ({repeat} calls)")
+        
+        scanner = WiFiScanner(sysfs_root=Path(root))
+        start = time.perf_counter()
+        assert scanner.detect_interface() == "wlan0"
+        first = time.perf_counter() - start
+        cached, _ = _timed(lambda: [scanner.detect_interface() for _ in range(repeat)])
+        
+        print(f"  first call (sysfs) : {first * 1e6:.0f}us")
+        print(f"  cached call        : {cached / repeat * 1e6:.1f}us")
+
+
+def bench_backends(repeat: int = 50) -> None:
+    """End-to-end scan latency per backend, replaying the recorded fixtures.
+    
+    Text backends run ``cat <fixture>`` through the same subprocess path as a
+    real scan, so process start-up is included; nl80211 decodes its dump
+    in-process. Real scans are also timed when the tool and a wireless
+    interface are present.
+    """
+    fixtures = Path(__file__).parent / "fixtures"
+    files = {
+        "nl80211": "nl80211_scan_dump.bin",
+        "iw": "iw_scan_dump.txt",
+        "wpa_cli": "wpa_cli_scan_results.txt",
+        "nmcli": "nmcli_wifi_list.txt",
+        "iwlist": "iwlist_scan.txt",
+    }
+    interface = WiFiScanner().detect_interface()
+    print(f"Scan backends ({repeat} scans, replayed fixtures)")
+    
+    for name in sorted(SCAN_BACKENDS, key=lambda name: SCAN_BACKENDS[name].cost):
+        backend = get_backend(name)
+        path = str(fixtures / files[name])
+        if name == "nl80211":
+            replay = lambda: backend.parse_file(path, "wlan0")
+        else:
+            replay = lambda: backend.parse(backend.run(["cat", path]), "wlan0")
+        elapsed, _ = _timed(lambda: [replay() for _ in range(repeat)])
+        line = f"  {name:<8} (cost {backend.cost:>3}): {elapsed / repeat * 1e3:.2f}ms"
+        
+        if interface and backend.available():
+            try:
+                live, _ = _timed(backend.scan, interface, repeat=1)
+                line += f"  live: {live * 1e3:.1f}ms"
+            except RuntimeError as e:
+                line += f"  live: failed ({e})"
+        print(line)
+
+
+def bench_batch(scans: int = 150, cells: int = 40) -> None:
+    """Saving scans one call at a time vs inside ``db.batch()``, per backend."""
+    scan_results = [WiFiParser().parse_scan_output(make_capture(cells, seed), "wlan0") for seed in range(scans)]
+    print(f"Batched saves: {scans} scans of {cells} networks")
+    
+    for suffix in (".json", ".xwl", ".db"):
+        with tempfile.TemporaryDirectory() as root:
+            single = open_inventory(str(Path(root) / f"single{suffix}"))
+            start = time.perf_counter()
+            for scan_result in scan_results:
+                single.save_scan(scan_result)
+            single_time = time.perf_counter() - start
+            
+            batched = open_inventory(str(Path(root) / f"batched{suffix}"))
+            start = time.perf_counter()
+            with batched.batch():
+                for scan_result in scan_results:
+                    batched.save_scan(scan_result)
+            batch_time = time.perf_counter() - start
+            single.close()
+            batched.close()
+        print(f"  {suffix:<5} save_scan each: {single_time:.3f}s   batch(): {batch_time:.3f}s"
+              f"  ({single_time / batch_time:.0f}x)")
+
+
+def _directory_size(path: Path) -> int:
+    """Size of a file, or of every file under a directory."""
+    if path.is_file():
+        return path.stat().st_size
+    return sum(child.stat().st_size for child in path.rglob("*") if child.is_file())
+
+
+def bench_storage(days: int = 60, scans_per_day: int = 24, networks: int = 30) -> None:
+    """Size, load and save times of the inventory formats on a multi-month survey.
+    
+    One site is scanned every hour: the same access points with jittering
+    signal levels, about one in ten missing from any given scan.
+    """
+    rng = random.Random(1)
+    base = WiFiParser().parse_scan_output(make_capture(networks), "wlan0")
+    start = datetime(2024, 1, 1)
+    scan_results = []
+    for i in range(days * scans_per_day):
+        scan_result = base.model_copy(deep=True)
+        scan_result.timestamp = start + timedelta(hours=24 / scans_per_day * i)
+        scan_result.networks = [network for network in scan_result.networks if rng.random() > 0.1]
+        for network in scan_result.networks:
+            network.signal_level = max(-100, min(0, network.signal_level + rng.randint(-3, 3)))
+        scan_result.total_networks = len(scan_result.networks)
+        scan_results.append(scan_result)
+    print(f"Inventory storage: {days} days x {scans_per_day} scans/day, ~{networks} networks per scan")
+    
+    formats = [(suffix, codec) for suffix in (".json", ".xwl") for codec in ["none"] + available_codecs()]
+    with tempfile.TemporaryDirectory() as root:
+        source_path = Path(root) / "source.json"
+        source = InventoryDB(str(source_path), compression="none")
+        with source.batch():
+            source.save_scans(scan_results)
+        plain_size = source_path.stat().st_size
+        
+        for suffix, codec in formats:
+            path = Path(root) / f"inventory_{codec}{suffix}"
+            db = open_inventory(str(path), compression=codec)
+            document = load_json_inventory(str(source_path))
+            save_start = time.perf_counter()
+            db.import_data(document)
+            save_time = time.perf_counter() - save_start
+            size = _directory_size(path)
+            load_time, db = _timed(open_inventory, str(path))
+            append_time, _ = _timed(db.save_scan, scan_results[-1], repeat=1)
+            print(f"  {suffix:<5} {codec:<5}: {size / 1e6:7.2f} MB ({plain_size / size:5.1f}x)  "
+                  f"write {save_time:.2f}s  load {load_time:.2f}s  append one scan {append_time * 1e3:.0f}ms")
+
+
+def _scan_from_report(report: str) -> ScanResult:
+    """Receiver side of the JSON path: parse a ``generate_json_report`` document into a validated scan."""
+    data = json.loads(report)
+    info = data["scan_info"]
+    return ScanResult(
+        timestamp=info["timestamp"],
+        interface=info["interface"],
+        scan_duration=info["scan_duration"],
+        interface_timings=info.get("interface_timings", {}),
+        cache_age=info.get("cache_age"),
+        networks=data["networks"]
+    )
+
+
+def bench_exchange(sizes: tuple = (40, 500, 5000), repeat: int = 20) -> None:
+    """Shipping a scan between hosts: the JSON report vs ``ScanResult.to_bytes()``."""
+    print("Scan exchange: decoding a received scan into a ScanResult")
+    reporter = ReportGenerator(author_badge=False)
+    for cells in sizes:
+        scan_result = WiFiParser().parse_scan_output(make_capture(cells), "wlan0")
+        report = reporter.generate_json_report(scan_result)
+        payload = scan_result.to_bytes()
+        assert _scan_from_report(report) == scan_result == ScanResult.from_bytes(payload)
+        
+        json_time, _ = _timed(lambda: [_scan_from_report(report) for _ in range(repeat)])
+        binary_time, _ = _timed(lambda: [ScanResult.from_bytes(payload) for _ in range(repeat)])
+        print(f"  {cells:>5} networks: JSON {len(report) / 1e3:8.1f} kB {json_time / repeat * 1e3:7.2f}ms   "
+              f"binary {len(payload) / 1e3:7.1f} kB {binary_time / repeat * 1e3:7.2f}ms   "
+              f"({len(report) / len(payload):.1f}x smaller, {json_time / binary_time:.1f}x faster)")
+    
+    # The ceiling: decoding cannot beat building the WiFiNetwork objects themselves
+    rows = [tuple(network.to_dict().values()) for network in scan_result.networks]
+    build_time, _ = _timed(lambda: [WiFiNetwork.trusted_many(rows) for _ in range(repeat)])
+    per_network = binary_time / repeat / len(rows) * 1e6
+    floor = build_time / repeat / len(rows) * 1e6
+    print(f"  binary decode {per_network:.2f}us/network, {floor:.2f}us of it building the "
+          f"WiFiNetwork models (the floor short of decoding lazily)")
+
+
+BENCHMARKS = {
+    "parser": bench_parser,
+    "serialize": bench_serialize,
+    "interface": bench_interface,
+    "backends": bench_backends,
+    "batch": bench_batch,
+    "storage": bench_storage,
+    "exchange": bench_exchange,
+}
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        BENCHMARKS[name]()
+        print()
@@ -57,6 +57,9 @@ setup(
             "flake8>=5.0.0",
             "mypy>=1.0.0",
         ],
+        "zstd": [
+            "zstandard>=0.21",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -54,6 +54,93 @@ def test_cli_basic():
         print(f"ERRORE: {e}")
         return False
 
+def test_scan_save_db_skips_cached_scan(tmp_path, monkeypatch):
+    """Una seconda scansione --save-db servita dalla cache non salva un duplicato."""
+    from click.testing import CliRunner
+    from xwirless import cli
+    from xwirless.backends import CommandBackend
+    from xwirless.cache import ScanCache
+    from xwirless.db import open_inventory
+    
+    iw_dump = (Path(__file__).parent / "fixtures" / "iw_scan_dump.txt").read_text(encoding="utf-8")
+    monkeypatch.setattr(CommandBackend, "run", lambda self, command: iw_dump)
+    monkeypatch.setattr(cli, "ScanCache", lambda ttl: ScanCache(tmp_path / "cache", ttl=ttl))
+    db_path = str(tmp_path / "inventory.json")
+    args = ["--db", db_path, "scan", "-i", "wlan0", "--backend", "iw", "--save-db", "--format", "json"]
+    
+    runner = CliRunner()
+    first = runner.invoke(cli.cli_main, args)
+    second = runner.invoke(cli.cli_main, args)
+    
+    assert "Scan saved to database" in first.output
+    assert "Cached scan" in second.output and "Scan saved to database" not in second.output
+    stats = open_inventory(db_path, read_only=True).get_statistics()
+    assert stats["total_scans"] == 1
+
+def test_scan_all_save_db_skips_cached_merge(tmp_path, monkeypatch):
+    """Con -i all, una scansione unita servita interamente dalla cache non viene salvata di nuovo."""
+    from click.testing import CliRunner
+    from xwirless import cli, scanner
+    from xwirless.backends import CommandBackend
+    from xwirless.cache import ScanCache
+    from xwirless.db import open_inventory
+    
+    iw_dump = (Path(__file__).parent / "fixtures" / "iw_scan_dump.txt").read_text(encoding="utf-8")
+    monkeypatch.setattr(CommandBackend, "run", lambda self, command: iw_dump)
+    monkeypatch.setattr(scanner, "list_wireless_interfaces", lambda sysfs_root: ["wlan0", "wlan1"])
+    monkeypatch.setattr(cli, "ScanCache", lambda ttl: ScanCache(tmp_path / "cache", ttl=ttl))
+    db_path = str(tmp_path / "inventory.json")
+    args = ["--db", db_path, "scan", "-i", "all", "--backend", "iw", "--save-db", "--format", "json"]
+    
+    runner = CliRunner()
+    first = runner.invoke(cli.cli_main, args)
+    second = runner.invoke(cli.cli_main, args)
+    
+    assert "Scan saved to database" in first.output
+    assert "Cached scan" in second.output and "Scan saved to database" not in second.output
+    assert open_inventory(db_path, read_only=True).get_statistics()["total_scans"] == 1
+
+def test_all_interfaces_without_radio_reports_no_interface(tmp_path, monkeypatch):
+    """Con -i all e nessuna scheda wireless, scan e monitor escono con l'errore consueto."""
+    from click.testing import CliRunner
+    from xwirless import cli, scanner
+    
+    monkeypatch.setattr(scanner, "list_wireless_interfaces", lambda sysfs_root: [])
+    runner = CliRunner()
+    for args in (["scan", "-i", "all"], ["monitor", "-i", "all", "--count", "1"], ["monitor", "-i", ","]):
+        result = runner.invoke(cli.cli_main, ["--db", str(tmp_path / "inventory.json")] + args)
+        assert result.exit_code == 0
+        assert "No wireless interface detected" in result.output
+        assert "failed" not in result.output
+    assert not (tmp_path / "inventory.json").exists()
+
+def test_diff_scan_ids_honour_threshold_and_reject_range(tmp_path):
+    """Il diff di due scansioni usa --signal-threshold e rifiuta --since/--until."""
+    from click.testing import CliRunner
+    from xwirless import cli
+    from xwirless.db import open_inventory
+    from xwirless.parser import WiFiParser
+    from xwirless.scanner import WiFiScanner
+    
+    output = WiFiScanner(dry_run=True)._get_mock_scan_output()
+    first, second = (WiFiParser().parse_scan_output(output, "wlan0") for _ in range(2))
+    second.networks[0].signal_level -= 20
+    db_path = str(tmp_path / "inventory.json")
+    scan_ids = open_inventory(db_path).save_scans([first, second])
+    
+    runner = CliRunner()
+    result = runner.invoke(cli.cli_main, ["--db", db_path, "diff", *scan_ids, "--signal-threshold", "5"])
+    assert "Changed networks: 1" in result.output
+    result = runner.invoke(cli.cli_main, ["--db", db_path, "diff", *scan_ids, "--signal-threshold", "30"])
+    assert "Changed networks: 0" in result.output
+    second.networks[0].signal_level += 17
+    scan_ids[1] = open_inventory(db_path).save_scan(second)
+    result = runner.invoke(cli.cli_main, ["--db", db_path, "diff", *scan_ids])
+    assert "Changed networks: 1" in result.output
+    
+    result = runner.invoke(cli.cli_main, ["--db", db_path, "diff", *scan_ids, "--since", "1d"])
+    assert result.exit_code == 2 and "--since/--until" in result.output
+
 if __name__ == "__main__":
     print("X WIRELESS - Test CLI")
     print("Creato da: Adil Fayyaz")
@@ -0,0 +1,648 @@
+#!/usr/bin/env python3
+"""
+Test del database inventario X WIRELESS
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+# Aggiungi il percorso del modulo xwirless
+sys.path.insert(0, str(Path(__file__).parent))
+
+from xwirless.scanner import WiFiScanner
+from xwirless.parser import WiFiParser
+from xwirless.history import (
+    RetentionPolicy, SignalSeries, build_signal_history, dump_network, json_default, signal_series
+)
+from xwirless.db import InventoryDB, LazyInventoryDB, SegmentedInventoryDB, SQLiteInventoryDB, open_inventory
+from xwirless.diff import iter_state_changes
+from xwirless.ingest import ingest_directory
+from xwirless.storage import SegmentLog
+from benchmark import make_capture
+
+
+def _mock_scan():
+    """Scan di esempio dalla modalita dry-run."""
+    output = WiFiScanner(dry_run=True)._get_mock_scan_output()
+    return WiFiParser().parse_scan_output(output, "wlan0")
+
+
+def _stress_writer(db_path, writer, scans, db_class=InventoryDB, **options):
+    """Processo scrittore: salva le scansioni una alla volta."""
+    db = db_class(db_path, **options)
+    for i in range(scans):
+        scan_result = _mock_scan()
+        scan_result.source = f"writer{writer}-{i}"
+        db.save_scan(scan_result)
+
+
+def _stress_reader(db_path, reads):
+    """Processo lettore: il file deve essere sempre un JSON completo."""
+    for _ in range(reads):
+        if Path(db_path).exists():
+            data = json.loads(Path(db_path).read_text(encoding="utf-8"))
+            assert data["statistics"]["total_scans"] == len(data["scans"])
+    return reads
+
+
+def test_segmented_matches_json(tmp_path):
+    """Il log segmentato ricostruisce lo stesso inventario del JSON."""
+    scan_result = _mock_scan()
+    json_db = InventoryDB(str(tmp_path / "inventory.json"))
+    log_db = SegmentedInventoryDB(str(tmp_path / "inventory.xwl"), segment_size=3, compact_every=2)
+    for _ in range(10):
+        json_db.save_scan(scan_result)
+        log_db.save_scan(scan_result)
+
+    reopened = SegmentedInventoryDB(str(tmp_path / "inventory.xwl"), segment_size=3, compact_every=2)
+    assert reopened.get_statistics()["total_scans"] == 10
+    assert reopened.data["networks"] == json_db.data["networks"]
+    assert len(reopened.get_all_scans()) == 10
+
+
+def test_segment_log_appends_without_listing(tmp_path, monkeypatch):
+    """Gli append del log non rileggono la directory: il segmento attivo è tenuto in memoria."""
+    log_db = SegmentedInventoryDB(str(tmp_path / "inventory.xwl"), segment_size=3, compact_every=2)
+    monkeypatch.setattr(log_db.log, "segment_numbers", lambda: pytest.fail("segment directory listed"))
+    for _ in range(5):
+        log_db.save_scan(_mock_scan())
+    log_db.save_scans([_mock_scan() for _ in range(4)])
+    monkeypatch.undo()
+
+    assert log_db.log.active_number() == SegmentLog(tmp_path / "inventory.xwl", read_only=True).active_number() == 4
+    reopened = SegmentedInventoryDB(str(tmp_path / "inventory.xwl"), segment_size=3, compact_every=2)
+    assert reopened.get_statistics()["total_scans"] == 9
+
+
+def test_import_json_into_log(tmp_path):
+    """Un inventario JSON esistente si importa nel log segmentato."""
+    json_db = InventoryDB(str(tmp_path / "inventory.json"))
+    json_db.save_scan(_mock_scan())
+
+    log_db = open_inventory(str(tmp_path / "inventory.xwl"))
+    log_db.import_data(json_db.data)
+    log_db.save_scan(_mock_scan())
+
+    reopened = open_inventory(str(tmp_path / "inventory.xwl"))
+    assert reopened.get_statistics()["total_scans"] == 2
+    assert reopened.get_network_history("00:11:22:33:44:55")["total_scans"] == 2
+
+
+def test_sqlite_matches_json(tmp_path):
+    """Il backend SQLite risponde come il JSON, anche dopo la migrazione."""
+    json_db = InventoryDB(str(tmp_path / "inventory.json"))
+    sqlite_db = open_inventory(str(tmp_path / "inventory.db"))
+    for _ in range(3):
+        scan_result = _mock_scan()
+        scan_id = json_db.save_scan(scan_result)
+        sqlite_id = sqlite_db.save_scan(scan_result)
+
+    bssid = "00:11:22:33:44:55"
+    assert sqlite_db.get_statistics() == json_db.get_statistics()
+    assert sqlite_db.get_network_history(bssid) == json_db.get_network_history(bssid)
+    assert {**sqlite_db.get_scan(sqlite_id), "id": scan_id} == json_db.get_scan(scan_id)
+
+    migrated = open_inventory(str(tmp_path / "migrated.sqlite"))
+    migrated.import_data(json_db.data)
+    assert migrated.get_statistics() == json_db.get_statistics()
+    assert migrated.get_network_history(bssid) == json_db.get_network_history(bssid)
+    assert migrated.get_recent_scans(2) == json_db.get_recent_scans(2)
+
+
+def test_sqlite_rollups_match_json(tmp_path):
+    """SQLite applica la retention in scrittura e ottiene gli stessi aggregati del JSON."""
+    policy = RetentionPolicy(raw_hours=1, hourly_days=1, daily_days=2)
+    json_db = InventoryDB(str(tmp_path / "inventory.json"), retention=policy)
+    sqlite_db = SQLiteInventoryDB(str(tmp_path / "inventory.db"), retention=policy)
+    start = datetime(2024, 5, 1)
+    times = [start + timedelta(minutes=20 * i) for i in range(4 * 72)]
+    times[100:110] = reversed(times[100:110])
+    times.insert(200, start + timedelta(hours=5))
+    with json_db.batch(), sqlite_db.batch():
+        for number, timestamp in enumerate(times):
+            scan_result = _mock_scan()
+            scan_result.timestamp = timestamp
+            scan_result.networks[0].signal_level = -40 - number % 30
+            json_db.save_scan(scan_result)
+            sqlite_db.save_scan(scan_result)
+
+    bssid = "00:11:22:33:44:55"
+    expected = json_db.get_network_history(bssid)
+    assert len(expected["signal_history"]) == 4
+    assert expected["signal_rollups"]["hour"] and expected["signal_rollups"]["day"]
+    reopened = SQLiteInventoryDB(str(tmp_path / "inventory.db"), retention=policy, read_only=True)
+    assert sqlite_db.get_network_history(bssid) == reopened.get_network_history(bssid) == expected
+
+    migrated = SQLiteInventoryDB(str(tmp_path / "migrated.db"), retention=policy)
+    migrated.import_data(json_db.data)
+    assert migrated.get_network_history(bssid) == expected
+
+
+# Schema of the first SQLite inventories, before network states, rollups and events
+OLD_SQLITE_SCHEMA = """
+    CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+    CREATE TABLE scans (rowid INTEGER PRIMARY KEY, id TEXT NOT NULL, timestamp TEXT NOT NULL,
+                        interface TEXT, total_networks INTEGER NOT NULL, scan_duration REAL);
+    CREATE TABLE observations (scan_rowid INTEGER NOT NULL REFERENCES scans(rowid), timestamp TEXT NOT NULL,
+                               bssid TEXT NOT NULL, ssid TEXT, channel INTEGER, frequency REAL,
+                               signal_level INTEGER, quality TEXT, encryption TEXT, cipher TEXT,
+                               authentication TEXT, mode TEXT, protocol TEXT);
+    CREATE TABLE networks (bssid TEXT PRIMARY KEY, first_seen TEXT NOT NULL, last_seen TEXT NOT NULL,
+                           total_scans INTEGER NOT NULL, ssid_history TEXT NOT NULL,
+                           encryption_history TEXT NOT NULL);
+"""
+
+
+def test_sqlite_old_schema_opens_read_only(tmp_path):
+    """Un database SQLite con lo schema iniziale si apre in sola lettura, migrato con i suoi aggregati."""
+    current = SQLiteInventoryDB(str(tmp_path / "current.db"))
+    for number in range(6):
+        scan_result = _mock_scan()
+        scan_result.timestamp = datetime(2024, 5, 1) + timedelta(hours=12 * number)
+        current.save_scan(scan_result)
+    current.close()
+
+    old_path = tmp_path / "old.db"
+    conn = sqlite3.connect(str(old_path))
+    conn.executescript(OLD_SQLITE_SCHEMA)
+    conn.execute("ATTACH DATABASE ? AS current", (str(tmp_path / "current.db"),))
+    for table, columns in (
+        ("meta", "key, value"),
+        ("scans", "rowid, id, timestamp, interface, total_networks, scan_duration"),
+        ("observations", "scan_rowid, timestamp, bssid, ssid, channel, frequency, signal_level, quality, "
+                         "encryption, cipher, authentication, mode, protocol"),
+        ("networks", "bssid, first_seen, last_seen, total_scans, ssid_history, encryption_history"),
+    ):
+        conn.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM current.{table}")
+    conn.commit()
+    conn.close()
+
+    view = open_inventory(str(old_path), read_only=True)
+    expected = SQLiteInventoryDB(str(tmp_path / "current.db"), read_only=True)
+    assert view.count_networks_by("encryption") == expected.count_networks_by("encryption")
+    assert view.find_networks(channel=6) == ["00:11:22:33:44:55"]
+    assert len(view.get_change_events()) == len(expected.get_change_events())
+
+    bssid = "00:11:22:33:44:55"
+    history = view.get_network_history(bssid)
+    assert history["signal_rollups"]["hour"] and len(history["signal_history"]) == 3
+    assert history == expected.get_network_history(bssid)
+
+
+def test_lazy_view_matches_full_load(tmp_path):
+    """La vista in sola lettura risponde come il caricamento completo."""
+    db_path = str(tmp_path / "inventory.xwl")
+    log_db = SegmentedInventoryDB(db_path, segment_size=3, compact_every=2)
+    scan_ids = [log_db.save_scan(_mock_scan()) for _ in range(11)]
+
+    view = open_inventory(db_path, read_only=True)
+    assert isinstance(view, LazyInventoryDB)
+    bssid = "aa:bb:cc:dd:ee:ff".upper()
+    assert view.get_statistics() == log_db.get_statistics()
+    assert view.get_network_history(bssid) == log_db.get_network_history(bssid)
+    assert view.get_recent_scans(4) == log_db.get_recent_scans(4)
+    assert view.get_scan(scan_ids[0]) == log_db.get_scan(scan_ids[0])
+    view.close()
+
+
+def test_signal_history_rollups():
+    """I punti oltre la finestra raw vengono aggregati per ora e per giorno."""
+    policy = RetentionPolicy(raw_hours=1, hourly_days=1)
+    start = datetime(2026, 1, 1)
+    points = [
+        {"timestamp": (start + timedelta(minutes=30 * i)).isoformat(), "signal_level": -40 - i % 5, "quality": "50/70"}
+        for i in range(200)
+    ]
+    network_data = build_signal_history(points, policy)
+
+    assert len(network_data["signal_history"]) == 3
+    hourly = network_data["signal_rollups"]["hour"]
+    assert len(hourly) == 24 and all(bucket["count"] == 2 for bucket in hourly[:-1])
+    assert network_data["signal_rollups"]["day"][0]["count"] == 48
+    series = signal_series(network_data)
+    assert sum(point["count"] for point in series) == 200
+    assert [point["timestamp"] for point in series] == sorted(point["timestamp"] for point in series)
+
+
+def test_signal_history_out_of_order_points():
+    """I punti in ritardo finiscono in ordine nella serie raw o nel bucket giusto."""
+    points = [
+        {"timestamp": timestamp, "signal_level": level, "quality": "50/70"}
+        for timestamp, level in (("2024-01-15T00:00:00", -40), ("2024-01-10T00:00:00", -60),
+                                 ("2024-01-10T01:00:00", -70), ("2024-01-15T00:01:00", -41),
+                                 ("2024-01-10T00:30:00", -50), ("2024-01-14T12:00:00", -45))
+    ]
+    network_data = build_signal_history(points, RetentionPolicy())
+
+    assert [point["timestamp"] for point in network_data["signal_history"]] == \
+        ["2024-01-14T12:00:00", "2024-01-15T00:00:00", "2024-01-15T00:01:00"]
+    hourly = network_data["signal_rollups"]["hour"]
+    assert [(bucket["start"], bucket["count"], bucket["min"], bucket["max"]) for bucket in hourly] == \
+        [("2024-01-10T00:00:00", 2, -60, -50), ("2024-01-10T01:00:00", 1, -70, -70)]
+
+    network_data = build_signal_history(points, RetentionPolicy(hourly_days=2))
+    assert network_data["signal_rollups"]["hour"] == []
+    assert [(bucket["start"], bucket["count"]) for bucket in network_data["signal_rollups"]["day"]] == \
+        [("2024-01-10T00:00:00", 3)]
+    series = signal_series(network_data)
+    assert [point["timestamp"] for point in series] == sorted(point["timestamp"] for point in series)
+
+
+def test_signal_series_round_trip(tmp_path):
+    """La serie colonnare conserva esattamente i punti, anche su disco."""
+    start = datetime(2026, 1, 1, 12, 0, 0, 123456)
+    points = [
+        {"timestamp": (start + timedelta(seconds=61 * i)).isoformat(), "signal_level": -30 - i % 40, "quality": f"{i % 70}/70"}
+        for i in range(500)
+    ]
+    series = SignalSeries.from_points(points)
+    stored = json.loads(json.dumps(series.to_json()))
+
+    assert SignalSeries.from_json(stored).to_points() == points
+    assert SignalSeries.from_json(points) == series
+    assert len(json.dumps(stored)) * 10 < len(json.dumps(points, indent=2))
+
+    # I timestamp con fuso orario si salvano in UTC, uguali nella scansione e nella storia del segnale
+    aware = datetime(2026, 1, 1, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+    aware_points = [{"timestamp": aware.isoformat(), "signal_level": -40, "quality": "50/70"}]
+    assert SignalSeries.from_points(aware_points).to_points() == [
+        {"timestamp": "2026-01-01T12:00:00", "signal_level": -40, "quality": "50/70"}
+    ]
+    db = InventoryDB(str(tmp_path / "inventory.json"))
+    scan_result = _mock_scan()
+    scan_result.timestamp = aware
+    scan_id = db.save_scan(scan_result)
+    history = db.get_network_history("00:11:22:33:44:55")
+    assert db.get_scan(scan_id)["timestamp"] == history["signal_history"][0]["timestamp"] == "2026-01-01T12:00:00"
+
+
+def test_ingest_directory_resumes(tmp_path):
+    """L'ingestione salta i file gia importati e riprende dopo un'interruzione."""
+    captures = tmp_path / "captures"
+    (captures / "day1").mkdir(parents=True)
+    for i in range(6):
+        capture = captures / "day1" / f"cap{i}.txt"
+        capture.write_text(make_capture(5, seed=i), encoding="utf-8")
+        os.utime(capture, (1700000000 - i * 3600, 1700000000 - i * 3600))  # Path order is newest first
+
+    db = open_inventory(str(tmp_path / "inventory.db"))
+    report = ingest_directory(db, str(captures), workers=2, batch_size=4)
+    assert (report.ingested, report.networks, report.failed) == (6, 30, 0)
+    assert db.get_statistics()["total_scans"] == 6
+    timestamps = [scan["timestamp"] for scan in db.get_recent_scans(6)]
+    assert timestamps == sorted(timestamps)
+
+    (captures / "day2").mkdir()
+    (captures / "day2" / "cap6.txt").write_text(make_capture(5, seed=6), encoding="utf-8")
+    report = ingest_directory(db, str(captures), workers=1)
+    assert (report.skipped, report.ingested) == (6, 1)
+    assert db.ingested_sources() == {str(path.resolve()) for path in captures.rglob("*.txt")}
+    assert db.get_recent_scans(1)[0]["interface"] == "wlan0"
+
+
+def test_secondary_indexes_follow_saves(tmp_path):
+    """Gli indici secondari seguono i salvataggi su tutti i backend."""
+    moved = _mock_scan()
+    moved.timestamp = datetime.utcnow() + timedelta(hours=2)
+    for network in moved.networks:
+        if network.bssid == "00:11:22:33:44:55":
+            network.channel, network.encryption = 11, "WEP"
+
+    for name in ("inventory.json", "inventory.xwl", "inventory.db"):
+        db = open_inventory(str(tmp_path / name))
+        db.save_scan(_mock_scan())
+        db.save_scan(moved)
+        views = [db, open_inventory(str(tmp_path / name), read_only=True)]
+        for view in views:
+            assert view.find_networks(encryption="WEP") == ["00:11:22:33:44:55"]
+            assert "00:11:22:33:44:55" not in view.find_networks(channel=6)
+            assert view.count_networks_by("encryption")["WEP"] == 1
+            assert sum(view.count_networks_by("channel").values()) == view.get_statistics()["unique_networks"]
+            assert view.find_networks(seen_since=moved.timestamp - timedelta(minutes=1)) == sorted(
+                network.bssid for network in moved.networks
+            )
+
+
+def test_out_of_order_save_keeps_latest_state(tmp_path):
+    """Una scansione più vecchia salvata dopo non sovrascrive l'ultimo stato né genera eventi."""
+    bssid = "00:11:22:33:44:55"
+    newer = _mock_scan()
+    newer.timestamp = datetime(2024, 5, 2)
+    older = _mock_scan()
+    older.timestamp = datetime(2024, 5, 1)
+    for network in older.networks:
+        if network.bssid == bssid:
+            network.encryption = "Open"
+
+    for name in ("inventory.json", "inventory.xwl", "inventory.db"):
+        db = open_inventory(str(tmp_path / name))
+        db.save_scan(newer)
+        db.save_scan(older)
+        for view in (db, open_inventory(str(tmp_path / name), read_only=True)):
+            history = view.get_network_history(bssid)
+            assert (history["first_seen"], history["last_seen"]) == \
+                (older.timestamp.isoformat(), newer.timestamp.isoformat())
+            assert history["total_scans"] == 2
+            assert bssid in view.find_networks(encryption="WPA2")
+            assert bssid not in view.find_networks(encryption="Open")
+            assert view.get_change_events(bssid=bssid, kind="encryption") == []
+
+
+def test_diff_range_streams_change_events(tmp_path):
+    """Il diff su un intervallo emette eventi strutturati per ogni coppia di scansioni."""
+    start = datetime(2024, 1, 1)
+    scans = []
+    for i in range(4):
+        scan_result = _mock_scan()
+        scan_result.timestamp = start + timedelta(hours=i)
+        scans.append(scan_result)
+    scans[1].networks[0].encryption = scans[2].networks[0].encryption = "WEP"
+    scans[2].networks[0].signal_level -= 20
+    scans[3].networks = scans[3].networks[1:]
+
+    for name in ("inventory.json", "inventory.db"):
+        db = open_inventory(str(tmp_path / name))
+        db.save_scans(scans)
+        bssid = scans[0].networks[0].bssid
+        events = [(event.kind, event.bssid, event.old, event.new) for event in db.diff_range()]
+        assert events == [
+            ("encryption", bssid, scans[0].networks[0].encryption, "WEP"),
+            ("signal", bssid, scans[1].networks[0].signal_level, scans[2].networks[0].signal_level),
+            ("disappeared", bssid, scans[0].networks[0].ssid, None),
+        ]
+        assert [event.kind for event in db.diff_range(since=start + timedelta(hours=2))] == ["disappeared"]
+        offset_since = datetime(2024, 1, 1, 4, tzinfo=timezone(timedelta(hours=2)))
+        assert [event.kind for event in db.diff_range(since=offset_since)] == ["disappeared"]
+        assert len(list(db.iter_scans(since=offset_since - timedelta(hours=2)))) == 4
+        assert list(db.diff_range(until=start + timedelta(hours=1))) == []
+
+
+def test_change_event_log(tmp_path):
+    """Il log degli eventi registra i cambi per BSSID, anche dopo migrazione."""
+    start = datetime(2024, 1, 1)
+    scans = []
+    for i, encryption in enumerate(["WPA2", "WPA2", "WEP", "WPA2"]):
+        scan_result = _mock_scan()
+        scan_result.timestamp = start + timedelta(days=i)
+        scan_result.networks[0].encryption = encryption
+        scans.append(scan_result)
+    bssid = scans[0].networks[0].bssid
+
+    json_db = InventoryDB(str(tmp_path / "inventory.json"))
+    log_db = SegmentedInventoryDB(str(tmp_path / "inventory.xwl"), segment_size=1, compact_every=2)
+    sqlite_db = open_inventory(str(tmp_path / "inventory.db"))
+    for scan_result in scans:
+        for db in (json_db, log_db, sqlite_db):
+            db.save_scan(scan_result)
+
+    legacy = json.loads(json.dumps(json_db.data, default=json_default))
+    del legacy["events"]
+    migrated = open_inventory(str(tmp_path / "migrated.db"))
+    migrated.import_data(legacy)
+
+    views = [json_db, InventoryDB(str(tmp_path / "inventory.json")), log_db,
+             open_inventory(str(tmp_path / "inventory.xwl"), read_only=True), sqlite_db, migrated]
+    for db in views:
+        changes = [(event.kind, event.old, event.new) for event in db.get_change_events(bssid=bssid)]
+        assert changes == [("appeared", None, scans[0].networks[0].ssid),
+                           ("encryption", "WPA2", "WEP"), ("encryption", "WEP", "WPA2")]
+        downgrades = db.encryption_downgrades(since=start + timedelta(days=1))
+        assert [(event.bssid, event.timestamp) for event in downgrades] == [
+            (bssid, (start + timedelta(days=2)).isoformat())
+        ]
+        assert db.get_change_events(kind="encryption", until=start + timedelta(days=2)) == []
+        offset_until = datetime(2024, 1, 3, 2, tzinfo=timezone(timedelta(hours=2)))
+        assert db.get_change_events(kind="encryption", until=offset_until) == []
+        assert len(db.get_change_events(kind="encryption", since=offset_until)) == 2
+
+
+def test_legacy_event_log_built_lazily_and_persisted_on_write(tmp_path, monkeypatch):
+    """Un inventario senza log degli eventi lo ricostruisce solo se serve e lo salva alla prima scrittura."""
+    db_path = tmp_path / "inventory.json"
+    db = InventoryDB(str(db_path))
+    db.save_scans([_mock_scan(), _mock_scan()])
+    legacy = json.loads(db_path.read_text(encoding="utf-8"))
+    del legacy["events"]
+    db_path.write_text(json.dumps(legacy), encoding="utf-8")
+
+    replays = []
+    monkeypatch.setattr("xwirless.db.iter_state_changes",
+                        lambda scans: replays.append(1) or iter_state_changes(scans))
+    reader = InventoryDB(str(db_path))
+    assert reader.get_statistics()["total_scans"] == 2 and replays == []
+    assert len(reader.get_change_events()) == 2 and replays == [1]
+
+    writer = InventoryDB(str(db_path))
+    writer.save_scan(_mock_scan())
+    assert len(json.loads(db_path.read_text(encoding="utf-8"))["events"]) == 2
+    assert len(InventoryDB(str(db_path)).get_change_events()) == 2 and replays == [1, 1]
+
+
+def test_segmented_events_live_in_segments(tmp_path, monkeypatch):
+    """Nel log segmentato gli eventi stanno nei segmenti, non nel checkpoint, anche dopo la migrazione."""
+    start = datetime(2024, 1, 1)
+    scans = []
+    for i, encryption in enumerate(["WPA2", "WEP", "WPA2", "WEP", "WPA2", "WEP"]):
+        scan_result = _mock_scan()
+        scan_result.timestamp = start + timedelta(days=i)
+        scan_result.networks[0].encryption = encryption
+        scans.append(scan_result)
+    json_db = InventoryDB(str(tmp_path / "inventory.json"))
+    json_db.save_scans(scans)
+    def summary(db):
+        return [(event.kind, event.bssid, event.timestamp, event.old, event.new) for event in db.get_change_events()]
+
+    expected = summary(json_db)
+    assert len(expected) == 7
+
+    log_path = tmp_path / "inventory.xwl"
+    log_db = SegmentedInventoryDB(str(log_path), segment_size=2, compact_every=1)
+    for scan_result in scans:
+        log_db.save_scan(scan_result)
+    checkpoint = SegmentLog(log_path).read_checkpoint()
+    assert "events" not in checkpoint and checkpoint["meta"]["event_log"] == "segments"
+
+    # Log scritto prima del log degli eventi: nessun evento né nei segmenti né nel checkpoint
+    legacy_path = tmp_path / "legacy.xwl"
+    legacy = SegmentLog(legacy_path)
+    legacy.write_segments(("scan", scan["id"], scan) for scan in json_db.data["scans"])
+    meta = {key: json_db.data[key] for key in ("version", "created_at", "last_updated", "statistics")}
+    legacy.write_checkpoint([("meta", None, {**meta, "watermark": legacy.active_number() - 1})] + [
+        ("network", bssid, dump_network(network_data)) for bssid, network_data in json_db.data["networks"].items()
+    ])
+
+    replays = []
+    monkeypatch.setattr("xwirless.db.iter_state_changes",
+                        lambda scans: replays.append(1) or iter_state_changes(scans))
+    migrated = SegmentedInventoryDB(str(legacy_path))
+    assert replays == [1]
+    for db in (log_db, SegmentedInventoryDB(str(log_path)), open_inventory(str(log_path), read_only=True),
+               migrated, SegmentedInventoryDB(str(legacy_path)), open_inventory(str(legacy_path), read_only=True)):
+        assert summary(db) == expected
+    assert replays == [1]
+
+
+def test_concurrent_writers_lose_no_scans(tmp_path):
+    """Scrittori e lettori concorrenti: nessuna scansione persa, nessun file troncato."""
+    db_path = str(tmp_path / "inventory.json")
+    writers, scans = 4, 15
+    with ProcessPoolExecutor(max_workers=writers + 2) as pool:
+        jobs = [pool.submit(_stress_writer, db_path, writer, scans) for writer in range(writers)]
+        jobs += [pool.submit(_stress_reader, db_path, 200) for _ in range(2)]
+        for job in jobs:
+            job.result()
+
+    db = InventoryDB(db_path)
+    assert db.get_statistics()["total_scans"] == writers * scans
+    assert db.ingested_sources() == {f"writer{w}-{i}" for w in range(writers) for i in range(scans)}
+    assert db.get_network_history("00:11:22:33:44:55")["total_scans"] == writers * scans
+    # The writers' lock file stays next to the inventory, empty
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["inventory.json", "inventory.json.lock"]
+    assert (tmp_path / "inventory.json.lock").stat().st_size == 0
+
+
+def test_concurrent_segmented_writers_lose_no_scans(tmp_path):
+    """Due processi che scrivono sullo stesso log segmentato non perdono ne corrompono scansioni."""
+    db_path = str(tmp_path / "inventory.xwl")
+    writers, scans = 2, 20
+    options = {"db_class": SegmentedInventoryDB, "segment_size": 5, "compact_every": 2}
+    with ProcessPoolExecutor(max_workers=writers) as pool:
+        jobs = [pool.submit(_stress_writer, db_path, writer, scans, **options) for writer in range(writers)]
+        for job in jobs:
+            job.result()
+
+    log = SegmentLog(Path(db_path), read_only=True)
+    records = [record for _, record in log.iter_records()]
+    assert sum(record["t"] == "scan" for record in records) == writers * scans
+    expected = {f"writer{w}-{i}" for w in range(writers) for i in range(scans)}
+    for db in (SegmentedInventoryDB(db_path), open_inventory(db_path, read_only=True)):
+        assert db.get_statistics()["total_scans"] == writers * scans
+        assert {scan["source"] for scan in db.iter_scans()} == expected
+        assert db.get_network_history("00:11:22:33:44:55")["total_scans"] == writers * scans
+        assert [event.kind for event in db.get_change_events(bssid="00:11:22:33:44:55")] == ["appeared"]
+
+
+def test_batch_flushes_once_and_rolls_back(tmp_path, monkeypatch):
+    """batch() scrive una sola volta e scarta tutto se il blocco fallisce."""
+    writes = []
+    original = InventoryDB._write_database
+    monkeypatch.setattr(InventoryDB, "_write_database", lambda db: writes.append(1) or original(db))
+
+    for name in ("inventory.json", "inventory.xwl", "inventory.db"):
+        db_path = str(tmp_path / name)
+        db = open_inventory(db_path)
+        with db.batch():
+            for _ in range(5):
+                db.save_scan(_mock_scan())
+            with db.batch():
+                db.save_scans([_mock_scan(), _mock_scan()])
+        try:
+            with db.batch():
+                db.save_scan(_mock_scan())
+                raise KeyboardInterrupt
+        except KeyboardInterrupt:
+            pass
+        assert db.get_statistics()["total_scans"] == 7
+        assert open_inventory(db_path, read_only=True).get_statistics()["total_scans"] == 7
+        assert db.get_network_history("00:11:22:33:44:55")["total_scans"] == 7
+    assert writes == [1]
+
+
+def test_scan_ids_unique_sortable_and_legacy_resolvable(tmp_path):
+    """ID univoci e ordinati anche nello stesso secondo; i vecchi ID restano validi."""
+    legacy = InventoryDB(str(tmp_path / "legacy.json"))
+    legacy.save_scan(_mock_scan())
+    legacy.data["scans"][0]["id"] = "scan_20240101_120000"
+    legacy._save_database()
+
+    for name in ("legacy.json", "inventory.xwl", "inventory.db"):
+        db = open_inventory(str(tmp_path / name))
+        changed = _mock_scan()
+        changed.networks[0].channel = 11
+        scan_ids = [db.save_scan(_mock_scan()) for _ in range(20)] + [db.save_scan(changed)]
+        assert len(set(scan_ids)) == len(scan_ids)
+        assert scan_ids == sorted(scan_ids)
+        assert all(db.get_scan(scan_id)["id"] == scan_id for scan_id in scan_ids)
+
+        comparison = db.compare_scans(scan_ids[-2], scan_ids[-1])
+        assert comparison["changed_networks"] == [
+            {"bssid": changed.networks[0].bssid, "changes": ["Channel: 6 → 11"]}
+        ]
+        view = open_inventory(str(tmp_path / name), read_only=True)
+        assert view.get_scan(scan_ids[-1])["networks"][0]["channel"] == 11
+
+    reopened = InventoryDB(str(tmp_path / "legacy.json"))
+    assert reopened.get_scan("scan_20240101_120000")["total_networks"] == 2
+    assert "scan_20240101_120000" < reopened.get_all_scans()[1]["id"]
+
+
+def test_compressed_storage_detected_by_magic(tmp_path):
+    """Inventario compresso: riconosciuto dai magic bytes, append senza ricomprimere."""
+    json_path = tmp_path / "inventory.json"
+    db = open_inventory(str(json_path), compression="gzip")
+    db.save_scan(_mock_scan())
+    assert json_path.read_bytes()[:2] == b"\x1f\x8b"
+
+    reopened = open_inventory(str(json_path))
+    reopened.save_scan(_mock_scan())
+    assert json_path.read_bytes()[:2] == b"\x1f\x8b"
+    assert InventoryDB(str(json_path)).get_statistics()["total_scans"] == 2
+
+    plain = InventoryDB(str(json_path), compression="none")
+    plain.save_scan(_mock_scan())
+    assert json.loads(json_path.read_text(encoding="utf-8"))["statistics"]["total_scans"] == 3
+
+    log_path = tmp_path / "inventory.xwl"
+    log_db = SegmentedInventoryDB(str(log_path), segment_size=3, compact_every=2, compression="gzip")
+    for _ in range(10):
+        log_db.save_scan(_mock_scan())
+    segments = sorted(log_path.glob("*.seg"))
+    assert all(path.read_bytes()[:2] == b"\x1f\x8b" for path in segments[:-1])
+    assert segments[-1].read_bytes()[:1] == b"{"
+    assert (log_path / "state.ckpt").read_bytes()[:2] == b"\x1f\x8b"
+
+    reopened_log = SegmentedInventoryDB(str(log_path), segment_size=3, compact_every=2)
+    assert reopened_log.data["networks"] == log_db.data["networks"]
+    view = open_inventory(str(log_path), read_only=True)
+    bssid = "00:11:22:33:44:55"
+    assert view.get_statistics() == log_db.get_statistics()
+    assert view.get_network_history(bssid) == log_db.get_network_history(bssid)
+    assert view.get_recent_scans(4) == log_db.get_recent_scans(4)
+    view.close()
+
+
+def test_compressed_segments_inflated_on_first_read(tmp_path, monkeypatch):
+    """Segmenti compressi: il footer resta leggibile e i record si decomprimono solo quando servono."""
+    from xwirless import storage
+    from xwirless.compression import compress, decompress
+
+    log_path = tmp_path / "inventory.xwl"
+    log_db = SegmentedInventoryDB(str(log_path), segment_size=3, compact_every=2, compression="gzip")
+    scan_ids = log_db.save_scans([_mock_scan() for _ in range(10)])
+    log_db.compact()
+    assert all(storage.read_footer(path)["count"] for path in sorted(log_path.glob("*.seg")))
+
+    inflated = []
+    monkeypatch.setattr(storage, "decompress", lambda data: inflated.append(1) or decompress(data))
+    view = open_inventory(str(log_path), read_only=True)
+    assert len(inflated) == 1  # The checkpoint, for its metadata
+    assert view.get_scan(scan_ids[4]) == log_db.get_scan(scan_ids[4])
+    assert len(inflated) == 2
+    view.close()
+    monkeypatch.undo()
+
+    # Files compressed whole, footer included, by earlier versions are still read
+    for path in [*log_path.glob("*.seg"), log_path / "state.ckpt"]:
+        with storage._open_records(path) as f:
+            path.write_bytes(compress(f.read(), "gzip"))
+    view = open_inventory(str(log_path), read_only=True)
+    assert [scan["id"] for scan in view.get_all_scans()] == scan_ids
+    assert SegmentedInventoryDB(str(log_path)).get_statistics() == log_db.get_statistics()
+    view.close()
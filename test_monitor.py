@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test della modalita monitor X WIRELESS
+"""
+
+import sys
+from pathlib import Path
+
+# Aggiungi il percorso del modulo xwirless
+sys.path.insert(0, str(Path(__file__).parent))
+
+from xwirless.scanner import WiFiScanner
+from xwirless.parser import WiFiParser
+from xwirless.db import open_inventory
+from xwirless.monitor import ScanMonitor
+from xwirless.scheduler import AdaptiveScheduler
+
+
+def test_monitor_saves_every_cycle(tmp_path):
+    """Il monitor salva una scansione per ciclo e si ferma su richiesta."""
+    db_path = str(tmp_path / "inventory.db")
+    scan_monitor = ScanMonitor(WiFiScanner(dry_run=True), WiFiParser(), open_inventory(db_path),
+                               "wlan0", interval=0)
+    cycles = []
+    
+    def on_cycle(stats):
+        cycles.append(stats)
+        if stats.cycle == 3:
+            scan_monitor.stop()
+    
+    assert scan_monitor.run(on_cycle=on_cycle) == 3
+    assert [stats.networks for stats in cycles] == [2, 2, 2]
+    assert all(stats.error is None and stats.total_time >= 0 for stats in cycles)
+    assert open_inventory(db_path, read_only=True).get_statistics()["total_scans"] == 3
+
+
+def test_monitor_survives_failed_cycle(tmp_path):
+    """Un ciclo fallito viene riportato senza fermare il monitor."""
+    scan_monitor = ScanMonitor(WiFiScanner(dry_run=True), WiFiParser(),
+                               open_inventory(str(tmp_path / "inventory.json")), "wlan0",
+                               interval=0, sandbox=str(tmp_path / "missing.txt"))
+    cycles = []
+    
+    assert scan_monitor.run(max_cycles=2, on_cycle=cycles.append) == 2
+    assert all("missing.txt" in stats.error for stats in cycles)
+
+
+def test_monitor_scans_several_radios(tmp_path):
+    """Un elenco di interfacce viene scansionato in parallelo e salvato come una scansione."""
+    db_path = str(tmp_path / "inventory.db")
+    scan_monitor = ScanMonitor(WiFiScanner(dry_run=True), WiFiParser(), open_inventory(db_path),
+                               "wlan0,wlan1", interval=0)
+    cycles = []
+    
+    assert scan_monitor.run(max_cycles=1, on_cycle=cycles.append) == 1
+    assert cycles[0].error is None and cycles[0].networks == 2
+    scan = open_inventory(db_path, read_only=True).get_scan(cycles[0].scan_id)
+    assert set(scan["interface_timings"]) == {"wlan0", "wlan1"}
+
+
+def test_adaptive_scheduler_backoff_and_churn():
+    """Il pianificatore rallenta sulle interfacce occupate e accelera quando le reti cambiano."""
+    scheduler = AdaptiveScheduler(base_interval=60, min_interval=10, max_interval=300, jitter=0)
+    
+    delays = [scheduler.record_failure("wlan0", RuntimeError("Scan timeout")) for _ in range(4)]
+    assert delays == [120, 240, 300, 300]
+    assert scheduler.record_failure("wlan0", RuntimeError("No such device")) == 60
+    assert scheduler.record_success("wlan0", 2.0, ["00:11:22:33:44:55"]) == 60
+    
+    for i in range(6):
+        delay = scheduler.record_success("wlan0", 2.0, [f"02:00:00:00:01:{i:02X}"])
+    assert delay == 10
+    assert scheduler.metrics("wlan0").decision == "steady"
+    
+    for _ in range(20):
+        delay = scheduler.record_success("wlan0", 2.0, ["02:00:00:00:01:05"])
+    assert delay == 60
+    metrics = scheduler.snapshot()["wlan0"]
+    assert (metrics.scans, metrics.failures, metrics.busy_failures) == (27, 5, 4)
+    assert metrics.churn < 0.1
+
+
+def test_monitor_follows_scheduler_delays(tmp_path):
+    """Con il pianificatore ogni ciclo riporta il ritardo scelto."""
+    scheduler = AdaptiveScheduler(base_interval=0, min_interval=0, jitter=0)
+    scan_monitor = ScanMonitor(WiFiScanner(dry_run=True), WiFiParser(),
+                               open_inventory(str(tmp_path / "inventory.json")), "wlan0",
+                               interval=0, scheduler=scheduler)
+    cycles = []
+    
+    assert scan_monitor.run(max_cycles=2, on_cycle=cycles.append) == 2
+    assert [stats.decision for stats in cycles] == ["steady", "steady"]
+    assert scheduler.metrics("wlan0").scans == 2
+
+
+def test_monitor_scans_through_backends(tmp_path, monkeypatch):
+    """Il monitor passa dai backend dello scanner e rispetta quello scelto."""
+    scanner = WiFiScanner(dry_run=True)
+    calls = []
+    scan = scanner.scan
+    
+    def recording_scan(interface=None, backend=None):
+        calls.append((interface, backend))
+        return scan(interface, backend)
+    
+    monkeypatch.setattr(scanner, "scan", recording_scan)
+    scan_monitor = ScanMonitor(scanner, WiFiParser(), open_inventory(str(tmp_path / "inventory.db")),
+                               "wlan0", interval=0, backend="nl80211")
+    cycles = []
+    
+    assert scan_monitor.run(max_cycles=2, on_cycle=cycles.append) == 2
+    assert calls == [("wlan0", "nl80211")] * 2
+    assert [stats.networks for stats in cycles] == [2, 2]
+
+
+def test_monitor_batches_json_writes(tmp_path, monkeypatch):
+    """Con un inventario JSON il monitor scrive il file a intervalli, non a ogni ciclo."""
+    db_path = str(tmp_path / "inventory.json")
+    db = open_inventory(db_path)
+    writes = []
+    persist = db._persist_scans
+    monkeypatch.setattr(db, "_persist_scans", lambda records: writes.append(len(records)) or persist(records))
+    scan_monitor = ScanMonitor(WiFiScanner(dry_run=True), WiFiParser(), db, "wlan0",
+                               interval=0, flush_interval=3600)
+    
+    assert scan_monitor.run(max_cycles=3) == 3
+    assert writes == [3]
+    assert open_inventory(db_path, read_only=True).get_statistics()["total_scans"] == 3
+    
+    db = open_inventory(db_path)
+    writes = []
+    monkeypatch.setattr(db, "_persist_scans", lambda records: writes.append(len(records)))
+    ScanMonitor(WiFiScanner(dry_run=True), WiFiParser(), db, "wlan0",
+                interval=0, flush_interval=0).run(max_cycles=2)
+    assert writes == [1, 1]
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Test del parser X WIRELESS
+"""
+
+import asyncio
+import errno
+import struct
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+# Aggiungi il percorso del modulo xwirless
+sys.path.insert(0, str(Path(__file__).parent))
+
+from xwirless.scanner import WiFiScanner
+from xwirless.parser import ScanResult, WiFiNetwork, WiFiParser, _LineFormatParser
+from xwirless.nl80211 import NLMSG_ERROR, NLMSG_HEADER, parse_scan_dump
+from xwirless.backends import SCAN_BACKENDS, CommandBackend, IwlistBackend, ScanBackend, available_backends, get_backend
+from xwirless.async_scanner import AsyncWiFiScanner
+from xwirless.cache import ScanCache
+from xwirless.report import ReportGenerator
+from benchmark import legacy_parse, make_capture
+
+
+def test_parser_matches_legacy():
+    """Il parser a passata singola produce le stesse reti del parser originale."""
+    capture = make_capture(200, seed=1)
+    scan_result = WiFiParser().parse_scan_output(capture, "wlan0")
+    
+    assert len(scan_result.networks) == 200
+    assert [n.to_dict() for n in scan_result.networks] == [n.to_dict() for n in legacy_parse(capture)]
+
+
+def test_parser_keeps_cells_after_preamble():
+    """L'intestazione di iwlist non fa perdere l'ultima cella."""
+    output = WiFiScanner(dry_run=True)._get_mock_scan_output()
+    parser = WiFiParser()
+    plain = parser.parse_scan_output(output, "wlan0")
+    with_preamble = parser.parse_scan_output("wlan0     Scan completed :\n" + output, "wlan0")
+    
+    assert [n.bssid for n in with_preamble.networks] == [n.bssid for n in plain.networks]
+    assert plain.networks[0].frequency == 2.437
+    assert plain.networks[0].encryption == "WPA2"
+
+
+def test_iter_networks_streams_cells(tmp_path):
+    """Il parser in streaming legge file e pipe riga per riga."""
+    capture = make_capture(50, seed=2)
+    expected = [n.to_dict() for n in WiFiParser().parse_scan_output(capture, "wlan0").networks]
+    capture_file = tmp_path / "capture.txt"
+    capture_file.write_text(capture, encoding="utf-8")
+    
+    parser = WiFiParser()
+    with open(capture_file, "rb") as f:
+        networks = parser.iter_networks(f)
+        first = next(networks)
+        assert f.tell() < len(capture)
+        assert [first.to_dict()] + [n.to_dict() for n in networks] == expected
+    
+    with WiFiScanner(dry_run=True).open_scan_file(str(capture_file)) as f:
+        assert [n.to_dict() for n in parser.parse_scan_stream(f, "wlan0").networks] == expected
+
+
+def test_trusted_network_matches_validated():
+    """Il percorso senza validazione produce lo stesso modello; i dati esterni restano validati."""
+    fields = dict(bssid="AA:BB:CC:DD:EE:FF", ssid="Lab", channel=6, frequency=2.437,
+                  signal_level=-50, quality="60/70", encryption="WPA2", cipher="CCMP")
+    trusted = WiFiNetwork.trusted(**fields)
+    validated = WiFiNetwork(**fields)
+    
+    assert trusted == validated
+    assert trusted.to_dict() == validated.model_dump()
+    assert list(trusted.to_dict()) == list(WiFiNetwork.model_fields)
+    assert WiFiNetwork.trusted_many([tuple(trusted.to_dict().values())]) == [trusted]
+    trusted.ssid = "Renamed"
+    assert trusted.model_fields_set == set(WiFiNetwork.model_fields)
+    with pytest.raises(ValidationError):
+        WiFiNetwork(**dict(fields, bssid="not-a-mac"))
+
+
+def test_scan_result_binary_round_trip():
+    """Il formato binario ricostruisce esattamente lo scan ed è più compatto del report JSON."""
+    scan_result = WiFiParser().parse_scan_output(make_capture(50), "wlan0,wlan1")
+    scan_result.networks.append(WiFiNetwork(
+        bssid="aa-bb-cc-dd-ee-01", ssid="Caffè ☕", channel=36, frequency=5.18, signal_level=-120,
+        quality="0/70", encryption="WPA3", authentication="SAE", radio="wlan1"
+    ))
+    scan_result.networks.append(WiFiNetwork(
+        bssid="AA:BB:CC:DD:EE:02", ssid="", channel=1, frequency=2.412, signal_level=-40, quality="70/70"
+    ))
+    scan_result = ScanResult(
+        timestamp=datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone(timedelta(hours=2))),
+        interface=scan_result.interface, networks=scan_result.networks, scan_duration=1.25,
+        source="capture.txt", interface_timings={"wlan0": 0.5, "wlan1": 1.25}, cache_age=3.5
+    )
+    
+    payload = scan_result.to_bytes()
+    decoded = ScanResult.from_bytes(payload)
+    assert decoded == scan_result
+    assert decoded.timestamp.utcoffset() == timedelta(hours=2)
+    assert [n.to_dict() for n in decoded.networks] == [n.to_dict() for n in scan_result.networks]
+    assert len(payload) * 4 < len(ReportGenerator().generate_json_report(scan_result))
+    
+    empty = ScanResult(interface="wlan0", timestamp=datetime(2024, 5, 1))
+    assert ScanResult.from_bytes(empty.to_bytes()) == empty
+    for corrupt in (payload[:-3], payload + b"\0", b"JSON" + payload[4:], b""):
+        with pytest.raises(ValueError):
+            ScanResult.from_bytes(corrupt)
+
+
+def _fake_sysfs(root, devices):
+    """Crea un albero /sys/class/net di prova."""
+    for name, wireless, operstate in devices:
+        device = root / name
+        device.mkdir(parents=True)
+        (device / "operstate").write_text(operstate + "\n")
+        if wireless:
+            (device / "wireless").mkdir()
+
+
+def test_detect_interface_from_sysfs(tmp_path):
+    """L'interfaccia si rileva da sysfs e la cache si invalida quando cambiano i dispositivi."""
+    _fake_sysfs(tmp_path, [("eth0", False, "up"), ("wlan0", True, "down"), ("wlp2s0", True, "up")])
+    scanner = WiFiScanner(sysfs_root=tmp_path)
+    
+    assert scanner.detect_interface() == "wlp2s0"
+    (tmp_path / "wlp2s0" / "operstate").write_text("down\n")
+    assert scanner.detect_interface() == "wlp2s0"
+    
+    _fake_sysfs(tmp_path, [("wlx00c0ca", True, "up")])
+    assert scanner.detect_interface() == "wlx00c0ca"
+
+
+def test_detect_interface_does_not_cache_missing_device(tmp_path, monkeypatch):
+    """Se all'avvio non c'è un'interfaccia wireless, un adattatore inserito dopo viene rilevato."""
+    monkeypatch.setattr(WiFiScanner, "_detect_interface_with_tools", lambda self: None)
+    _fake_sysfs(tmp_path, [("eth0", False, "up")])
+    scanner = WiFiScanner(sysfs_root=tmp_path)
+    assert scanner.detect_interface() is None
+    
+    (tmp_path / "eth0" / "wireless").mkdir()
+    assert scanner.detect_interface() == "eth0"
+    
+    missing = WiFiScanner(sysfs_root=tmp_path / "missing")
+    assert missing.detect_interface() is None
+    assert missing._interface_cache is None
+
+
+def test_nl80211_scan_dump_fixture():
+    """Il dump nl80211 registrato produce direttamente le reti, senza parsing di testo."""
+    dump = (Path(__file__).parent / "fixtures" / "nl80211_scan_dump.bin").read_bytes()
+    networks = {network.bssid: network for network in parse_scan_dump(dump)}
+    
+    assert len(networks) == 7
+    first = networks["00:11:22:33:44:55"]
+    assert (first.ssid, first.channel, first.frequency, first.signal_level) == ("TestNetwork1", 6, 2.437, -45)
+    assert (first.encryption, first.cipher, first.authentication) == ("WPA2", "CCMP", "PSK")
+    assert [networks[bssid].encryption for bssid in ("AA:BB:CC:DD:EE:FF", "12:34:56:78:9A:BC", "DE:AD:BE:EF:00:01")] \
+        == ["Open", "WPA", "WEP"]
+    assert networks["02:00:00:00:00:05"].encryption == "WPA3"
+    assert networks["02:00:00:00:00:06"].authentication == "EAP"
+    assert networks["02:00:00:00:00:07"].ssid == "Caffè"
+    
+    error = NLMSG_HEADER.pack(36, NLMSG_ERROR, 0, 1, 0) + struct.pack("=i", -errno.EBUSY) + bytes(16)
+    with pytest.raises(RuntimeError):
+        parse_scan_dump(error)
+
+
+BACKEND_FIXTURES = {
+    "nl80211": "nl80211_scan_dump.bin",
+    "iw": "iw_scan_dump.txt",
+    "wpa_cli": "wpa_cli_scan_results.txt",
+    "nmcli": "nmcli_wifi_list.txt",
+    "iwlist": "iwlist_scan.txt",
+}
+
+
+@pytest.mark.parametrize("name", ["iw", "wpa_cli", "nmcli"])
+def test_backend_fixtures_agree_with_nl80211(name):
+    """Le uscite di iw, wpa_cli e nmcli descrivono le stesse reti del dump nl80211."""
+    fixtures = Path(__file__).parent / "fixtures"
+    
+    def summary(backend_name):
+        scan_result = get_backend(backend_name).parse_file(str(fixtures / BACKEND_FIXTURES[backend_name]), "wlan0")
+        return {network.bssid.upper(): (network.ssid, network.channel, network.signal_level,
+                                        network.encryption, network.authentication)
+                for network in scan_result.networks}
+    
+    assert summary(name) == summary("nl80211")
+
+
+def test_backend_registry_picks_cheapest_available(monkeypatch):
+    """La selezione automatica usa il backend disponibile più economico."""
+    assert set(BACKEND_FIXTURES) <= set(SCAN_BACKENDS)
+    with pytest.raises(ValueError):
+        get_backend("airodump")
+    
+    for backend_class in SCAN_BACKENDS.values():
+        monkeypatch.setattr(backend_class, "available", lambda self: self.name in ("nmcli", "iwlist"))
+    assert [backend.name for backend in available_backends()] == ["nmcli", "iwlist"]
+    
+    monkeypatch.setattr(CommandBackend, "run", lambda self, command: (
+        Path(__file__).parent / "fixtures" / BACKEND_FIXTURES[self.name]).read_text(encoding="utf-8"))
+    scan_result = WiFiScanner(sysfs_root=Path("/nonexistent")).scan("wlan0")
+    assert scan_result.total_networks == 7
+    assert scan_result.networks[0].cipher is None  # nmcli non riporta il cifrario
+
+
+def test_incomplete_backend_fails_on_instantiation():
+    """Un backend o un parser senza i metodi richiesti non si può istanziare."""
+    class PartialBackend(CommandBackend):
+        name = "partial"
+        
+        def command(self, interface):
+            return ["true"]
+    
+    class PartialParser(_LineFormatParser):
+        name = "partial"
+    
+    with pytest.raises(TypeError):
+        PartialBackend()
+    with pytest.raises(TypeError):
+        PartialParser()
+    assert all(isinstance(get_backend(name), ScanBackend) for name in SCAN_BACKENDS)
+
+
+def test_auto_backend_falls_through_empty_cache(monkeypatch):
+    """Se la cache del kernel è scaduta (nessuna rete), la selezione automatica passa a iwlist."""
+    for backend_class in SCAN_BACKENDS.values():
+        monkeypatch.setattr(backend_class, "available", lambda self: self.name in ("nl80211", "iwlist"))
+    monkeypatch.setattr(SCAN_BACKENDS["nl80211"], "scan", lambda self, interface: ScanResult(interface=interface))
+    fixture = Path(__file__).parent / "fixtures" / BACKEND_FIXTURES["iwlist"]
+    monkeypatch.setattr(CommandBackend, "run", lambda self, command: fixture.read_text(encoding="utf-8"))
+    
+    assert WiFiScanner(sysfs_root=Path("/nonexistent")).scan("wlan0").total_networks == 7
+    
+    monkeypatch.setattr(CommandBackend, "run", lambda self, command: "")
+    assert WiFiScanner(sysfs_root=Path("/nonexistent")).scan("wlan0").total_networks == 0
+
+
+def test_auto_backend_falls_through_os_errors(monkeypatch):
+    """Un errore del sistema operativo (es. permessi nl80211) fa passare al backend successivo."""
+    for backend_class in SCAN_BACKENDS.values():
+        monkeypatch.setattr(backend_class, "available", lambda self: self.name in ("nl80211", "iw"))
+    
+    def denied(self, interface):
+        raise PermissionError(errno.EPERM, "Operation not permitted")
+    
+    monkeypatch.setattr("xwirless.backends.NL80211Reader.get_networks", denied)
+    fixture = Path(__file__).parent / "fixtures" / BACKEND_FIXTURES["iw"]
+    monkeypatch.setattr(CommandBackend, "run", lambda self, command: fixture.read_text(encoding="utf-8"))
+    monkeypatch.setattr(SCAN_BACKENDS["iw"], "command", lambda self, interface: ["cat", str(fixture)])
+    
+    with pytest.raises(RuntimeError):
+        get_backend("nl80211").scan("wlan0")
+    assert WiFiScanner(sysfs_root=Path("/nonexistent")).scan("wlan0").total_networks == 7
+    assert asyncio.run(AsyncWiFiScanner().scan_networks("wlan0")).total_networks == 7
+
+
+def test_multi_interface_scan_is_concurrent_and_merged(monkeypatch):
+    """Le radio si scansionano in parallelo e ogni BSSID tiene il segnale migliore."""
+    iw_dump = (Path(__file__).parent / "fixtures" / "iw_scan_dump.txt").read_text(encoding="utf-8")
+    
+    def slow_run(self, command):
+        time.sleep(0.2)
+        # wlan1 sente Guest meglio delle altre radio
+        return iw_dump.replace("-67.00 dBm", "-40.00 dBm") if command[2] == "wlan1" else iw_dump
+    
+    monkeypatch.setattr(CommandBackend, "run", slow_run)
+    scanner = WiFiScanner(backend="iw")
+    start = time.perf_counter()
+    scan_result = scanner.scan_interfaces(scanner.resolve_interfaces("wlan0, wlan1,wlan2"))
+    elapsed = time.perf_counter() - start
+    
+    assert elapsed < 0.5
+    assert set(scan_result.interface_timings) == {"wlan0", "wlan1", "wlan2"}
+    assert all(seconds >= 0.2 for seconds in scan_result.interface_timings.values())
+    assert scan_result.total_networks == 7
+    networks = {network.bssid: network for network in scan_result.networks}
+    assert (networks["AA:BB:CC:DD:EE:FF"].radio, networks["AA:BB:CC:DD:EE:FF"].signal_level) == ("wlan1", -40)
+    assert (networks["00:11:22:33:44:55"].radio, networks["00:11:22:33:44:55"].signal_level) == ("wlan0", -45)
+
+
+def test_async_scan_streams_subprocess_output(monkeypatch):
+    """La scansione asincrona legge l'output del processo come stream e dà le stesse reti."""
+    fixture = str(Path(__file__).parent / "fixtures" / "iwlist_scan.txt")
+    monkeypatch.setattr(IwlistBackend, "command", lambda self, interface: ["cat", fixture])
+    scanner = AsyncWiFiScanner(backend="iwlist")
+    
+    scan_result = asyncio.run(scanner.scan_networks("wlan0"))
+    expected = get_backend("iwlist").parse_file(fixture, "wlan0")
+    assert [network.to_dict() for network in scan_result.networks] == \
+        [network.to_dict() for network in expected.networks]
+    assert scan_result.scan_duration is not None
+
+
+def test_async_scan_timeout_and_cancel(monkeypatch):
+    """Timeout e cancellazione terminano il processo senza bloccare il loop."""
+    monkeypatch.setattr(IwlistBackend, "command", lambda self, interface: ["sleep", "10"])
+    
+    with pytest.raises(RuntimeError, match="timeout"):
+        asyncio.run(AsyncWiFiScanner(backend="iwlist", timeout=0.2).scan_networks("wlan0"))
+    
+    async def cancel_midway():
+        task = asyncio.create_task(AsyncWiFiScanner(backend="iwlist").scan_networks("wlan0"))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    
+    start = time.perf_counter()
+    asyncio.run(cancel_midway())
+    assert time.perf_counter() - start < 2
+
+
+def test_async_nl80211_scan_runs_off_loop(monkeypatch):
+    """Il backend nl80211 gira in un executor: il loop continua a servire altri task."""
+    backend = get_backend("nl80211")
+    
+    def slow_scan(interface):
+        time.sleep(0.3)
+        return ScanResult(timestamp=datetime.now(), interface=interface, networks=[])
+    
+    monkeypatch.setattr(backend, "scan", slow_scan)
+    monkeypatch.setattr("xwirless.async_scanner.get_backend", lambda name, timeout: backend)
+    
+    async def scan_while_ticking():
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        task = asyncio.create_task(ticker())
+        await AsyncWiFiScanner(backend="nl80211").scan_networks("wlan0")
+        task.cancel()
+        return ticks
+    
+    assert asyncio.run(scan_while_ticking()) >= 10
+
+
+def test_scan_cache_shares_one_scan(monkeypatch, tmp_path):
+    """Le chiamate entro il TTL ricevono la scansione in cache, marcata con la sua età."""
+    iw_dump = (Path(__file__).parent / "fixtures" / "iw_scan_dump.txt").read_text(encoding="utf-8")
+    commands = []
+    
+    def slow_run(self, command):
+        commands.append(command)
+        time.sleep(0.2)
+        return iw_dump
+    
+    monkeypatch.setattr(CommandBackend, "run", slow_run)
+    results = []
+    
+    def scan():
+        # Uno scanner per chiamante, come processi diversi che condividono la cartella
+        scanner = WiFiScanner(backend="iw", cache=ScanCache(tmp_path, ttl=5))
+        results.append(scanner.scan("wlan0"))
+    
+    threads = [threading.Thread(target=scan) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(commands) == 1
+    assert sorted(result.cache_age is None for result in results) == [False, False, False, True]
+    assert all(result.total_networks == 7 for result in results)
+    
+    expired = ScanCache(tmp_path, ttl=0.1)
+    time.sleep(0.15)
+    assert expired.get("wlan0") is None
+    fresh = ScanResult(interface="wlan0")
+    assert expired.get_or_scan("wlan0", lambda: fresh) is fresh
+    assert ScanCache(tmp_path, ttl=5).get("wlan1") is None
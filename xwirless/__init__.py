@@ -19,6 +19,7 @@ __email__ = "adilfayyaz388@gmail.com"
 __license__ = "MIT"
 
 from .scanner import WiFiScanner
+from .async_scanner import AsyncWiFiScanner
 from .parser import WiFiParser
 from .report import ReportGenerator
 from .db import InventoryDB
@@ -26,6 +27,7 @@ from .safety import SafetyValidator
 
 __all__ = [
     "WiFiScanner",
+    "AsyncWiFiScanner",
     "WiFiParser", 
     "ReportGenerator",
     "InventoryDB",
@@ -0,0 +1,200 @@
+"""
+Asyncio scanning API.
+
+``AsyncWiFiScanner`` mirrors ``WiFiScanner`` for event-loop based services.
+Tools run through ``asyncio.create_subprocess_exec`` and their output is
+parsed as it streams in, so a scan never blocks the loop. The in-process
+nl80211 backend and the backend probes are blocking socket and subprocess
+calls, so they run in the loop's default executor. Scans can be cancelled
+like any other task; the child process is killed.
+"""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .backends import CommandBackend, ScanBackend, available_backends, get_backend
+from .parser import ScanResult, merge_scan_results
+from .scanner import INTERFACE_PROBES, SYSFS_NET, WiFiScanner, list_wireless_interfaces
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWiFiScanner:
+    """Non-blocking Wi-Fi scanner for asyncio applications."""
+    
+    def __init__(self, dry_run: bool = False, sysfs_root: Path = SYSFS_NET,
+                 backend: str = "auto", timeout: float = 30.0):
+        self.dry_run = dry_run
+        self.sysfs_root = Path(sysfs_root)
+        self.backend = backend
+        self.timeout = timeout
+        self.interface = None
+    
+    async def detect_interface(self) -> Optional[str]:
+        """Auto-detect a wireless interface.
+        
+        sysfs is read directly; the nmcli, iwconfig and ip probes only run
+        when it lists no wireless device.
+        """
+        if self.dry_run:
+            logger.info("DRY-RUN: Would detect wireless interface")
+            return "wlan0"
+        
+        wireless = list_wireless_interfaces(self.sysfs_root)
+        if wireless:
+            logger.info(f"Detected interface via sysfs: {wireless[0]}")
+            return wireless[0]
+        
+        for command, extract in INTERFACE_PROBES:
+            try:
+                returncode, stdout, _ = await self._run(command, timeout=10)
+            except RuntimeError as e:
+                logger.debug(f"Error detecting interface with {command[0]}: {e}")
+                continue
+            if returncode == 0:
+                interface = extract(stdout.decode('utf-8', errors='replace'))
+                if interface:
+                    logger.info(f"Detected interface via {command[0]}: {interface}")
+                    return interface
+        return None
+    
+    async def scan_networks(self, interface: Optional[str] = None,
+                            backend: Optional[str] = None) -> ScanResult:
+        """Scan for Wi-Fi networks without blocking the event loop.
+        
+        With ``backend`` "auto" the available backends are tried cheapest
+        first, as in ``WiFiScanner.scan``.
+        """
+        if not interface:
+            interface = await self.detect_interface()
+        
+        if not interface:
+            raise RuntimeError("No wireless interface detected")
+        
+        self.interface = interface
+        return await self._scan_interface(interface, backend or self.backend)
+    
+    async def scan_interfaces(self, interfaces: List[str],
+                              backend: Optional[str] = None) -> ScanResult:
+        """Scan several radios concurrently and merge the results by BSSID."""
+        if not interfaces:
+            raise RuntimeError("No wireless interface detected")
+        backend = backend or self.backend
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(self._scan_interface(interface, backend) for interface in interfaces),
+            return_exceptions=True
+        )
+        results = []
+        for interface, outcome in zip(interfaces, outcomes):
+            if isinstance(outcome, RuntimeError):
+                logger.error(f"Scan failed on {interface}: {outcome}")
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                results.append(outcome)
+        if not results:
+            raise RuntimeError(f"Scan failed on every interface: {', '.join(interfaces)}")
+        
+        merged = merge_scan_results(results)
+        merged.scan_duration = time.perf_counter() - start
+        self.interface = merged.interface
+        return merged
+    
+    async def _scan_interface(self, interface: str, backend: str) -> ScanResult:
+        """Scan one interface with the given backend (or "auto")."""
+        if self.dry_run:
+            return WiFiScanner(dry_run=True).scan(interface, backend)
+        
+        if backend != "auto":
+            return await self._scan_with(get_backend(backend, self.timeout), interface)
+        
+        loop = asyncio.get_running_loop()
+        candidates = await loop.run_in_executor(None, available_backends, self.timeout)
+        if not candidates:
+            raise RuntimeError("No scan backend available - install iw or wireless-tools")
+        empty = None
+        for candidate in candidates:
+            try:
+                scan_result = await self._scan_with(candidate, interface)
+            except (RuntimeError, OSError) as e:
+                logger.warning(f"{candidate.name} backend failed, trying the next one: {e}")
+                continue
+            if scan_result.networks:
+                return scan_result
+            logger.info(f"{candidate.name} backend found no networks, trying the next one")
+            empty = empty or scan_result
+        if empty is not None:
+            return empty
+        raise RuntimeError(f"All scan backends failed on {interface}")
+    
+    async def _scan_with(self, backend: ScanBackend, interface: str) -> ScanResult:
+        """Run one backend, parsing its stdout as it arrives."""
+        if not isinstance(backend, CommandBackend):
+            # In-process backends (nl80211) talk to the kernel over a blocking socket
+            loop = asyncio.get_running_loop()
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(None, backend.scan, interface), self.timeout
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"{backend.name} timed out - interface may be busy")
+                raise RuntimeError("Scan timeout")
+        
+        start = time.perf_counter()
+        command = backend.command(interface)
+        process = await self._spawn(command)
+        try:
+            scan_result, stderr, returncode = await asyncio.wait_for(asyncio.gather(
+                backend.parse_stream(process.stdout, interface),
+                process.stderr.read(),
+                process.wait()
+            ), self.timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"{backend.name} timed out - interface may be busy")
+            raise RuntimeError("Scan timeout")
+        finally:
+            await self._reap(process)
+        
+        if returncode != 0:
+            message = stderr.decode('utf-8', errors='replace').strip()
+            logger.error(f"{backend.name} failed: {message}")
+            raise RuntimeError(f"{backend.name} scan failed: {message}")
+        
+        scan_result.scan_duration = time.perf_counter() - start
+        logger.info(f"Scanned {scan_result.total_networks} networks on {interface} via {backend.name}")
+        return scan_result
+    
+    async def _run(self, command: List[str], timeout: float) -> Tuple[int, bytes, bytes]:
+        """Run a short command to completion; returns (returncode, stdout, stderr)."""
+        process = await self._spawn(command)
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"{command[0]} timed out")
+        finally:
+            await self._reap(process)
+        return process.returncode, stdout, stderr
+    
+    async def _spawn(self, command: List[str]) -> asyncio.subprocess.Process:
+        """Start a command with stdout and stderr piped."""
+        try:
+            return await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            raise RuntimeError(f"{command[0]} command not available")
+        except OSError as e:
+            raise RuntimeError(f"{command[0]} could not be run: {e}")
+    
+    async def _reap(self, process: asyncio.subprocess.Process) -> None:
+        """Kill a process that is still running (timeout or cancellation) and wait for it."""
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
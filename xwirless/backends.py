@@ -0,0 +1,238 @@
+"""
+Pluggable scan backends.
+
+Each backend knows how to obtain scan results for an interface and turn
+them into a ``ScanResult``. Backends that only read results the system
+already holds (the kernel BSS cache, wpa_supplicant, NetworkManager) are
+much cheaper than ``iwlist``, which triggers a fresh scan, so automatic
+selection tries them in order of ``cost``. A cache that has expired (the
+kernel drops BSS entries after about 30s) reads as empty, so automatic
+selection moves on to the next backend when one finds no networks.
+"""
+
+import logging
+import shutil
+import socket
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from datetime import datetime
+from typing import AsyncIterable, Dict, List, Optional, Type
+
+from .nl80211 import NL80211Reader, parse_scan_dump
+from .parser import (
+    NMCLI_FIELDS, IwScanParser, NmcliParser, ScanResult, WiFiParser, WpaCliParser
+)
+
+logger = logging.getLogger(__name__)
+
+SCAN_BACKENDS: Dict[str, Type["ScanBackend"]] = {}
+
+
+def register_backend(cls: Type["ScanBackend"]) -> Type["ScanBackend"]:
+    """Class decorator adding a backend to the registry under its ``name``."""
+    SCAN_BACKENDS[cls.name] = cls
+    return cls
+
+
+def get_backend(name: str, timeout: float = 30.0) -> "ScanBackend":
+    """Instantiate a registered backend by name."""
+    try:
+        return SCAN_BACKENDS[name](timeout=timeout)
+    except KeyError:
+        raise ValueError(f"Unknown scan backend: {name} (choose from {', '.join(SCAN_BACKENDS)})")
+
+
+def available_backends(timeout: float = 30.0) -> List["ScanBackend"]:
+    """Available backends, cheapest first."""
+    backends = [cls(timeout=timeout) for cls in SCAN_BACKENDS.values()]
+    return sorted((backend for backend in backends if backend.available()),
+                  key=lambda backend: backend.cost)
+
+
+class ScanBackend(ABC):
+    """Base class for scan backends.
+    
+    Subclasses set ``name``, ``cost`` (relative; lower is cheaper) and
+    ``tool`` (the executable they need, None for in-process backends), and
+    implement ``scan`` and ``parse_file``. Backends that run a command
+    derive from ``CommandBackend`` instead.
+    """
+    
+    name = ""
+    cost = 100
+    tool: Optional[str] = None
+    
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = timeout
+    
+    def available(self) -> bool:
+        """Whether the backend can run on this host."""
+        return self.tool is None or shutil.which(self.tool) is not None
+    
+    @abstractmethod
+    def scan(self, interface: str) -> ScanResult:
+        """Obtain scan results for an interface."""
+    
+    @abstractmethod
+    def parse_file(self, file_path: str, interface: str) -> ScanResult:
+        """Parse recorded output (sandbox mode)."""
+
+
+class CommandBackend(ScanBackend):
+    """Base class for backends that run a command and parse its output.
+    
+    Subclasses implement ``command`` and ``parse``.
+    """
+    
+    @abstractmethod
+    def command(self, interface: str) -> List[str]:
+        """Command line producing the backend's output."""
+    
+    @abstractmethod
+    def parse(self, output: str, interface: str) -> ScanResult:
+        """Parse the backend's output."""
+    
+    async def parse_stream(self, stream: AsyncIterable[bytes], interface: str) -> ScanResult:
+        """Parse output read from an asyncio stream (see ``AsyncWiFiScanner``)."""
+        chunks = [chunk async for chunk in stream]
+        return self.parse(b"".join(chunks).decode('utf-8', errors='replace'), interface)
+    
+    def parse_file(self, file_path: str, interface: str) -> ScanResult:
+        """Parse recorded output (sandbox mode)."""
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Sample file not found: {file_path}")
+        return self.parse(path.read_text(encoding='utf-8', errors='replace'), interface)
+    
+    def run(self, command: List[str]) -> str:
+        """Run a command and return its stdout."""
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            logger.error(f"{self.name} timed out - interface may be busy")
+            raise RuntimeError("Scan timeout")
+        except FileNotFoundError:
+            raise RuntimeError(f"{command[0]} command not available")
+        except OSError as e:
+            raise RuntimeError(f"{command[0]} could not be run: {e}")
+        
+        if result.returncode != 0:
+            logger.error(f"{self.name} failed: {result.stderr}")
+            raise RuntimeError(f"{self.name} scan failed: {result.stderr.strip()}")
+        return result.stdout
+    
+    def scan(self, interface: str) -> ScanResult:
+        """Obtain scan results for an interface."""
+        start = time.perf_counter()
+        scan_result = self.parse(self.run(self.command(interface)), interface)
+        scan_result.scan_duration = time.perf_counter() - start
+        logger.info(f"Scanned {scan_result.total_networks} networks on {interface} via {self.name}")
+        return scan_result
+
+
+@register_backend
+class NL80211Backend(ScanBackend):
+    """Kernel BSS cache over nl80211: no subprocess, no scan triggered."""
+    
+    name = "nl80211"
+    cost = 0
+    
+    def available(self) -> bool:
+        if not hasattr(socket, "AF_NETLINK"):
+            return False
+        try:
+            NL80211Reader(timeout=self.timeout).family_id()
+        except (OSError, RuntimeError):
+            return False
+        return True
+    
+    def parse_file(self, file_path: str, interface: str) -> ScanResult:
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Sample file not found: {file_path}")
+        return ScanResult(interface=interface, networks=parse_scan_dump(path.read_bytes()))
+    
+    def scan(self, interface: str) -> ScanResult:
+        start = time.perf_counter()
+        try:
+            networks = NL80211Reader(timeout=self.timeout).get_networks(interface)
+        except OSError as e:
+            # e.g. PermissionError without CAP_NET_ADMIN
+            raise RuntimeError(f"nl80211 scan failed: {e}")
+        return ScanResult(interface=interface, networks=networks,
+                          scan_duration=time.perf_counter() - start)
+
+
+@register_backend
+class IwBackend(CommandBackend):
+    """``iw dev <iface> scan dump``: the kernel BSS cache as text."""
+    
+    name = "iw"
+    cost = 10
+    tool = "iw"
+    
+    def command(self, interface: str) -> List[str]:
+        return ["iw", "dev", interface, "scan", "dump"]
+    
+    def parse(self, output: str, interface: str) -> ScanResult:
+        return IwScanParser().parse_scan_output(output, interface)
+
+
+@register_backend
+class WpaCliBackend(CommandBackend):
+    """``wpa_cli scan_results``: wpa_supplicant's last results."""
+    
+    name = "wpa_cli"
+    cost = 20
+    tool = "wpa_cli"
+    
+    def command(self, interface: str) -> List[str]:
+        return ["wpa_cli", "-i", interface, "scan_results"]
+    
+    def parse(self, output: str, interface: str) -> ScanResult:
+        return WpaCliParser().parse_scan_output(output, interface)
+
+
+@register_backend
+class NmcliBackend(CommandBackend):
+    """``nmcli device wifi list --rescan no``: NetworkManager's cache."""
+    
+    name = "nmcli"
+    cost = 30
+    tool = "nmcli"
+    
+    def command(self, interface: str) -> List[str]:
+        return ["nmcli", "-t", "-f", ",".join(NMCLI_FIELDS), "device", "wifi", "list",
+                "ifname", interface, "--rescan", "no"]
+    
+    def parse(self, output: str, interface: str) -> ScanResult:
+        return NmcliParser().parse_scan_output(output, interface)
+
+
+@register_backend
+class IwlistBackend(CommandBackend):
+    """``iwlist <iface> scanning``: triggers a fresh scan (slowest)."""
+    
+    name = "iwlist"
+    cost = 100
+    tool = "iwlist"
+    
+    def command(self, interface: str) -> List[str]:
+        return ["iwlist", interface, "scanning"]
+    
+    def parse(self, output: str, interface: str) -> ScanResult:
+        return WiFiParser().parse_scan_output(output, interface)
+    
+    async def parse_stream(self, stream: AsyncIterable[bytes], interface: str) -> ScanResult:
+        # Cells are parsed as iwlist prints them, overlapping parsing with the scan
+        networks = [network async for network in WiFiParser().aiter_networks(stream)]
+        return ScanResult(interface=interface, networks=networks, timestamp=datetime.utcnow())
+    
+    def parse_file(self, file_path: str, interface: str) -> ScanResult:
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Sample file not found: {file_path}")
+        with open(path, encoding='utf-8', errors='replace') as capture:
+            return WiFiParser().parse_scan_stream(capture, interface)
@@ -0,0 +1,181 @@
+"""
+Compact binary encoding of scan results.
+
+Built for shipping scans from survey nodes to a collector. The layout is
+a fixed schema:
+
+- a header: magic, version, flags, timestamp and the scan's scalar fields
+- a table of interned strings: SSIDs, encryption labels, modes, interface
+  names and so on, each stored once
+- the networks, one column per field: BSSIDs packed into 6 bytes each,
+  string fields as indexes into the table, numbers as fixed-size values
+- the per-interface timings
+
+All columns unpack with a single ``struct`` call, and networks are built
+with ``WiFiNetwork.trusted_many``: the layout itself guarantees the field
+types and BSSID format that the validators would check. It round-trips
+``ScanResult`` exactly: floats are stored as doubles, and aware timestamps
+keep their UTC offset.
+"""
+
+import struct
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from .parser import ScanResult, WiFiNetwork
+
+MAGIC = b"XWSR"
+VERSION = 1
+
+# magic, version, flags, timestamp (µs since epoch), UTC offset (µs),
+# scan_duration, cache_age, interface, source, string, network and timing counts
+HEADER = struct.Struct("<4sBBqqddIIIII")
+TIMING = struct.Struct("<Id")
+
+# Network columns after the BSSIDs, in field order; "S" is a string table index
+COLUMNS = (
+    ("ssid", "S"), ("channel", "i"), ("frequency", "d"), ("signal_level", "i"),
+    ("quality", "S"), ("encryption", "S"), ("cipher", "S"), ("authentication", "S"),
+    ("mode", "S"), ("protocol", "S"), ("radio", "S")
+)
+
+FLAG_WIDE = 1  # More strings than fit a 16-bit index
+FLAG_DURATION = 2
+FLAG_CACHE_AGE = 4
+FLAG_AWARE = 8  # Timestamp has a UTC offset
+
+NONE_INDEX = 0xFFFF
+WIDE_NONE_INDEX = 0xFFFFFFFF
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+@lru_cache(maxsize=256)
+def _network_struct(count: int, wide: bool) -> struct.Struct:
+    """Layout of the network columns for ``count`` networks."""
+    index_code = "I" if wide else "H"
+    codes = "".join(f"{count}{index_code if code == 'S' else code}" for _, code in COLUMNS)
+    return struct.Struct(f"<{6 * count}s{codes}")
+
+
+def encode_scan_result(scan_result: ScanResult) -> bytes:
+    """Encode a scan result (see ``ScanResult.to_bytes``)."""
+    strings: Dict[str, int] = {}
+    
+    def intern(value: Optional[str]) -> None:
+        if value is not None and value not in strings:
+            strings[value] = len(strings)
+    
+    intern(scan_result.interface)
+    intern(scan_result.source)
+    for interface in scan_result.interface_timings:
+        intern(interface)
+    networks = scan_result.networks
+    for network in networks:
+        for value in (network.ssid, network.quality, network.encryption, network.cipher,
+                      network.authentication, network.mode, network.protocol, network.radio):
+            intern(value)
+    
+    wide = len(strings) >= NONE_INDEX
+    none_index = WIDE_NONE_INDEX if wide else NONE_INDEX
+    timestamp = scan_result.timestamp
+    offset = timestamp.utcoffset()
+    flags = (FLAG_WIDE if wide else 0) | (FLAG_AWARE if offset is not None else 0)
+    if scan_result.scan_duration is not None:
+        flags |= FLAG_DURATION
+    if scan_result.cache_age is not None:
+        flags |= FLAG_CACHE_AGE
+    
+    values: List[Any] = [b"".join(bytes.fromhex(network.bssid.replace(":", "")) for network in networks)]
+    for field, code in COLUMNS:
+        column = [getattr(network, field) for network in networks]
+        if code == "S":
+            column = [none_index if value is None else strings[value] for value in column]
+        values.extend(column)
+    text = "".join(strings).encode("utf-8", "surrogatepass")
+    try:
+        return b"".join([
+            HEADER.pack(
+                MAGIC, VERSION, flags,
+                (timestamp.replace(tzinfo=None) - EPOCH) // MICROSECOND,
+                offset // MICROSECOND if offset is not None else 0,
+                scan_result.scan_duration or 0.0, scan_result.cache_age or 0.0,
+                strings[scan_result.interface],
+                WIDE_NONE_INDEX if scan_result.source is None else strings[scan_result.source],
+                len(strings), len(networks), len(scan_result.interface_timings)
+            ),
+            struct.pack(f"<{len(strings)}I", *(len(value) for value in strings)),
+            struct.pack("<I", len(text)),
+            text,
+            _network_struct(len(networks), wide).pack(*values),
+            *(TIMING.pack(strings[interface], seconds)
+              for interface, seconds in scan_result.interface_timings.items())
+        ])
+    except struct.error as e:
+        raise ValueError(f"Scan result does not fit the binary format: {e}") from e
+
+
+def decode_scan_result(data: bytes) -> ScanResult:
+    """Decode a scan result (see ``ScanResult.from_bytes``)."""
+    try:
+        return _decode(memoryview(data))
+    except (struct.error, IndexError, KeyError, UnicodeDecodeError) as e:
+        raise ValueError(f"Malformed binary scan result: {e}") from e
+
+
+def _decode(data: memoryview) -> ScanResult:
+    """Decode without translating low-level errors."""
+    (magic, version, flags, micros, offset_micros, scan_duration, cache_age,
+     interface, source, string_count, network_count, timing_count) = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a binary scan result")
+    if version != VERSION:
+        raise ValueError(f"Unsupported binary scan result version: {version}")
+    position = HEADER.size
+    
+    lengths = struct.unpack_from(f"<{string_count}I", data, position)
+    position += 4 * string_count
+    (text_size,) = struct.unpack_from("<I", data, position)
+    position += 4
+    text = str(data[position:position + text_size], "utf-8", "surrogatepass")
+    position += text_size
+    strings: List[str] = []
+    start = 0
+    for length in lengths:
+        strings.append(text[start:start + length])
+        start += length
+    
+    wide = bool(flags & FLAG_WIDE)
+    lookup: Dict[int, Optional[str]] = dict(enumerate(strings))
+    lookup[WIDE_NONE_INDEX if wide else NONE_INDEX] = None
+    layout = _network_struct(network_count, wide)
+    values = layout.unpack_from(data, position)
+    position += layout.size
+    
+    # One "AA:BB:CC:DD:EE:FF:11:22:..." string, split every 18 characters
+    bssid_text = values[0].hex(":").upper()
+    columns: List[Any] = [[bssid_text[start:start + 17] for start in range(0, len(bssid_text), 18)]]
+    for number, (_, code) in enumerate(COLUMNS):
+        column = values[1 + number * network_count:1 + (number + 1) * network_count]
+        columns.append(list(map(lookup.__getitem__, column)) if code == "S" else column)
+    networks = WiFiNetwork.trusted_many(zip(*columns))
+    
+    end = position + TIMING.size * timing_count
+    if len(data) != end:
+        raise ValueError("Binary scan result has trailing or missing data")
+    interface_timings = {strings[name]: seconds for name, seconds in TIMING.iter_unpack(data[position:end])}
+    
+    timestamp = EPOCH + micros * MICROSECOND
+    if flags & FLAG_AWARE:
+        timestamp = timestamp.replace(tzinfo=timezone(offset_micros * MICROSECOND))
+    return ScanResult(
+        timestamp=timestamp,
+        interface=strings[interface],
+        networks=networks,
+        scan_duration=scan_duration if flags & FLAG_DURATION else None,
+        source=strings[source] if source != WIDE_NONE_INDEX else None,
+        interface_timings=interface_timings,
+        cache_age=cache_age if flags & FLAG_CACHE_AGE else None
+    )
@@ -0,0 +1,100 @@
+"""
+Short-lived scan result cache shared between processes.
+
+Tools that scan within seconds of each other (the CLI, the interactive
+menus, user scripts) share one ``ScanResult`` per interface instead of each
+starting a radio scan. Entries live in small JSON files guarded by a file
+lock. A caller that finds the entry stale scans while holding the lock, so
+concurrent callers wait for that scan rather than starting their own.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from pydantic import ValidationError
+
+from .parser import ScanResult
+from .utils import atomic_write_text, file_lock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "xwirless"
+DEFAULT_TTL = 10.0
+
+
+class ScanCache:
+    """Per-interface cache of recent scan results with a time-to-live."""
+    
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+    
+    def _path(self, interface: str) -> Path:
+        """Cache file for an interface."""
+        return self.cache_dir / f"scan_{re.sub(r'[^A-Za-z0-9_.-]', '_', interface)}.json"
+    
+    def get(self, interface: str) -> Optional[ScanResult]:
+        """Return the cached result if it is younger than the TTL, with ``cache_age`` set."""
+        path = self._path(interface)
+        with file_lock(path.with_suffix(".lock"), shared=True):
+            return self._read(path)
+    
+    def put(self, scan_result: ScanResult) -> None:
+        """Store a fresh scan result for its interface."""
+        path = self._path(scan_result.interface)
+        with file_lock(path.with_suffix(".lock")):
+            self._write(path, scan_result)
+    
+    def get_or_scan(self, interface: str, scan: Callable[[], ScanResult]) -> ScanResult:
+        """Return the cached result, or run ``scan`` and cache what it returns.
+        
+        The lock is held while scanning, so callers arriving during a scan
+        receive its result instead of scanning again.
+        """
+        path = self._path(interface)
+        with file_lock(path.with_suffix(".lock")):
+            cached = self._read(path)
+            if cached is not None:
+                return cached
+            scan_result = scan()
+            self._write(path, scan_result)
+            return scan_result
+    
+    def invalidate(self, interface: str) -> None:
+        """Drop the cached result for an interface."""
+        path = self._path(interface)
+        with file_lock(path.with_suffix(".lock")):
+            if path.exists():
+                path.unlink()
+    
+    def _read(self, path: Path) -> Optional[ScanResult]:
+        """Load a fresh entry; stale, missing or unreadable entries give None."""
+        if self.ttl <= 0:
+            return None
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            age = time.time() - entry["cached_at"]
+            if not 0 <= age < self.ttl:
+                return None
+            scan_result = ScanResult.model_validate(entry["result"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, ValidationError) as e:
+            logger.warning(f"Ignoring unreadable scan cache {path}: {e}")
+            return None
+        
+        scan_result.cache_age = age
+        logger.info(f"Using cached scan for {scan_result.interface} ({age:.1f}s old)")
+        return scan_result
+    
+    def _write(self, path: Path, scan_result: ScanResult) -> None:
+        """Atomically replace an entry."""
+        if self.ttl <= 0:
+            return
+        entry = {"cached_at": time.time(), "result": scan_result.model_dump(mode="json")}
+        atomic_write_text(path, json.dumps(entry, ensure_ascii=False))
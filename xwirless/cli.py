@@ -4,15 +4,22 @@ Command-line interface for X WIRELESS.
 
 import click
 import logging
-from typing import Optional
+from typing import List, Optional
+from datetime import datetime, timedelta
 from pathlib import Path
 
 from .scanner import WiFiScanner
-from .parser import WiFiParser
+from .backends import SCAN_BACKENDS, get_backend
+from .cache import DEFAULT_TTL, ScanCache
+from .parser import ScanResult, WiFiParser
 from .report import ReportGenerator
-from .db import InventoryDB
+from .db import open_inventory, load_json_inventory
+from .diff import DEFAULT_SIGNAL_THRESHOLD, iter_scan_diffs
+from .ingest import ingest_directory
+from .monitor import ScanMonitor
+from .scheduler import AdaptiveScheduler
 from .safety import SafetyValidator
-from .utils import setup_logging, get_version_info, format_timestamp
+from .utils import setup_logging, get_version_info, format_timestamp, parse_time
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +28,15 @@ logger = logging.getLogger(__name__)
 @click.option('--log-file', help='Log to file')
 @click.option('--dry-run', is_flag=True, help='Simulate execution without running commands')
 @click.option('--sandbox', help='Use sample file for offline testing')
+@click.option('--db', 'db_path', default='xwirless_inventory.json', show_default=True,
+              help='Inventory database path (.json, .xwl segmented log or .db SQLite)')
+@click.option('--db-backend', type=click.Choice(['auto', 'json', 'log', 'sqlite']),
+              default='auto', show_default=True,
+              help='Inventory database backend (auto picks from the path suffix)')
+@click.option('--db-compression', type=click.Choice(['none', 'gzip', 'zstd']),
+              help='Compress the JSON file or log segments written (default: keep the current format)')
 @click.pass_context
-def cli_main(ctx, verbose, log_file, dry_run, sandbox):
+def cli_main(ctx, verbose, log_file, dry_run, sandbox, db_path, db_backend, db_compression):
     """X WIRELESS - Wi-Fi Audit & Inventory Tool
     
     Educational tool for Wi-Fi network auditing and inventory management.
@@ -40,6 +54,9 @@ def cli_main(ctx, verbose, log_file, dry_run, sandbox):
     ctx.obj['log_file'] = log_file
     ctx.obj['dry_run'] = dry_run
     ctx.obj['sandbox'] = sandbox
+    ctx.obj['db_path'] = db_path
+    ctx.obj['db_backend'] = db_backend
+    ctx.obj['db_compression'] = db_compression
     
     # Check safety modes
     safety = SafetyValidator()
@@ -47,7 +64,8 @@ def cli_main(ctx, verbose, log_file, dry_run, sandbox):
     safety.check_sandbox_mode(sandbox)
 
 @cli_main.command()
-@click.option('--interface', '-i', help='Wireless interface to use')
+@click.option('--interface', '-i',
+              help='Wireless interface to use; a comma separated list or "all" scans several radios at once')
 @click.option('--output', '-o', help='Output file path')
 @click.option('--format', 'output_format', 
               type=click.Choice(['json', 'md', 'csv', 'all']), 
@@ -56,34 +74,46 @@ def cli_main(ctx, verbose, log_file, dry_run, sandbox):
 @click.option('--gist-token', help='GitHub token for Gist upload')
 @click.option('--save-db', is_flag=True, help='Save scan to inventory database')
 @click.option('--badge', is_flag=True, default=True, help='Include author badge in report')
+@click.option('--backend', type=click.Choice(['auto'] + list(SCAN_BACKENDS)), default='auto',
+              show_default=True,
+              help='Scan backend; auto uses the cheapest one available (with --sandbox: the format of the sample file)')
+@click.option('--cache-ttl', type=click.FloatRange(min=0), default=DEFAULT_TTL, show_default=True,
+              help='Reuse a scan of the same interface made within this many seconds by any process '
+                   '(0 disables); a reused scan is not saved again by --save-db')
 @click.pass_context
-def scan(ctx, interface, output, output_format, upload, gist_token, save_db, badge):
+def scan(ctx, interface, output, output_format, upload, gist_token, save_db, badge, backend, cache_ttl):
     """Perform Wi-Fi network scan."""
     try:
         # Initialize components
-        scanner = WiFiScanner(dry_run=ctx.obj['dry_run'])
+        scanner = WiFiScanner(dry_run=ctx.obj['dry_run'], cache=ScanCache(ttl=cache_ttl) if cache_ttl else None)
         parser = WiFiParser()
         reporter = ReportGenerator(author_badge=badge)
         
         # Detect interface if not provided
-        if not interface:
-            interface = scanner.detect_interface()
-            if not interface:
-                click.echo("❌ No wireless interface detected")
-                return
+        interface = interface or scanner.detect_interface()
+        interfaces = _resolve_interfaces(scanner, interface, ctx.obj['sandbox'])
+        if not interfaces:
+            click.echo("❌ No wireless interface detected")
+            return
         
         click.echo(f"🔍 Scanning networks on interface: {interface}")
         
-        # Perform scan
-        if ctx.obj['sandbox']:
-            scan_output = scanner.scan_from_file(ctx.obj['sandbox'])
+        # Perform scan and parse results
+        if ctx.obj['sandbox'] and backend != 'auto':
+            scan_result = get_backend(backend).parse_file(ctx.obj['sandbox'], interface)
+        elif ctx.obj['sandbox']:
+            with scanner.open_scan_file(ctx.obj['sandbox']) as capture:
+                scan_result = parser.parse_scan_stream(capture, interface)
+        elif interface == 'all' or ',' in interface:
+            scan_result = scanner.scan_interfaces(interfaces, backend)
+            for radio, seconds in scan_result.interface_timings.items():
+                click.echo(f"📡 {radio}: {seconds:.2f}s")
         else:
-            scan_output = scanner.scan_networks(interface)
-        
-        # Parse results
-        scan_result = parser.parse_scan_output(scan_output, interface)
+            scan_result = scanner.scan(interface, backend)
         
         click.echo(f"✅ Found {scan_result.total_networks} networks")
+        if scan_result.cache_age is not None:
+            click.echo(f"♻️  Cached scan from {scan_result.cache_age:.1f}s ago")
         
         # Generate reports
         if output_format in ['json', 'all']:
@@ -120,9 +150,12 @@ def scan(ctx, interface, output, output_format, upload, gist_token, save_db, bad
             if gist_url:
                 click.echo(f"🌐 Report uploaded: {gist_url}")
         
-        # Save to database
-        if save_db:
-            db = InventoryDB()
+        # Save to database; a cached result was already saved by the scan that made it
+        if save_db and scan_result.cache_age is not None:
+            click.echo("💾 Cached scan not saved again to the database")
+        elif save_db:
+            db = open_inventory(ctx.obj['db_path'], ctx.obj['db_backend'],
+                                compression=ctx.obj['db_compression'])
             scan_id = db.save_scan(scan_result)
             click.echo(f"💾 Scan saved to database: {scan_id}")
         
@@ -130,16 +163,68 @@ def scan(ctx, interface, output, output_format, upload, gist_token, save_db, bad
         click.echo(f"❌ Scan failed: {e}", err=True)
         logger.error(f"Scan error: {e}", exc_info=True)
 
+def _resolve_interfaces(scanner: WiFiScanner, interface: Optional[str], sandbox: Optional[str]) -> List[str]:
+    """Radios named by ``--interface``; sample files are parsed under the name as given."""
+    if not interface:
+        return []
+    if sandbox:
+        return [interface]
+    return scanner.resolve_interfaces(interface)
+
+def _parse_time_option(ctx, param, value):
+    """Click callback for ISO or relative (``7d``) time options."""
+    if value is None:
+        return None
+    try:
+        return parse_time(value)
+    except ValueError:
+        raise click.BadParameter(f"expected an ISO timestamp or an age like 30m, 24h, 7d: {value}")
+
 @cli_main.command()
-@click.argument('scan_id_1')
-@click.argument('scan_id_2')
+@click.argument('scan_id_1', required=False)
+@click.argument('scan_id_2', required=False)
+@click.option('--since', callback=_parse_time_option,
+              help='Diff every consecutive scan pair from this time (ISO or age like 7d)')
+@click.option('--until', callback=_parse_time_option,
+              help='Stop before this time (ISO or age like 1h)')
+@click.option('--format', 'output_format', type=click.Choice(['text', 'json', 'jsonl']),
+              default='text', show_default=True, help='Output format')
+@click.option('--signal-threshold', type=int,
+              help=f'Minimum signal change (dB) reported as a change event '
+                   f'[default: {DEFAULT_SIGNAL_THRESHOLD}; any change for two scan IDs with text output]')
 @click.option('--output', '-o', help='Output file for comparison report')
 @click.pass_context
-def diff(ctx, scan_id_1, scan_id_2, output):
-    """Compare two scans and show differences."""
+def diff(ctx, scan_id_1, scan_id_2, since, until, output_format, signal_threshold, output):
+    """Compare two scans, or every consecutive pair of scans in a time range.
+    
+    With two scan IDs and text output the classic comparison is shown.
+    Otherwise change events (appeared, disappeared, ssid, signal,
+    encryption, channel) are streamed as they are found.
+    """
+    if scan_id_1 and (since or until):
+        raise click.UsageError("--since/--until select a range of scans; do not combine them with scan IDs")
     try:
-        db = InventoryDB()
-        comparison = db.compare_scans(scan_id_1, scan_id_2)
+        db = open_inventory(ctx.obj['db_path'], ctx.obj['db_backend'], read_only=True)
+        if bool(scan_id_1) != bool(scan_id_2):
+            raise ValueError("Give two scan IDs, or none with --since/--until")
+        
+        if not scan_id_1 or output_format != 'text':
+            if signal_threshold is None:
+                signal_threshold = DEFAULT_SIGNAL_THRESHOLD
+            if scan_id_1:
+                scans = [db.get_scan(scan_id_1), db.get_scan(scan_id_2)]
+                if not all(scans):
+                    raise ValueError("One or both scan IDs not found")
+                events = iter_scan_diffs(scans, signal_threshold)
+            else:
+                events = db.diff_range(since, until, signal_threshold)
+            _write_events(events, output_format, output)
+            return
+        
+        if signal_threshold is None:
+            comparison = db.compare_scans(scan_id_1, scan_id_2)
+        else:
+            comparison = db.compare_scans(scan_id_1, scan_id_2, signal_threshold)
         
         click.echo(f"📊 Comparing scans: {scan_id_1} vs {scan_id_2}")
         click.echo(f"📅 Scan 1: {comparison['scan1_timestamp']}")
@@ -187,14 +272,71 @@ def diff(ctx, scan_id_1, scan_id_2, output):
         click.echo(f"❌ Comparison failed: {e}", err=True)
         logger.error(f"Comparison error: {e}", exc_info=True)
 
+@cli_main.command()
+@click.option('--bssid', help='Only events of this access point')
+@click.option('--kind', type=click.Choice(['appeared', 'ssid', 'channel', 'encryption']),
+              help='Only events of this kind')
+@click.option('--downgrades', is_flag=True, help='Only encryption downgrades (e.g. WPA2 to WEP)')
+@click.option('--since', callback=_parse_time_option, help='From this time (ISO or age like 30d)')
+@click.option('--until', callback=_parse_time_option, help='Before this time (ISO or age like 1h)')
+@click.option('--format', 'output_format', type=click.Choice(['text', 'json', 'jsonl']),
+              default='text', show_default=True, help='Output format')
+@click.option('--output', '-o', help='Output file for the events')
+@click.pass_context
+def events(ctx, bssid, kind, downgrades, since, until, output_format, output):
+    """Show logged per-BSSID change events."""
+    try:
+        db = open_inventory(ctx.obj['db_path'], ctx.obj['db_backend'], read_only=True)
+        if downgrades:
+            found = [event for event in db.encryption_downgrades(since, until)
+                     if bssid is None or event.bssid == bssid]
+        else:
+            found = db.get_change_events(bssid=bssid, kind=kind, since=since, until=until)
+        _write_events(found, output_format, output)
+        
+    except Exception as e:
+        click.echo(f"❌ Event query failed: {e}", err=True)
+        logger.error(f"Event query error: {e}", exc_info=True)
+
+def _write_events(events, output_format: str, output: Optional[str]) -> None:
+    """Stream change events to a file or stdout, one per line (JSON is a single array)."""
+    handle = open(output, 'w', encoding='utf-8') if output else None
+    write = (lambda line: handle.write(line + "\n")) if handle else click.echo
+    count = 0
+    try:
+        if output_format == 'json':
+            write("[")
+        for event in events:
+            if output_format == 'text':
+                write(f"{event.timestamp}  {event.bssid}  {event.describe()}")
+            elif output_format == 'json':
+                write(("  " if count == 0 else ", ") + event.model_dump_json())
+            else:
+                write(event.model_dump_json())
+            count += 1
+        if output_format == 'json':
+            write("]")
+    finally:
+        if handle:
+            handle.close()
+    if output:
+        click.echo(f"📄 {count} change events saved: {output}")
+
 @cli_main.command()
 @click.option('--scan-id', help='Show specific scan details')
 @click.option('--network', help='Show specific network history')
+@click.option('--signal-csv', help='Write the network signal history to a CSV file')
+@click.option('--group-by', type=click.Choice(['ssid', 'channel', 'encryption']),
+              help='Count networks per latest SSID, channel or encryption')
+@click.option('--ssid', help='List networks whose latest SSID matches')
+@click.option('--channel', type=int, help='List networks last seen on this channel')
+@click.option('--encryption', help='List networks whose latest encryption matches (e.g. WEP)')
+@click.option('--seen-within', type=float, help='List networks seen in the last N hours')
 @click.pass_context
-def inventory(ctx, scan_id, network):
+def inventory(ctx, scan_id, network, signal_csv, group_by, ssid, channel, encryption, seen_within):
     """Show inventory database information."""
     try:
-        db = InventoryDB()
+        db = open_inventory(ctx.obj['db_path'], ctx.obj['db_backend'], read_only=True)
         
         if scan_id:
             scan_data = db.get_scan(scan_id)
@@ -214,9 +356,28 @@ def inventory(ctx, scan_id, network):
                 click.echo(f"🕐 Last seen: {network_data['last_seen']}")
                 click.echo(f"📊 Total scans: {network_data['total_scans']}")
                 click.echo(f"📝 SSID history: {', '.join(network_data['ssid_history'])}")
+                if signal_csv:
+                    ReportGenerator().generate_signal_history_csv(network, network_data, signal_csv)
+                    click.echo(f"📄 Signal history saved: {signal_csv}")
             else:
                 click.echo(f"❌ Network not found: {network}")
         
+        elif group_by:
+            counts = db.count_networks_by(group_by)
+            click.echo(f"📊 Networks by {group_by}:")
+            for value, count in sorted(counts.items(), key=lambda item: (-item[1], str(item[0]))):
+                click.echo(f"  • {value if value not in (None, '') else '(none)'}: {count}")
+        
+        elif any(option is not None for option in (ssid, channel, encryption, seen_within)):
+            seen_since = None
+            if seen_within is not None:
+                seen_since = datetime.utcnow() - timedelta(hours=seen_within)
+            bssids = db.find_networks(ssid=ssid, channel=channel, encryption=encryption,
+                                      seen_since=seen_since)
+            click.echo(f"📡 {len(bssids)} matching networks:")
+            for bssid in bssids:
+                click.echo(f"  • {bssid}")
+        
         else:
             stats = db.get_statistics()
             click.echo("📊 Database Statistics:")
@@ -225,16 +386,189 @@ def inventory(ctx, scan_id, network):
             click.echo(f"  • Last scan: {stats['last_scan_date'] or 'Never'}")
             
             # Show recent scans
-            scans = db.get_all_scans()
+            scans = db.get_recent_scans(5)
             if scans:
                 click.echo("\n📅 Recent Scans:")
-                for scan in scans[-5:]:  # Last 5 scans
+                for scan in scans:
                     click.echo(f"  • {scan['id']}: {scan['timestamp']} ({scan['total_networks']} networks)")
         
     except Exception as e:
         click.echo(f"❌ Inventory query failed: {e}", err=True)
         logger.error(f"Inventory error: {e}", exc_info=True)
 
+@cli_main.command()
+@click.option('--scan-id', help='Scan to export (default: the most recent)')
+@click.option('--format', 'output_format', type=click.Choice(['json', 'bin']), default='json',
+              show_default=True, help='json: the scan JSON report; bin: compact binary (ScanResult.from_bytes)')
+@click.option('--output', '-o', help='Output file (default: stdout)')
+@click.pass_context
+def export(ctx, scan_id, output_format, output):
+    """Export a saved scan for shipping to another host."""
+    try:
+        db = open_inventory(ctx.obj['db_path'], ctx.obj['db_backend'], read_only=True)
+        if not scan_id:
+            recent = db.get_recent_scans(1)
+            if not recent:
+                click.echo("❌ No scans in the inventory", err=True)
+                return
+            scan_id = recent[0]['id']
+        
+        scan_data = db.get_scan(scan_id)
+        if not scan_data:
+            click.echo(f"❌ Scan not found: {scan_id}", err=True)
+            return
+        scan_result = ScanResult.model_validate(
+            {key: value for key, value in scan_data.items() if key not in ('id', 'total_networks')}
+        )
+        
+        if output_format == 'bin':
+            payload = scan_result.to_bytes()
+        else:
+            payload = ReportGenerator().generate_json_report(scan_result).encode('utf-8')
+        if output:
+            Path(output).write_bytes(payload)
+            click.echo(f"📄 Scan {scan_id} exported: {output} ({len(payload)} bytes)")
+        else:
+            click.get_binary_stream('stdout').write(payload)
+        
+    except Exception as e:
+        click.echo(f"❌ Export failed: {e}", err=True)
+        logger.error(f"Export error: {e}", exc_info=True)
+
+@cli_main.command()
+@click.argument('source', type=click.Path(exists=True, dir_okay=False))
+@click.argument('destination')
+@click.option('--backend', type=click.Choice(['auto', 'json', 'log', 'sqlite']),
+              default='auto', help='Destination backend (auto picks from the path suffix)')
+@click.pass_context
+def migrate(ctx, source, destination, backend):
+    """Import a JSON inventory into another database backend."""
+    try:
+        db = open_inventory(destination, backend, compression=ctx.obj['db_compression'])
+        if db.get_statistics()['total_scans']:
+            click.echo(f"❌ Destination is not empty: {destination}", err=True)
+            return
+        
+        db.import_data(load_json_inventory(source))
+        stats = db.get_statistics()
+        click.echo(f"✅ Migrated {stats['total_scans']} scans and "
+                   f"{stats['unique_networks']} networks to {destination}")
+        
+    except Exception as e:
+        click.echo(f"❌ Migration failed: {e}", err=True)
+        logger.error(f"Migration error: {e}", exc_info=True)
+
+@cli_main.command()
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.option('--pattern', default='*', show_default=True, help='Glob pattern of capture files')
+@click.option('--workers', type=int, help='Parser processes (default: CPU count)')
+@click.option('--batch-size', type=click.IntRange(min=1), default=50, show_default=True,
+              help='Scans saved per database commit')
+@click.option('--interface', '-i', default='unknown', show_default=True,
+              help='Interface name for captures without an iwlist header')
+@click.pass_context
+def ingest(ctx, directory, pattern, workers, batch_size, interface):
+    """Bulk-import archived iwlist captures from a directory.
+    
+    Files already in the database are skipped, so an interrupted run can
+    simply be started again.
+    """
+    def progress(report):
+        click.echo(f"  • {report.ingested + report.skipped}/{report.discovered} files, "
+                   f"{report.networks} networks ({report.files_per_second:.1f} files/s)")
+    
+    try:
+        db = open_inventory(ctx.obj['db_path'], ctx.obj['db_backend'],
+                            compression=ctx.obj['db_compression'])
+        click.echo(f"📥 Ingesting captures from {directory}")
+        report = ingest_directory(db, directory, pattern=pattern, workers=workers,
+                                  batch_size=batch_size, interface=interface, progress=progress)
+        
+        click.echo(f"✅ Ingested {report.ingested} files ({report.networks} networks) "
+                   f"in {report.elapsed:.2f}s")
+        click.echo(f"  • {report.files_per_second:.1f} files/s, "
+                   f"{report.networks_per_second:.1f} networks/s")
+        if report.skipped:
+            click.echo(f"  • Skipped {report.skipped} files already ingested")
+        if report.failed:
+            click.echo(f"  • {report.failed} files could not be parsed")
+    
+    except KeyboardInterrupt:
+        click.echo("\n⏸️  Ingestion interrupted; run again to resume", err=True)
+    except Exception as e:
+        click.echo(f"❌ Ingestion failed: {e}", err=True)
+        logger.error(f"Ingestion error: {e}", exc_info=True)
+
+@cli_main.command()
+@click.option('--interface', '-i',
+              help='Wireless interface to use; a comma separated list or "all" scans several radios at once')
+@click.option('--interval', type=click.FloatRange(min=0), default=60.0, show_default=True,
+              help='Seconds between scan starts')
+@click.option('--count', type=click.IntRange(min=1), help='Stop after this many scans')
+@click.option('--adaptive', is_flag=True,
+              help='Adapt the interval: back off while the radio is busy, scan faster while networks change')
+@click.option('--min-interval', type=click.FloatRange(min=0), default=5.0, show_default=True,
+              help='Shortest adaptive interval')
+@click.option('--max-interval', type=click.FloatRange(min=0), default=900.0, show_default=True,
+              help='Longest adaptive interval (backoff cap)')
+@click.option('--backend', type=click.Choice(['auto'] + list(SCAN_BACKENDS)), default='auto',
+              show_default=True,
+              help='Scan backend; auto uses the cheapest one available (with --sandbox: the format of the sample file)')
+@click.option('--flush-interval', type=click.FloatRange(min=0), default=300.0, show_default=True,
+              help='Seconds between writes of a JSON inventory, which is rewritten whole on every write '
+                   '(0 writes after every scan; log and SQLite inventories always save each scan)')
+@click.pass_context
+def monitor(ctx, interface, interval, count, adaptive, min_interval, max_interval, backend, flush_interval):
+    """Scan continuously and save every scan to the inventory.
+    
+    Stops cleanly on SIGTERM or Ctrl+C once the current scan is saved.
+    """
+    try:
+        scanner = WiFiScanner(dry_run=ctx.obj['dry_run'], backend=backend)
+        
+        interface = interface or scanner.detect_interface()
+        interfaces = _resolve_interfaces(scanner, interface, ctx.obj['sandbox'])
+        if not interfaces:
+            click.echo("❌ No wireless interface detected")
+            return
+        interface = ",".join(interfaces)
+        
+        scheduler = None
+        if adaptive:
+            scheduler = AdaptiveScheduler(base_interval=interval, min_interval=min(min_interval, interval),
+                                          max_interval=max(max_interval, interval))
+        
+        db = open_inventory(ctx.obj['db_path'], ctx.obj['db_backend'],
+                            compression=ctx.obj['db_compression'])
+        scan_monitor = ScanMonitor(scanner, WiFiParser(), db, interface,
+                                   interval=interval, sandbox=ctx.obj['sandbox'], scheduler=scheduler,
+                                   backend=backend, flush_interval=flush_interval)
+        scan_monitor.install_signal_handlers()
+        
+        def report_cycle(stats):
+            schedule = f" (next in {stats.next_delay:.1f}s, {stats.decision})" if stats.decision else ""
+            if stats.error:
+                click.echo(f"❌ Cycle {stats.cycle} failed: {stats.error}{schedule}", err=True)
+                return
+            click.echo(f"🔄 Cycle {stats.cycle}: {stats.networks} networks, "
+                       f"scan {stats.scan_time * 1000:.0f}ms, parse {stats.parse_time * 1000:.0f}ms, "
+                       f"save {stats.save_time * 1000:.0f}ms -> {stats.scan_id}{schedule}")
+        
+        click.echo(f"👀 Monitoring {interface} every {interval:g}s"
+                   f"{' (adaptive)' if adaptive else ''} (Ctrl+C to stop)")
+        cycles = scan_monitor.run(max_cycles=count, on_cycle=report_cycle)
+        click.echo(f"✅ Monitor stopped after {cycles} cycles")
+        if scheduler:
+            for metrics in scheduler.snapshot().values():
+                latency = f"{metrics.latency * 1000:.0f}ms" if metrics.latency is not None else "n/a"
+                click.echo(f"📊 {metrics.interface}: {metrics.scans} scans, {metrics.failures} failures "
+                           f"({metrics.busy_failures} busy), latency {latency}, "
+                           f"churn {metrics.churn:.2f}, interval {metrics.interval:.1f}s")
+    
+    except Exception as e:
+        click.echo(f"❌ Monitor failed: {e}", err=True)
+        logger.error(f"Monitor error: {e}", exc_info=True)
+
 @cli_main.command()
 def version():
     """Show version information."""
@@ -0,0 +1,79 @@
+"""
+Optional compression for inventory files.
+
+JSON inventories are compressed whole, and sealed log segments and
+checkpoints have their records compressed (see ``storage``), with gzip or,
+when the ``zstandard`` package is installed, zstd. Readers never need to
+be told: the codec is recognised from the file's magic bytes, and files
+without one are read as plain text.
+"""
+
+import gzip
+from pathlib import Path
+from typing import List, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency: pip install xwirless[zstd]
+    zstandard = None
+
+MAGIC = {
+    "gzip": b"\x1f\x8b",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+MAGIC_SIZE = max(len(magic) for magic in MAGIC.values())
+
+
+def available_codecs() -> List[str]:
+    """Codecs usable for writing in this environment."""
+    return [codec for codec in MAGIC if codec != "zstd" or zstandard is not None]
+
+
+def check_codec(codec: Optional[str]) -> Optional[str]:
+    """Validate a codec name ("none" and None mean uncompressed)."""
+    if codec in (None, "none"):
+        return None
+    if codec not in MAGIC:
+        raise ValueError(f"Unknown compression: {codec}; choose from none, {', '.join(MAGIC)}")
+    if codec == "zstd" and zstandard is None:
+        raise RuntimeError("zstd compression requires the zstandard package")
+    return codec
+
+
+def detect_codec(head: bytes) -> Optional[str]:
+    """Codec whose magic bytes start ``head``, or None for plain data."""
+    for codec, magic in MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def compress(data: bytes, codec: Optional[str]) -> bytes:
+    """Compress ``data``; with no codec it is returned unchanged."""
+    if codec is None:
+        return data
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    return zstandard.ZstdCompressor(level=10).compress(data)
+
+
+def decompress(data: bytes) -> bytes:
+    """Decompress data in any known codec; plain data is returned unchanged."""
+    codec = detect_codec(data[:MAGIC_SIZE])
+    if codec is None:
+        return data
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if zstandard is None:
+        raise RuntimeError("File is zstd-compressed; install the zstandard package to read it")
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+def file_codec(path: Union[str, Path]) -> Optional[str]:
+    """Codec of a file from its magic bytes (None if plain, missing or not a file)."""
+    try:
+        with open(path, "rb") as f:
+            return detect_codec(f.read(MAGIC_SIZE))
+    except OSError:  # Missing, or a directory
+        return None
+
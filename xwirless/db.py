@@ -4,33 +4,126 @@ Database module for inventory management.
 
 import json
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Set, Tuple, Union
+from datetime import datetime, timedelta
 from pathlib import Path
 
 from .parser import ScanResult, WiFiNetwork
+from .history import (
+    EPOCH, MICROSECOND, TIERS, RetentionPolicy, SignalSeries, bucket_start, dump_network,
+    from_epoch_us, json_default, load_network, public_network, record_signal, to_epoch_us, utc_naive
+)
+from .compression import check_codec, compress, decompress, file_codec
+from .diff import (
+    DEFAULT_SIGNAL_THRESHOLD, ChangeEvent, iter_scan_diffs, iter_state_changes, state_changes
+)
+from .indexes import (
+    INDEXED_FIELDS, EventIndex, InventoryIndex, latest_state, state_from_history, to_timestamp
+)
+from .storage import MappedSegment, SegmentLog
+from .utils import atomic_write_bytes, file_lock
 
 logger = logging.getLogger(__name__)
 
+
+_scan_id_lock = threading.Lock()
+_last_scan_micros = 0
+
+
+def new_scan_id() -> str:
+    """A unique scan ID that sorts in save order.
+    
+    ``scan_YYYYMMDD_HHMMSS_ffffff_<random>``: UTC time to the microsecond,
+    bumped so IDs from one process strictly increase, plus 32 random bits
+    against collisions between processes. Older second-resolution IDs
+    (``scan_YYYYMMDD_HHMMSS``) sort before any ID from the same second.
+    """
+    global _last_scan_micros
+    with _scan_id_lock:
+        now = datetime.utcnow()
+        micros = int((now - datetime(1970, 1, 1)).total_seconds()) * 1_000_000 + now.microsecond
+        micros = max(micros, _last_scan_micros + 1)
+        _last_scan_micros = micros
+    moment = datetime(1970, 1, 1) + timedelta(microseconds=micros)
+    return f"scan_{moment.strftime('%Y%m%d_%H%M%S_%f')}_{os.urandom(4).hex()}"
+
+
+def _scan_refs(record: Dict[str, Any]) -> List[str]:
+    """BSSIDs referenced by a scan log record, for the segment index footer."""
+    if record["t"] != "scan":
+        return []
+    return [network["bssid"] for network in record["d"]["networks"]]
+
+
 class InventoryDB:
-    """Lightweight JSON-based inventory database."""
+    """Lightweight JSON-based inventory database.
+    
+    Safe to share between processes: the file is only ever replaced
+    atomically, so readers load it without locking, and writers hold an
+    exclusive lock while saving. A writer whose copy is stale re-reads the
+    file and applies its new scans on top instead of overwriting the scans
+    other processes saved meanwhile. The lock is taken on a separate,
+    empty ``<file>.lock`` next to the inventory, which stays there: the
+    inventory itself is replaced on every save, so a lock on its own
+    descriptor would guard a file that is no longer current.
+    
+    ``compression`` ("gzip" or "zstd") stores the file compressed; "none"
+    stores plain JSON and None keeps whatever the existing file uses.
+    """
+    
+    # Whether a save writes only the new scan; False when it rewrites the whole file
+    incremental_saves = False
     
-    def __init__(self, db_path: str = "xwirless_inventory.json"):
+    def __init__(self, db_path: str = "xwirless_inventory.json",
+                 retention: Optional[RetentionPolicy] = None, compression: Optional[str] = None):
         self.db_path = Path(db_path)
+        self.retention = retention or RetentionPolicy()
+        self.compression = file_codec(self.db_path) if compression is None else check_codec(compression)
+        self._lock_path = self.db_path.with_name(f"{self.db_path.name}.lock")
+        # (inode, size, mtime) of the file version self.data was loaded from or saved as
+        self._disk_version: Optional[Tuple[int, int, int]] = None
+        # Scan records applied inside ``batch()`` and not yet written
+        self._pending: Optional[List[Dict[str, Any]]] = None
         self.data = self._load_database()
+        self._scan_index = self._build_scan_index()
+        self.index = self._build_index()
+        self._event_index: Optional[EventIndex] = None
+    
+    @property
+    def event_index(self) -> EventIndex:
+        """Index of the change event log, built on first query."""
+        if self._event_index is None:
+            self._event_index = self._build_event_index()
+        return self._event_index
+    
+    def close(self) -> None:
+        """Release the database; every save is already on disk."""
     
     def _load_database(self) -> Dict[str, Any]:
         """Load database from file."""
         if self.db_path.exists():
             try:
-                with open(self.db_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.db_path, 'rb') as f:
+                    version = self._file_version(os.fstat(f.fileno()))
+                    data = json.loads(decompress(f.read()))
+                self._load_networks(data["networks"])
+                self._disk_version = version
+                return data
             except Exception as e:
                 logger.error(f"Error loading database: {e}")
                 return self._create_empty_db()
         else:
             return self._create_empty_db()
     
+    def _load_networks(self, networks: Dict[str, Any]) -> None:
+        """Convert stored signal histories to in-memory series."""
+        for network_data in networks.values():
+            load_network(network_data)
+    
     def _create_empty_db(self) -> Dict[str, Any]:
         """Create empty database structure."""
         return {
@@ -39,6 +132,7 @@ class InventoryDB:
             "last_updated": datetime.utcnow().isoformat(),
             "scans": [],
             "networks": {},
+            "events": [],
             "statistics": {
                 "total_scans": 0,
                 "unique_networks": 0,
@@ -48,133 +142,354 @@ class InventoryDB:
     
     def save_scan(self, scan_result: ScanResult) -> str:
         """Save scan result to database."""
-        scan_id = f"scan_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        scan_data = self._build_scan_record(scan_result)
+        scan_id = scan_data["id"]
+        
+        events = self._apply_scan(self.data, scan_data)
+        self._index_scan(scan_data, events)
+        self.data["last_updated"] = datetime.utcnow().isoformat()
+        
+        # Save to storage
+        if self._pending is not None:
+            self._pending.append(scan_data)
+        else:
+            self._persist_scan(scan_data)
+        
+        logger.info(f"Scan saved with ID: {scan_id}")
+        return scan_id
+    
+    def save_scans(self, scan_results: Iterable[ScanResult]) -> List[str]:
+        """Save several scan results with a single write to storage."""
+        records = [self._build_scan_record(scan_result) for scan_result in scan_results]
+        if not records:
+            return []
+        
+        for scan_data in records:
+            events = self._apply_scan(self.data, scan_data)
+            self._index_scan(scan_data, events)
+        self.data["last_updated"] = datetime.utcnow().isoformat()
+        if self._pending is not None:
+            self._pending.extend(records)
+        else:
+            self._persist_scans(records)
+        
+        logger.info(f"Saved {len(records)} scans")
+        return [scan_data["id"] for scan_data in records]
+    
+    @contextmanager
+    def batch(self) -> Iterator["InventoryDB"]:
+        """Group saves: scans saved inside the block are written to storage once, at the end.
+        
+        If the block raises, its scans are dropped and the database is
+        reloaded from storage. Nested blocks join the outermost one.
+        """
+        if self._pending is not None:
+            yield self
+            return
+        self._pending = []
+        try:
+            yield self
+        except BaseException:
+            pending, self._pending = self._pending, None
+            if pending:
+                self._reload()
+            raise
+        pending, self._pending = self._pending, None
+        if pending:
+            self._persist_scans(pending)
+            logger.info(f"Flushed {len(pending)} batched scans")
+    
+    def _reload(self) -> None:
+        """Discard in-memory changes and load the database from storage again."""
+        self.data = self._load_database()
+        self._scan_index = self._build_scan_index()
+        self.index = self._build_index()
+        self._event_index = None
+    
+    def _build_scan_record(self, scan_result: ScanResult) -> Dict[str, Any]:
+        """Serialize a scan result into a stored scan record.
+        
+        Aware timestamps are stored as naive UTC, the form signal history
+        points come back in, so both keep the same timestamp and compare
+        correctly with other scans.
+        """
+        scan_id = new_scan_id()
         
         scan_data = {
             "id": scan_id,
-            "timestamp": scan_result.timestamp.isoformat(),
+            "timestamp": utc_naive(scan_result.timestamp).isoformat(),
             "interface": scan_result.interface,
             "total_networks": scan_result.total_networks,
             "scan_duration": scan_result.scan_duration,
-            "networks": [network.dict() for network in scan_result.networks]
+            "networks": [network.to_dict() for network in scan_result.networks]
         }
+        if scan_result.source:
+            scan_data["source"] = scan_result.source
+        if scan_result.interface_timings:
+            scan_data["interface_timings"] = scan_result.interface_timings
+        return scan_data
+        
+    def _apply_scan(self, data: Dict[str, Any], scan_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fold a scan record into scans, networks, change events and statistics.
         
-        # Add to scans list
-        self.data["scans"].append(scan_data)
+        Returns the change events it logged.
+        """
+        data["scans"].append(scan_data)
+        events: List[Dict[str, Any]] = []
+        if data.get("events") is None:
+            # Event log not loaded yet (legacy file); rebuilt from the scans later
+            self._update_networks(data["networks"], scan_data)
+        else:
+            self._update_networks(data["networks"], scan_data, events)
+            data["events"].extend(events)
+        
+        # Update statistics
+        data["statistics"]["total_scans"] = len(data["scans"])
+        data["statistics"]["unique_networks"] = len(data["networks"])
+        data["statistics"]["last_scan_date"] = scan_data["timestamp"]
+        return events
+    
+    def _update_networks(self, networks: Dict[str, Any], scan_data: Dict[str, Any],
+                         events: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Update per-BSSID inventory records from a scan record.
         
-        # Update networks inventory
-        for network in scan_result.networks:
-            bssid = network.bssid
-            if bssid not in self.data["networks"]:
-                self.data["networks"][bssid] = {
-                    "first_seen": scan_result.timestamp.isoformat(),
-                    "last_seen": scan_result.timestamp.isoformat(),
+        When ``events`` is given, changes against each BSSID's last known
+        state are appended to it. An observation older than a BSSID's
+        ``last_seen`` (an out-of-order save) is added to its history but
+        leaves its latest state alone and logs no changes.
+        """
+        timestamp = scan_data["timestamp"]
+        for network in scan_data["networks"]:
+            bssid = network["bssid"]
+            network_data = networks.get(bssid)
+            newer = network_data is None or timestamp >= network_data["last_seen"]
+            if events is not None and newer:
+                previous = network_data["latest"] if network_data is not None else None
+                events.extend(state_changes(previous, network, timestamp, scan_data["id"]))
+            if network_data is None:
+                network_data = networks[bssid] = {
+                    "first_seen": timestamp,
+                    "last_seen": timestamp,
                     "ssid_history": [],
-                    "signal_history": [],
+                    "signal_history": SignalSeries(),
+                    "signal_rollups": {"hour": [], "day": []},
                     "encryption_history": [],
                     "total_scans": 0
                 }
             
             # Update network data
-            network_data = self.data["networks"][bssid]
-            network_data["last_seen"] = scan_result.timestamp.isoformat()
+            if newer:
+                network_data["last_seen"] = timestamp
+                network_data["latest"] = latest_state(network)
+            else:
+                network_data["first_seen"] = min(network_data["first_seen"], timestamp)
             network_data["total_scans"] += 1
             
             # Track SSID changes
-            if network.ssid not in network_data["ssid_history"]:
-                network_data["ssid_history"].append(network.ssid)
+            if network["ssid"] not in network_data["ssid_history"]:
+                network_data["ssid_history"].append(network["ssid"])
             
-            # Track signal level
-            network_data["signal_history"].append({
-                "timestamp": scan_result.timestamp.isoformat(),
-                "signal_level": network.signal_level,
-                "quality": network.quality
-            })
+            # Track signal level, rolling up points past the raw window
+            record_signal(network_data, {
+                "timestamp": timestamp,
+                "signal_level": network["signal_level"],
+                "quality": network["quality"]
+            }, self.retention)
             
             # Track encryption changes
-            if network.encryption not in network_data["encryption_history"]:
-                network_data["encryption_history"].append(network.encryption)
-        
-        # Update statistics
-        self.data["statistics"]["total_scans"] = len(self.data["scans"])
-        self.data["statistics"]["unique_networks"] = len(self.data["networks"])
-        self.data["statistics"]["last_scan_date"] = scan_result.timestamp.isoformat()
-        self.data["last_updated"] = datetime.utcnow().isoformat()
+            if network["encryption"] not in network_data["encryption_history"]:
+                network_data["encryption_history"].append(network["encryption"])
+    
+    def _build_index(self) -> InventoryIndex:
+        """Index the latest state of every network record.
         
-        # Save to file
+        Records written before states were tracked get theirs from the most
+        recent scan that saw them.
+        """
+        networks = self.data["networks"]
+        missing = {bssid for bssid, network_data in networks.items() if "latest" not in network_data}
+        for scan_data in reversed(self.data["scans"]):
+            if not missing:
+                break
+            for network in scan_data["networks"]:
+                if network["bssid"] in missing:
+                    networks[network["bssid"]]["latest"] = latest_state(network)
+                    missing.discard(network["bssid"])
+        for bssid in missing:
+            networks[bssid]["latest"] = state_from_history(networks[bssid])
+        return InventoryIndex.from_states(
+            (bssid, network_data["latest"], network_data["last_seen"])
+            for bssid, network_data in networks.items()
+        )
+    
+    def _build_scan_index(self) -> Dict[str, int]:
+        """Map scan IDs to their position; a legacy ID saved twice resolves to the first scan."""
+        scan_index: Dict[str, int] = {}
+        for position, scan_data in enumerate(self.data["scans"]):
+            scan_index.setdefault(scan_data["id"], position)
+        return scan_index
+    
+    def _build_event_index(self) -> EventIndex:
+        """Index the change event log, replaying scans of inventories saved before it existed."""
+        return EventIndex(self._backfill_events())
+    
+    def _backfill_events(self) -> List[Dict[str, Any]]:
+        """The change event log, rebuilt from the scans if the inventory predates it."""
+        if self.data.get("events") is None:
+            self.data["events"] = list(iter_state_changes(self.data["scans"]))
+        return self.data["events"]
+    
+    def _index_scan(self, scan_data: Dict[str, Any], events: List[Dict[str, Any]]) -> None:
+        """Index a newly applied scan, move its networks to their new index entries and index its events."""
+        self._scan_index.setdefault(scan_data["id"], len(self.data["scans"]) - 1)
+        for network in scan_data["networks"]:
+            self.index.update(network["bssid"], latest_state(network), scan_data["timestamp"])
+        if self._event_index is not None:
+            for event in events:
+                self._event_index.add(event)
+    
+    def _persist_scan(self, scan_data: Dict[str, Any]) -> None:
+        """Write a newly applied scan to storage."""
+        self._persist_scans([scan_data])
+    
+    def _persist_scans(self, records: List[Dict[str, Any]]) -> None:
+        """Write a batch of newly applied scans, merging scans saved by other processes."""
+        with file_lock(self._lock_path):
+            if self._current_disk_version() != self._disk_version:
+                self._merge_from_disk(records)
+            self._write_database()
+    
+    @staticmethod
+    def _file_version(stat: os.stat_result) -> Tuple[int, int, int]:
+        """Identify a version of the file; every save replaces the inode."""
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+    
+    def _current_disk_version(self) -> Optional[Tuple[int, int, int]]:
+        """Version of the file on disk now, or None if there is none."""
+        try:
+            return self._file_version(self.db_path.stat())
+        except FileNotFoundError:
+            return None
+    
+    def _merge_from_disk(self, records: List[Dict[str, Any]]) -> None:
+        """Reload the file another process saved and re-apply our unsaved scans to it."""
+        self._reload()
+        data = self.data
+        for scan_data in records:
+            self._index_scan(scan_data, self._apply_scan(data, scan_data))
+        data["last_updated"] = datetime.utcnow().isoformat()
+        logger.info(f"Merged scans saved concurrently to {self.db_path}")
+    
+    def ingested_sources(self) -> Set[str]:
+        """Capture files that scans in the database were loaded from."""
+        return {scan["source"] for scan in self.data["scans"] if scan.get("source")}
+    
+    def import_data(self, data: Dict[str, Any]) -> None:
+        """Replace the database contents with a JSON inventory document."""
+        self._load_networks(data["networks"])
+        self.data = data
+        self._scan_index = self._build_scan_index()
+        self.index = self._build_index()
+        self._event_index = None
         self._save_database()
-        
-        logger.info(f"Scan saved with ID: {scan_id}")
-        return scan_id
+        logger.info(f"Imported {len(data['scans'])} scans into {self.db_path}")
     
     def get_scan(self, scan_id: str) -> Optional[Dict[str, Any]]:
         """Get scan by ID."""
-        for scan in self.data["scans"]:
-            if scan["id"] == scan_id:
-                return scan
-        return None
+        position = self._scan_index.get(scan_id)
+        return self.data["scans"][position] if position is not None else None
     
     def get_all_scans(self) -> List[Dict[str, Any]]:
         """Get all scans."""
         return self.data["scans"]
     
+    def _iter_all_scans(self) -> Iterator[Dict[str, Any]]:
+        """Scans in save order."""
+        return iter(self.data["scans"])
+    
+    def get_recent_scans(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get the most recent scans, oldest first."""
+        return self.data["scans"][-limit:]
+    
     def get_network_history(self, bssid: str) -> Optional[Dict[str, Any]]:
         """Get network history by BSSID."""
-        return self.data["networks"].get(bssid)
+        network_data = self.data["networks"].get(bssid)
+        return public_network(network_data) if network_data else None
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics."""
         return self.data["statistics"]
     
-    def compare_scans(self, scan_id_1: str, scan_id_2: str) -> Dict[str, Any]:
-        """Compare two scans and highlight differences."""
+    def find_networks(self, ssid: Optional[str] = None, channel: Optional[int] = None,
+                      encryption: Optional[str] = None,
+                      seen_since: Optional[Union[str, datetime]] = None) -> List[str]:
+        """BSSIDs whose latest SSID, channel and encryption match, optionally seen since a time.
+        
+        Answered from the secondary indexes; no network record is read.
+        """
+        return self.index.find(ssid=ssid, channel=channel, encryption=encryption, seen_since=seen_since)
+    
+    def count_networks_by(self, field: str) -> Dict[Any, int]:
+        """Number of networks per latest value of ``ssid``, ``channel`` or ``encryption``."""
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Cannot group networks by {field}; choose from {', '.join(INDEXED_FIELDS)}")
+        return self.index.counts(field)
+    
+    def get_change_events(self, bssid: Optional[str] = None, kind: Optional[str] = None,
+                          since: Optional[Union[str, datetime]] = None,
+                          until: Optional[Union[str, datetime]] = None) -> List[ChangeEvent]:
+        """Logged change events with ``since <= timestamp < until``, oldest first."""
+        return [ChangeEvent(**event) for event in self.event_index.query(bssid, kind, since, until)]
+    
+    def encryption_downgrades(self, since: Optional[Union[str, datetime]] = None,
+                              until: Optional[Union[str, datetime]] = None) -> List[ChangeEvent]:
+        """Encryption changes to a weaker scheme (e.g. WPA2 to WEP)."""
+        return [event for event in self.get_change_events(kind="encryption", since=since, until=until)
+                if event.is_downgrade]
+    
+    def iter_scans(self, since: Optional[Union[str, datetime]] = None,
+                   until: Optional[Union[str, datetime]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield scans in save order with ``since <= timestamp < until``."""
+        since, until = to_timestamp(since), to_timestamp(until)
+        for scan in self._iter_all_scans():
+            if (since is None or scan["timestamp"] >= since) and (until is None or scan["timestamp"] < until):
+                yield scan
+    
+    def diff_range(self, since: Optional[Union[str, datetime]] = None,
+                   until: Optional[Union[str, datetime]] = None,
+                   signal_threshold: int = DEFAULT_SIGNAL_THRESHOLD) -> Iterator[ChangeEvent]:
+        """Stream the changes between every consecutive pair of scans in a time range."""
+        return iter_scan_diffs(self.iter_scans(since, until), signal_threshold)
+    
+    def compare_scans(self, scan_id_1: str, scan_id_2: str, signal_threshold: int = 1) -> Dict[str, Any]:
+        """Compare two scans and highlight differences.
+        
+        Signal changes smaller than ``signal_threshold`` dB are not reported.
+        """
         scan1 = self.get_scan(scan_id_1)
         scan2 = self.get_scan(scan_id_2)
         
         if not scan1 or not scan2:
             raise ValueError("One or both scan IDs not found")
         
-        # Extract networks
-        networks1 = {net["bssid"]: net for net in scan1["networks"]}
-        networks2 = {net["bssid"]: net for net in scan2["networks"]}
-        
-        # Find differences
-        bssids1 = set(networks1.keys())
-        bssids2 = set(networks2.keys())
-        
-        new_networks = bssids2 - bssids1
-        disappeared_networks = bssids1 - bssids2
-        common_networks = bssids1 & bssids2
-        
-        # Check for changes in common networks
-        changed_networks = []
-        for bssid in common_networks:
-            net1 = networks1[bssid]
-            net2 = networks2[bssid]
-            
-            changes = []
-            if net1["ssid"] != net2["ssid"]:
-                changes.append(f"SSID: {net1['ssid']} → {net2['ssid']}")
-            if net1["signal_level"] != net2["signal_level"]:
-                changes.append(f"Signal: {net1['signal_level']} → {net2['signal_level']} dBm")
-            if net1["encryption"] != net2["encryption"]:
-                changes.append(f"Encryption: {net1['encryption']} → {net2['encryption']}")
-            if net1["channel"] != net2["channel"]:
-                changes.append(f"Channel: {net1['channel']} → {net2['channel']}")
-            
-            if changes:
-                changed_networks.append({
-                    "bssid": bssid,
-                    "changes": changes
-                })
+        new_networks, disappeared_networks = [], []
+        changes: Dict[str, List[str]] = {}
+        for event in iter_scan_diffs([scan1, scan2], signal_threshold):
+            if event.kind == "appeared":
+                new_networks.append(event.bssid)
+            elif event.kind == "disappeared":
+                disappeared_networks.append(event.bssid)
+            else:
+                changes.setdefault(event.bssid, []).append(event.describe())
+        changed_networks = [{"bssid": bssid, "changes": descriptions} for bssid, descriptions in changes.items()]
         
         return {
             "scan1": scan_id_1,
             "scan2": scan_id_2,
             "scan1_timestamp": scan1["timestamp"],
             "scan2_timestamp": scan2["timestamp"],
-            "new_networks": list(new_networks),
-            "disappeared_networks": list(disappeared_networks),
+            "new_networks": new_networks,
+            "disappeared_networks": disappeared_networks,
             "changed_networks": changed_networks,
             "summary": {
                 "total_new": len(new_networks),
@@ -184,11 +499,1035 @@ class InventoryDB:
         }
     
     def _save_database(self) -> None:
-        """Save database to file."""
+        """Save database to file, replacing whatever is there."""
+        with file_lock(self._lock_path):
+            self._write_database()
+    
+    def _write_database(self) -> None:
+        """Atomically replace the file with ``self.data``; the caller holds the lock."""
+        # An inventory saved before the event log gets it on its first write
+        self._backfill_events()
         try:
-            with open(self.db_path, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
+            if self.compression:
+                text = json.dumps(self.data, ensure_ascii=False, separators=(",", ":"), default=json_default)
+            else:
+                text = json.dumps(self.data, indent=2, ensure_ascii=False, default=json_default)
+            atomic_write_bytes(self.db_path, compress(text.encode("utf-8"), self.compression))
+            self._disk_version = self._current_disk_version()
             logger.debug(f"Database saved to: {self.db_path}")
         except Exception as e:
             logger.error(f"Error saving database: {e}")
-            raise
\ No newline at end of file
+            raise
+
+
+class SegmentedInventoryDB(InventoryDB):
+    """Inventory database backed by an append-only segmented log.
+    
+    Each saved scan is appended to the active log segment, followed by the
+    change events it logged (if any), so the cost of ``save_scan`` depends
+    on the size of the scan rather than the history. Every
+    ``compact_every`` sealed segments the folded network state is written
+    to a checkpoint, so loading only replays scans saved since; the events
+    stay in the segments and are not rewritten by compaction.
+    
+    A writable handle keeps the scan records in memory like ``InventoryDB``,
+    since the comparison, export and retention code works on them; queries
+    that only read go through ``LazyInventoryDB`` and decode on demand.
+    
+    Several processes can write to the same log: every append and
+    compaction holds the log's writer lock, and a writer that finds records
+    appended by another process reloads and applies its own scans on top,
+    as ``InventoryDB`` does with a file saved concurrently.
+    """
+    
+    incremental_saves = True
+    
+    def __init__(self, db_path: str = "xwirless_inventory.xwl",
+                 retention: Optional[RetentionPolicy] = None,
+                 segment_size: int = 256, compact_every: int = 4,
+                 compression: Optional[str] = None):
+        self.log = SegmentLog(Path(db_path), segment_size=segment_size, refs=_scan_refs,
+                              compression=compression)
+        self.compact_every = compact_every
+        self._watermark = 0
+        # Whether every checkpointed scan has its events in the segments
+        self._events_in_log = False
+        # Scans with an events record in the log
+        self._logged_event_scans: Set[str] = set()
+        # Events of applied scans not yet appended to the log, by scan ID
+        self._scan_events: Dict[str, List[Dict[str, Any]]] = {}
+        with self.log.lock():
+            self.log.refresh()
+            super().__init__(db_path, retention, self.log.compression or "none")
+            if not self._events_in_log:
+                self._log_missing_events()
+    
+    def _load_database(self) -> Dict[str, Any]:
+        """Load the checkpoint and replay scans appended after it."""
+        data = self._create_empty_db()
+        self._events_in_log = False
+        checkpoint = self.log.read_checkpoint()
+        if checkpoint:
+            meta = checkpoint["meta"]
+            data["version"] = meta["version"]
+            data["created_at"] = meta["created_at"]
+            data["last_updated"] = meta["last_updated"]
+            data["statistics"] = meta["statistics"]
+            data["networks"] = checkpoint.get("network", {})
+            self._events_in_log = meta.get("event_log") == "segments"
+            if not self._events_in_log:
+                # Older checkpoints hold the whole event log, or none before it existed
+                data["events"] = checkpoint.get("events")
+            self._load_networks(data["networks"])
+            self._watermark = meta["watermark"]
+        
+        self._logged_event_scans = set()
+        for number, record in self.log.iter_records():
+            if record["t"] == "events":
+                self._logged_event_scans.add(record["k"])
+                # Events of later scans are logged again as they are replayed
+                if number <= self._watermark and self._events_in_log:
+                    data["events"].extend(record["d"])
+            elif record["t"] != "scan":
+                continue
+            elif number <= self._watermark:
+                data["scans"].append(record["d"])
+            else:
+                self._apply_scan(data, record["d"])
+                data["last_updated"] = data["statistics"]["last_scan_date"]
+        
+        self._scan_events = {}
+        data["statistics"]["total_scans"] = len(data["scans"])
+        return data
+    
+    def _apply_scan(self, data: Dict[str, Any], scan_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fold a scan in and keep its events until the scan is appended to the log."""
+        events = super()._apply_scan(data, scan_data)
+        if events:
+            self._scan_events[scan_data["id"]] = events
+        return events
+    
+    def _log_records(self, records: List[Dict[str, Any]]) -> Iterator[Tuple[str, Optional[str], Any]]:
+        """Log records of scans, each followed by its events."""
+        for scan_data in records:
+            yield "scan", scan_data["id"], scan_data
+            events = self._scan_events.pop(scan_data["id"], None)
+            if events:
+                self._logged_event_scans.add(scan_data["id"])
+                yield "events", scan_data["id"], events
+    
+    def _log_missing_events(self) -> None:
+        """Append the events of scans saved before events were kept in the segments.
+        
+        The event log of such a file is taken from its checkpoint, or
+        rebuilt from the scans, and then checkpointed so it is not rebuilt
+        again.
+        """
+        missing: Dict[str, List[Dict[str, Any]]] = {}
+        for event in self._backfill_events():
+            if event["scan_id"] not in self._logged_event_scans:
+                missing.setdefault(event["scan_id"], []).append(event)
+        if missing:
+            self.log.append_many(("events", scan_id, events) for scan_id, events in missing.items())
+            self._logged_event_scans.update(missing)
+        if self._watermark:
+            self._compact()
+    
+    @contextmanager
+    def _locked_log(self, records: List[Dict[str, Any]]) -> Iterator[None]:
+        """Hold the log lock, first catching up with records other processes appended.
+        
+        ``records`` are scans applied in memory but not yet appended; they
+        are applied again on top of the reloaded state.
+        """
+        with self.log.lock():
+            if self.log.refresh():
+                self._merge_from_disk(records)
+            yield
+    
+    def _persist_scan(self, scan_data: Dict[str, Any]) -> None:
+        """Append the scan to the log, compacting periodically."""
+        self._persist_scans([scan_data])
+    
+    def _persist_scans(self, records: List[Dict[str, Any]]) -> None:
+        """Append a batch of scans to the log with one fsync per segment."""
+        with self._locked_log(records):
+            self.log.append_many(self._log_records(records))
+            sealed = self.log.active_number() - 1
+            if sealed - self._watermark >= self.compact_every:
+                self._compact()
+    
+    def compact(self) -> None:
+        """Seal the active segment and checkpoint the folded network state."""
+        with self._locked_log([]):
+            self._compact()
+    
+    def _compact(self) -> None:
+        """``compact`` with the log lock already held."""
+        self.log.seal()
+        self._watermark = self.log.active_number() - 1
+        self._write_checkpoint()
+        self._events_in_log = True
+        logger.info(f"Compacted {self.db_path} up to segment {self._watermark}")
+    
+    def _write_checkpoint(self) -> None:
+        """Write networks and statistics up to the current watermark."""
+        meta = {
+            "version": self.data["version"],
+            "created_at": self.data["created_at"],
+            "last_updated": self.data["last_updated"],
+            "statistics": self.data["statistics"],
+            "watermark": self._watermark,
+            "event_log": "segments"
+        }
+        records = [("meta", None, meta)]
+        records.extend(
+            ("network", bssid, dump_network(network_data))
+            for bssid, network_data in self.data["networks"].items()
+        )
+        self.log.write_checkpoint(records)
+    
+    def import_data(self, data: Dict[str, Any]) -> None:
+        """Import a JSON inventory document into new sealed segments."""
+        self._load_networks(data["networks"])
+        self.data = data
+        events: Dict[str, List[Dict[str, Any]]] = {}
+        for event in self._backfill_events():
+            events.setdefault(event["scan_id"], []).append(event)
+        self._scan_events = events
+        with self.log.lock():
+            self.log.refresh()
+            self.log.write_segments(self._log_records(data["scans"]))
+            self._scan_events = {}
+            self._scan_index = self._build_scan_index()
+            self.index = self._build_index()
+            self._event_index = None
+            self._watermark = self.log.active_number() - 1
+            self._write_checkpoint()
+        self._events_in_log = True
+        logger.info(f"Imported {len(data['scans'])} scans into {self.db_path}")
+    
+    def _save_database(self) -> None:
+        """Persist the full state as a compaction."""
+        self.compact()
+
+
+class SQLiteInventoryDB(InventoryDB):
+    """Inventory database backed by SQLite.
+    
+    Scans, per-scan observations and per-BSSID network records live in
+    separate tables indexed on scan ID, BSSID and timestamp, so lookups do
+    not load the whole inventory into memory.
+    
+    Signal history follows the retention policy on write: a network's raw
+    points are its observations since ``rolled_until``, and older ones are
+    folded into the ``signal_rollups`` table as they leave the raw window.
+    """
+    
+    incremental_saves = True
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS scans (
+            rowid INTEGER PRIMARY KEY,
+            id TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            interface TEXT,
+            total_networks INTEGER NOT NULL,
+            scan_duration REAL,
+            source TEXT,
+            interface_timings TEXT
+        );
+        CREATE TABLE IF NOT EXISTS observations (
+            scan_rowid INTEGER NOT NULL REFERENCES scans(rowid),
+            timestamp TEXT NOT NULL,
+            bssid TEXT NOT NULL,
+            ssid TEXT,
+            channel INTEGER,
+            frequency REAL,
+            signal_level INTEGER,
+            quality TEXT,
+            encryption TEXT,
+            cipher TEXT,
+            authentication TEXT,
+            mode TEXT,
+            protocol TEXT,
+            radio TEXT
+        );
+        CREATE TABLE IF NOT EXISTS networks (
+            bssid TEXT PRIMARY KEY,
+            first_seen TEXT NOT NULL,
+            last_seen TEXT NOT NULL,
+            total_scans INTEGER NOT NULL,
+            ssid_history TEXT NOT NULL,
+            encryption_history TEXT NOT NULL,
+            ssid TEXT,
+            channel INTEGER,
+            encryption TEXT,
+            rolled_until TEXT NOT NULL DEFAULT ''
+        );
+        CREATE TABLE IF NOT EXISTS signal_rollups (
+            bssid TEXT NOT NULL,
+            tier TEXT NOT NULL,
+            start TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            low INTEGER NOT NULL,
+            high INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            PRIMARY KEY (bssid, tier, start)
+        );
+        CREATE TABLE IF NOT EXISTS events (
+            rowid INTEGER PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            bssid TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            scan_id TEXT,
+            old TEXT,
+            new TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_scans_id ON scans(id);
+        CREATE INDEX IF NOT EXISTS idx_scans_timestamp ON scans(timestamp);
+        CREATE INDEX IF NOT EXISTS idx_observations_scan ON observations(scan_rowid);
+        CREATE INDEX IF NOT EXISTS idx_observations_bssid ON observations(bssid, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_events_bssid ON events(bssid, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_events_kind ON events(kind, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp);
+    """
+    
+    # Created after migrations, since older files lack the indexed columns
+    NETWORK_INDEXES = """
+        CREATE INDEX IF NOT EXISTS idx_networks_ssid ON networks(ssid);
+        CREATE INDEX IF NOT EXISTS idx_networks_channel ON networks(channel);
+        CREATE INDEX IF NOT EXISTS idx_networks_encryption ON networks(encryption);
+        CREATE INDEX IF NOT EXISTS idx_networks_last_seen ON networks(last_seen);
+    """
+    
+    NETWORK_FIELDS = (
+        "bssid", "ssid", "channel", "frequency", "signal_level", "quality",
+        "encryption", "cipher", "authentication", "mode", "protocol", "radio"
+    )
+    
+    # (table, column, type) triples added after the first schema
+    ADDED_COLUMNS = (
+        ("scans", "source", "TEXT"),
+        ("scans", "interface_timings", "TEXT"),
+        ("observations", "radio", "TEXT"),
+        ("networks", "ssid", "TEXT"),
+        ("networks", "channel", "INTEGER"),
+        ("networks", "encryption", "TEXT"),
+        ("networks", "rolled_until", "TEXT NOT NULL DEFAULT ''"),
+    )
+    
+    def __init__(self, db_path: str = "xwirless_inventory.db",
+                 retention: Optional[RetentionPolicy] = None, read_only: bool = False):
+        self.db_path = Path(db_path)
+        self.retention = retention or RetentionPolicy()
+        self._in_batch = False
+        if read_only:
+            self.conn = self._connect_read_only()
+            if self._needs_migration():
+                # A file from an older version: migrate it once through a short-lived writable connection
+                self.conn.close()
+                self._open_writable()
+                self.conn.close()
+                self.conn = self._connect_read_only()
+            return
+        self._open_writable()
+    
+    def _connect_read_only(self) -> sqlite3.Connection:
+        """Open the file without write access."""
+        conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    def _needs_migration(self) -> bool:
+        """Whether the file lacks tables or columns added after it was created."""
+        tables = {row["name"] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if not {"signal_rollups", "events"} <= tables:
+            return True
+        for table, column, _ in self.ADDED_COLUMNS:
+            if column not in {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}:
+                return True
+        return False
+    
+    def _open_writable(self) -> None:
+        """Connect for writing, creating or migrating the schema."""
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        had_events = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events'"
+        ).fetchone() is not None
+        self.conn.executescript(self.SCHEMA)
+        self._migrate_schema()
+        self.conn.executescript(self.NETWORK_INDEXES)
+        if not had_events:
+            with self.conn:
+                self._insert_events(iter_state_changes(self.iter_scans()))
+        with self.conn:
+            now = datetime.utcnow().isoformat()
+            for key, value in (("version", "1.0"), ("created_at", now), ("last_updated", now)):
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)", (key, value)
+                )
+    
+    def _migrate_schema(self) -> None:
+        """Add columns introduced after a database file was created.
+        
+        Network state columns are filled from each BSSID's latest observation,
+        and signal rollups are built from the observations.
+        """
+        for table, column, column_type in self.ADDED_COLUMNS:
+            columns = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            if column in columns:
+                continue
+            with self.conn:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+                if column == "rolled_until":
+                    self._rebuild_rollups()
+                elif table == "networks":
+                    self._backfill_network_state([column])
+    
+    def _backfill_network_state(self, fields: Iterable[str], bssids: Optional[List[str]] = None) -> None:
+        """Fill network state columns from each BSSID's latest observation."""
+        for field in fields:
+            query = (
+                f"UPDATE networks SET {field} = (SELECT {field} FROM observations "
+                "WHERE observations.bssid = networks.bssid "
+                "ORDER BY timestamp DESC, rowid DESC LIMIT 1)"
+            )
+            if bssids is None:
+                self.conn.execute(query)
+            else:
+                self.conn.executemany(f"{query} WHERE bssid = ?", [(bssid,) for bssid in bssids])
+    
+    def _rebuild_rollups(self, bssids: Optional[List[str]] = None) -> None:
+        """Rebuild the signal rollups of some networks (default all) from their observations."""
+        if bssids is None:
+            bssids = [row["bssid"] for row in self.conn.execute("SELECT bssid FROM networks")]
+        for bssid in bssids:
+            self.conn.execute("DELETE FROM signal_rollups WHERE bssid = ?", (bssid,))
+            row = self.conn.execute("SELECT last_seen FROM networks WHERE bssid = ?", (bssid,)).fetchone()
+            self._apply_retention(bssid, row["last_seen"], "")
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+    
+    @contextmanager
+    def batch(self) -> Iterator["SQLiteInventoryDB"]:
+        """Group saves into one transaction, committed at the end of the block."""
+        if self._in_batch:
+            yield self
+            return
+        self._in_batch = True
+        try:
+            with self.conn:
+                yield self
+        finally:
+            self._in_batch = False
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """A transaction of its own, or part of the enclosing ``batch()``."""
+        if self._in_batch:
+            yield
+        else:
+            with self.conn:
+                yield
+    
+    def save_scan(self, scan_result: ScanResult) -> str:
+        """Save scan result to database."""
+        scan_data = self._build_scan_record(scan_result)
+        scan_id = scan_data["id"]
+        
+        with self._transaction():
+            self._insert_scan(scan_data)
+            self._set_meta("last_updated", datetime.utcnow().isoformat())
+        
+        logger.info(f"Scan saved with ID: {scan_id}")
+        return scan_id
+    
+    def save_scans(self, scan_results: Iterable[ScanResult]) -> List[str]:
+        """Save several scan results in a single transaction."""
+        records = [self._build_scan_record(scan_result) for scan_result in scan_results]
+        if not records:
+            return []
+        
+        with self._transaction():
+            for scan_data in records:
+                self._insert_scan(scan_data)
+            self._set_meta("last_updated", datetime.utcnow().isoformat())
+        
+        logger.info(f"Saved {len(records)} scans")
+        return [scan_data["id"] for scan_data in records]
+    
+    def ingested_sources(self) -> Set[str]:
+        """Capture files that scans in the database were loaded from."""
+        rows = self.conn.execute("SELECT DISTINCT source FROM scans WHERE source IS NOT NULL")
+        return {row["source"] for row in rows}
+    
+    def _insert_scan(self, scan_data: Dict[str, Any], update_networks: bool = True) -> None:
+        """Insert a scan with its observations inside the current transaction."""
+        cursor = self.conn.execute(
+            "INSERT INTO scans (id, timestamp, interface, total_networks, scan_duration, source, "
+            "interface_timings) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (scan_data["id"], scan_data["timestamp"], scan_data["interface"],
+             scan_data["total_networks"], scan_data["scan_duration"], scan_data.get("source"),
+             json.dumps(scan_data["interface_timings"]) if "interface_timings" in scan_data else None)
+        )
+        scan_rowid = cursor.lastrowid
+        timestamp = scan_data["timestamp"]
+        self.conn.executemany(
+            f"INSERT INTO observations (scan_rowid, timestamp, {', '.join(self.NETWORK_FIELDS)}) "
+            f"VALUES (?, ?, {', '.join('?' for _ in self.NETWORK_FIELDS)})",
+            [
+                (scan_rowid, timestamp, *(network.get(field) for field in self.NETWORK_FIELDS))
+                for network in scan_data["networks"]
+            ]
+        )
+        if update_networks:
+            for network in scan_data["networks"]:
+                self._update_network_row(network, timestamp, scan_data["id"])
+        self._set_meta("last_scan_date", timestamp)
+    
+    def _update_network_row(self, network: Dict[str, Any], timestamp: str, scan_id: str) -> None:
+        """Update the per-BSSID record for one observation and log its changes."""
+        row = self.conn.execute(
+            "SELECT last_seen, rolled_until, ssid_history, encryption_history, ssid, channel, encryption "
+            "FROM networks WHERE bssid = ?",
+            (network["bssid"],)
+        ).fetchone()
+        newer = row is None or timestamp >= row["last_seen"]
+        if newer:
+            previous = {field: row[field] for field in INDEXED_FIELDS} if row is not None else None
+            self._insert_events(state_changes(previous, network, timestamp, scan_id))
+        if row is None:
+            self.conn.execute(
+                "INSERT INTO networks (bssid, first_seen, last_seen, total_scans, "
+                "ssid_history, encryption_history, ssid, channel, encryption) "
+                "VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?)",
+                (network["bssid"], timestamp, timestamp,
+                 json.dumps([network["ssid"]]), json.dumps([network["encryption"]]),
+                 network["ssid"], network["channel"], network["encryption"])
+            )
+            self._apply_retention(network["bssid"], timestamp, "")
+            return
+        
+        if timestamp < row["rolled_until"]:
+            # A late point already outside the raw window goes straight to its bucket
+            self._merge_points(network["bssid"], [(timestamp, network["signal_level"])])
+        self._apply_retention(network["bssid"], max(timestamp, row["last_seen"]), row["rolled_until"])
+        ssid_history = json.loads(row["ssid_history"])
+        if network["ssid"] not in ssid_history:
+            ssid_history.append(network["ssid"])
+        encryption_history = json.loads(row["encryption_history"])
+        if network["encryption"] not in encryption_history:
+            encryption_history.append(network["encryption"])
+        if not newer:
+            # Older observation (out-of-order save): history only, the latest state stays
+            self.conn.execute(
+                "UPDATE networks SET first_seen = MIN(first_seen, ?), total_scans = total_scans + 1, "
+                "ssid_history = ?, encryption_history = ? WHERE bssid = ?",
+                (timestamp, json.dumps(ssid_history), json.dumps(encryption_history), network["bssid"])
+            )
+            return
+        self.conn.execute(
+            "UPDATE networks SET last_seen = ?, total_scans = total_scans + 1, "
+            "ssid_history = ?, encryption_history = ?, ssid = ?, channel = ?, encryption = ? "
+            "WHERE bssid = ?",
+            (timestamp, json.dumps(ssid_history), json.dumps(encryption_history),
+             network["ssid"], network["channel"], network["encryption"], network["bssid"])
+        )
+    
+    def _apply_retention(self, bssid: str, latest: str, rolled_until: str) -> None:
+        """Roll a network's signal history up to its newest point ``latest`` (see ``record_signal``)."""
+        latest_us = to_epoch_us(latest)
+        cutoff = from_epoch_us(latest_us - self.retention.raw_hours * 3600 * 10 ** 6)
+        if cutoff > rolled_until:
+            rows = self.conn.execute(
+                "SELECT timestamp, signal_level FROM observations "
+                "WHERE bssid = ? AND timestamp >= ? AND timestamp < ?",
+                (bssid, rolled_until, cutoff)
+            ).fetchall()
+            self._merge_points(bssid, [(row["timestamp"], row["signal_level"]) for row in rows])
+            self.conn.execute("UPDATE networks SET rolled_until = ? WHERE bssid = ?", (cutoff, bssid))
+        
+        # Hourly buckets -> daily buckets
+        latest_time = EPOCH + latest_us * MICROSECOND
+        hour_limit = (latest_time - timedelta(days=self.retention.hourly_days, hours=1)).isoformat()
+        rows = self.conn.execute(
+            "SELECT start, count, low, high, total FROM signal_rollups "
+            "WHERE bssid = ? AND tier = 'hour' AND start <= ?",
+            (bssid, hour_limit)
+        ).fetchall()
+        if rows:
+            days: Dict[str, List[int]] = {}
+            for row in rows:
+                start = bucket_start(datetime.fromisoformat(row["start"]), "day")
+                _add_to_bucket(days, start, row["count"], row["low"], row["high"], row["total"])
+            self._merge_buckets(bssid, "day", days)
+            self.conn.execute(
+                "DELETE FROM signal_rollups WHERE bssid = ? AND tier = 'hour' AND start <= ?",
+                (bssid, hour_limit)
+            )
+        
+        # Expire daily buckets
+        if self.retention.daily_days is not None:
+            day_limit = (latest_time - timedelta(days=self.retention.daily_days + 1)).isoformat()
+            self.conn.execute(
+                "DELETE FROM signal_rollups WHERE bssid = ? AND tier = 'day' AND start <= ?",
+                (bssid, day_limit)
+            )
+    
+    def _merge_points(self, bssid: str, points: List[Tuple[str, int]]) -> None:
+        """Fold raw (timestamp, signal level) points into their hourly buckets."""
+        hours: Dict[str, List[int]] = {}
+        for timestamp, level in points:
+            level = max(-128, min(127, level))  # As stored in a SignalSeries
+            start = bucket_start(EPOCH + to_epoch_us(timestamp) * MICROSECOND, "hour")
+            _add_to_bucket(hours, start, 1, level, level, level)
+        self._merge_buckets(bssid, "hour", hours)
+    
+    def _merge_buckets(self, bssid: str, tier: str, buckets: Dict[str, List[int]]) -> None:
+        """Add [count, low, high, total] aggregates to the stored buckets of a tier."""
+        self.conn.executemany(
+            "INSERT INTO signal_rollups (bssid, tier, start, count, low, high, total) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (bssid, tier, start) DO UPDATE SET "
+            "count = count + excluded.count, low = MIN(low, excluded.low), "
+            "high = MAX(high, excluded.high), total = total + excluded.total",
+            [(bssid, tier, start, *aggregate) for start, aggregate in buckets.items()]
+        )
+    
+    def _insert_events(self, events: Iterable[Dict[str, Any]]) -> None:
+        """Append change events inside the current transaction."""
+        self.conn.executemany(
+            "INSERT INTO events (timestamp, bssid, kind, scan_id, old, new) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (event["timestamp"], event["bssid"], event["kind"], event["scan_id"],
+                 json.dumps(event["old"]), json.dumps(event["new"]))
+                for event in events
+            ]
+        )
+    
+    def _set_meta(self, key: str, value: Optional[str]) -> None:
+        """Store a metadata value."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+    
+    def _get_meta(self, key: str) -> Optional[str]:
+        """Read a metadata value."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+    
+    def _scan_from_row(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Materialize a scan dict with its networks."""
+        observations = self.conn.execute(
+            f"SELECT {', '.join(self.NETWORK_FIELDS)} FROM observations "
+            "WHERE scan_rowid = ? ORDER BY rowid",
+            (row["rowid"],)
+        ).fetchall()
+        scan_data = {
+            "id": row["id"],
+            "timestamp": row["timestamp"],
+            "interface": row["interface"],
+            "total_networks": row["total_networks"],
+            "scan_duration": row["scan_duration"],
+            "networks": [dict(observation) for observation in observations]
+        }
+        if row["source"] is not None:
+            scan_data["source"] = row["source"]
+        if row["interface_timings"] is not None:
+            scan_data["interface_timings"] = json.loads(row["interface_timings"])
+        return scan_data
+    
+    def get_scan(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """Get scan by ID."""
+        row = self.conn.execute(
+            "SELECT * FROM scans WHERE id = ? ORDER BY rowid LIMIT 1", (scan_id,)
+        ).fetchone()
+        return self._scan_from_row(row) if row else None
+    
+    def get_all_scans(self) -> List[Dict[str, Any]]:
+        """Get all scans."""
+        rows = self.conn.execute("SELECT * FROM scans ORDER BY rowid").fetchall()
+        return [self._scan_from_row(row) for row in rows]
+    
+    def get_recent_scans(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get the most recent scans, oldest first."""
+        rows = self.conn.execute(
+            "SELECT * FROM scans ORDER BY rowid DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [self._scan_from_row(row) for row in reversed(rows)]
+    
+    def iter_scans(self, since: Optional[Union[str, datetime]] = None,
+                   until: Optional[Union[str, datetime]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield scans in save order with ``since <= timestamp < until``."""
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(to_timestamp(since))
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(to_timestamp(until))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        for row in self.conn.execute(f"SELECT * FROM scans{where} ORDER BY rowid", params).fetchall():
+            yield self._scan_from_row(row)
+    
+    def get_network_history(self, bssid: str) -> Optional[Dict[str, Any]]:
+        """Get network history by BSSID."""
+        row = self.conn.execute(
+            "SELECT * FROM networks WHERE bssid = ?", (bssid,)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        signal_rows = self.conn.execute(
+            "SELECT timestamp, signal_level, quality FROM observations "
+            "WHERE bssid = ? AND timestamp >= ? ORDER BY timestamp, rowid",
+            (bssid, row["rolled_until"])
+        )
+        rollups: Dict[str, List[Dict[str, Any]]] = {tier: [] for tier in TIERS}
+        for bucket in self.conn.execute(
+            "SELECT tier, start, count, low, high, total FROM signal_rollups WHERE bssid = ? ORDER BY start",
+            (bssid,)
+        ):
+            rollups[bucket["tier"]].append({
+                "start": bucket["start"],
+                "count": bucket["count"],
+                "min": bucket["low"],
+                "max": bucket["high"],
+                "sum": bucket["total"],
+                "mean": round(bucket["total"] / bucket["count"], 2)
+            })
+        return {
+            "first_seen": row["first_seen"],
+            "last_seen": row["last_seen"],
+            "ssid_history": json.loads(row["ssid_history"]),
+            "signal_history": SignalSeries.from_points(dict(signal_row) for signal_row in signal_rows).to_points(),
+            "signal_rollups": rollups,
+            "encryption_history": json.loads(row["encryption_history"]),
+            "total_scans": row["total_scans"],
+            "latest": {field: row[field] for field in INDEXED_FIELDS}
+        }
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get database statistics."""
+        total_scans = self.conn.execute("SELECT COUNT(*) FROM scans").fetchone()[0]
+        unique_networks = self.conn.execute("SELECT COUNT(*) FROM networks").fetchone()[0]
+        return {
+            "total_scans": total_scans,
+            "unique_networks": unique_networks,
+            "last_scan_date": self._get_meta("last_scan_date")
+        }
+    
+    def find_networks(self, ssid: Optional[str] = None, channel: Optional[int] = None,
+                      encryption: Optional[str] = None,
+                      seen_since: Optional[Union[str, datetime]] = None) -> List[str]:
+        """BSSIDs whose latest SSID, channel and encryption match, optionally seen since a time."""
+        clauses, params = [], []
+        for field, value in (("ssid", ssid), ("channel", channel), ("encryption", encryption)):
+            if value is not None:
+                clauses.append(f"{field} = ?")
+                params.append(value)
+        if seen_since is not None:
+            clauses.append("last_seen >= ?")
+            params.append(to_timestamp(seen_since))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(f"SELECT bssid FROM networks{where} ORDER BY bssid", params)
+        return [row["bssid"] for row in rows]
+    
+    def count_networks_by(self, field: str) -> Dict[Any, int]:
+        """Number of networks per latest value of ``ssid``, ``channel`` or ``encryption``."""
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Cannot group networks by {field}; choose from {', '.join(INDEXED_FIELDS)}")
+        rows = self.conn.execute(f"SELECT {field} AS value, COUNT(*) AS count FROM networks GROUP BY {field}")
+        return {row["value"]: row["count"] for row in rows}
+    
+    def get_change_events(self, bssid: Optional[str] = None, kind: Optional[str] = None,
+                          since: Optional[Union[str, datetime]] = None,
+                          until: Optional[Union[str, datetime]] = None) -> List[ChangeEvent]:
+        """Logged change events with ``since <= timestamp < until``, oldest first."""
+        clauses, params = [], []
+        for column, operator, value in (("bssid", "=", bssid), ("kind", "=", kind),
+                                        ("timestamp", ">=", to_timestamp(since)),
+                                        ("timestamp", "<", to_timestamp(until))):
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(f"SELECT * FROM events{where} ORDER BY timestamp, rowid", params)
+        return [
+            ChangeEvent(kind=row["kind"], bssid=row["bssid"], timestamp=row["timestamp"],
+                        scan_id=row["scan_id"], old=json.loads(row["old"]), new=json.loads(row["new"]))
+            for row in rows
+        ]
+    
+    def import_data(self, data: Dict[str, Any]) -> None:
+        """Import a JSON inventory document in a single transaction."""
+        with self.conn:
+            for scan in data["scans"]:
+                self._insert_scan(scan, update_networks=False)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO networks (bssid, first_seen, last_seen, total_scans, "
+                "ssid_history, encryption_history, ssid, channel, encryption) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (bssid, network["first_seen"], network["last_seen"], network["total_scans"],
+                     json.dumps(network["ssid_history"]), json.dumps(network["encryption_history"]),
+                     *(network.get("latest", {}).get(field) for field in INDEXED_FIELDS))
+                    for bssid, network in data["networks"].items()
+                ]
+            )
+            # Documents written before network states were tracked
+            self._backfill_network_state(INDEXED_FIELDS, [
+                bssid for bssid, network in data["networks"].items() if "latest" not in network
+            ])
+            self._rebuild_rollups(list(data["networks"]))
+            events = data.get("events")
+            self._insert_events(iter_state_changes(data["scans"]) if events is None else events)
+            self._set_meta("created_at", data["created_at"])
+            self._set_meta("last_updated", data["last_updated"])
+            self._set_meta("last_scan_date", data["statistics"]["last_scan_date"])
+        logger.info(f"Imported {len(data['scans'])} scans into {self.db_path}")
+
+
+def _add_to_bucket(buckets: Dict[str, List[int]], start: str, count: int,
+                   low: int, high: int, total: int) -> None:
+    """Accumulate [count, low, high, total] aggregates by bucket start."""
+    bucket = buckets.get(start)
+    if bucket is None:
+        buckets[start] = [count, low, high, total]
+    else:
+        bucket[0] += count
+        bucket[1] = min(bucket[1], low)
+        bucket[2] = max(bucket[2], high)
+        bucket[3] += total
+
+
+class LazyInventoryDB(InventoryDB):
+    """Read-only, memory-mapped view of a segmented inventory log.
+    
+    Opening parses only the checkpoint header and the segment index footers.
+    Scans and network records are decoded from their offsets on demand, so
+    statistics and single-record queries do not load the inventory. Of a
+    compressed log, only the segment last read from is kept inflated.
+    """
+    
+    def __init__(self, db_path: str = "xwirless_inventory.xwl",
+                 retention: Optional[RetentionPolicy] = None):
+        self.db_path = Path(db_path)
+        self.retention = retention or RetentionPolicy()
+        log = SegmentLog(self.db_path, read_only=True)
+        self._checkpoint = MappedSegment(log.checkpoint_path) if log.checkpoint_path.exists() else None
+        self._segments = [MappedSegment(log.segment_path(number)) for number in log.segment_numbers()]
+        # Position of the segment whose compressed records were inflated last
+        self._inflated: Optional[int] = None
+        
+        self._meta: Dict[str, Any] = {}
+        self._network_offsets: Dict[str, int] = {}
+        if self._checkpoint is not None:
+            self._meta = self._checkpoint.record_at(self._checkpoint.keys_offset("meta"))["d"]
+            self._network_offsets = dict(self._checkpoint.keys("network"))
+        watermark = self._meta.get("watermark", 0)
+        
+        # (segment position, offset) of every scan, in save order
+        self._scan_locations: List[Tuple[int, int]] = []
+        self._scan_index: Dict[str, Tuple[int, int]] = {}
+        # Scans after the checkpoint that mention each BSSID
+        self._tail_refs: Dict[str, List[Tuple[int, int]]] = {}
+        # (segment position, offset) of the checkpointed events records
+        self._event_locations: List[Tuple[int, int]] = []
+        for position, (number, segment) in enumerate(zip(log.segment_numbers(), self._segments)):
+            for scan_id, offset in segment.keys("scan"):
+                self._scan_locations.append((position, offset))
+                self._scan_index.setdefault(scan_id, (position, offset))
+            if number <= watermark:
+                self._event_locations.extend((position, offset) for _, offset in segment.keys("events"))
+                continue
+            if segment.sealed:
+                for bssid, offsets in segment.footer["refs"].items():
+                    self._tail_refs.setdefault(bssid, []).extend((position, offset) for offset in offsets)
+            else:
+                for offset, record in segment.records():
+                    for bssid in _scan_refs(record):
+                        self._tail_refs.setdefault(bssid, []).append((position, offset))
+        self._index: Optional[InventoryIndex] = None
+        self._event_index: Optional[EventIndex] = None
+    
+    @property
+    def index(self) -> InventoryIndex:
+        """Secondary indexes, built on first query from the checkpoint and the tail scans."""
+        if self._index is None:
+            index = InventoryIndex()
+            for bssid, offset in self._network_offsets.items():
+                network_data = self._checkpoint.record_at(offset)["d"]
+                state = network_data.get("latest") or state_from_history(network_data)
+                index.update(bssid, state, network_data["last_seen"])
+            tail = sorted({location for locations in self._tail_refs.values() for location in locations})
+            for location in tail:
+                scan_data = self._read_scan(location)
+                for network in scan_data["networks"]:
+                    index.update(network["bssid"], latest_state(network), scan_data["timestamp"])
+            self._index = index
+        return self._index
+    
+    @property
+    def event_index(self) -> EventIndex:
+        """Checkpointed change events plus events of the tail scans, built on first query."""
+        if self._event_index is None:
+            if self._meta.get("event_log") == "segments":
+                events = [event for position, offset in self._event_locations
+                          for event in self._segment(position).record_at(offset)["d"]]
+            else:
+                try:
+                    events = self._checkpoint.record_at(self._checkpoint.keys_offset("events"))["d"]
+                except (AttributeError, KeyError):
+                    events = None  # No checkpoint, or one written before the event log
+            if events is None and self._network_offsets:
+                events = list(iter_state_changes(self._iter_all_scans()))
+            else:
+                events = events or []
+                networks = {
+                    bssid: load_network(self._checkpoint.record_at(self._network_offsets[bssid])["d"])
+                    for bssid in self._tail_refs if bssid in self._network_offsets
+                }
+                tail = sorted({location for locations in self._tail_refs.values() for location in locations})
+                for location in tail:
+                    self._update_networks(networks, self._read_scan(location), events)
+            self._event_index = EventIndex(events)
+        return self._event_index
+    
+    def close(self) -> None:
+        """Release all memory mappings."""
+        for segment in self._segments:
+            segment.close()
+        if self._checkpoint is not None:
+            self._checkpoint.close()
+    
+    def _read_scan(self, location: Tuple[int, int]) -> Dict[str, Any]:
+        """Decode the scan stored at a (segment position, offset) location."""
+        position, offset = location
+        return self._segment(position).record_at(offset)["d"]
+    
+    def _segment(self, position: int) -> MappedSegment:
+        """The segment at a position, releasing the records inflated from the previous one."""
+        if position != self._inflated:
+            if self._inflated is not None:
+                self._segments[self._inflated].release()
+            self._inflated = position
+        return self._segments[position]
+    
+    def save_scan(self, scan_result: ScanResult) -> str:
+        """Saving is not supported on a read-only view."""
+        raise RuntimeError(f"Inventory opened read-only: {self.db_path}")
+    
+    def save_scans(self, scan_results: Iterable[ScanResult]) -> List[str]:
+        """Saving is not supported on a read-only view."""
+        raise RuntimeError(f"Inventory opened read-only: {self.db_path}")
+    
+    def import_data(self, data: Dict[str, Any]) -> None:
+        """Importing is not supported on a read-only view."""
+        raise RuntimeError(f"Inventory opened read-only: {self.db_path}")
+    
+    def get_scan(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """Get scan by ID."""
+        location = self._scan_index.get(scan_id)
+        return self._read_scan(location) if location else None
+    
+    def get_all_scans(self) -> List[Dict[str, Any]]:
+        """Get all scans (decodes every scan)."""
+        return list(self._iter_all_scans())
+    
+    def _iter_all_scans(self) -> Iterator[Dict[str, Any]]:
+        """Decode scans one at a time, in save order."""
+        for location in self._scan_locations:
+            yield self._read_scan(location)
+    
+    def get_recent_scans(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get the most recent scans, oldest first."""
+        return [self._read_scan(location) for location in self._scan_locations[-limit:]]
+    
+    def get_network_history(self, bssid: str) -> Optional[Dict[str, Any]]:
+        """Get network history by BSSID, replaying only scans that mention it."""
+        networks: Dict[str, Any] = {}
+        if bssid in self._network_offsets:
+            networks[bssid] = load_network(self._checkpoint.record_at(self._network_offsets[bssid])["d"])
+        for location in self._tail_refs.get(bssid, []):
+            scan_data = self._read_scan(location)
+            self._update_networks(networks, {
+                "timestamp": scan_data["timestamp"],
+                "networks": [network for network in scan_data["networks"] if network["bssid"] == bssid]
+            })
+        return public_network(networks[bssid]) if bssid in networks else None
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get database statistics from the indexes."""
+        last_scan_date = self._meta.get("statistics", {}).get("last_scan_date")
+        if self._scan_locations:
+            last_scan_date = self._read_scan(self._scan_locations[-1])["timestamp"]
+        return {
+            "total_scans": len(self._scan_locations),
+            "unique_networks": len(self._network_offsets.keys() | self._tail_refs.keys()),
+            "last_scan_date": last_scan_date
+        }
+
+
+BACKENDS = {
+    "json": InventoryDB,
+    "log": SegmentedInventoryDB,
+    "sqlite": SQLiteInventoryDB,
+}
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+def open_inventory(db_path: str = "xwirless_inventory.json", backend: str = "auto",
+                   read_only: bool = False, compression: Optional[str] = None) -> InventoryDB:
+    """Open an inventory database.
+    
+    With ``backend="auto"`` the backend is chosen from the path: ``.xwl``
+    paths use the segmented log, ``.db``/``.sqlite`` paths use SQLite and
+    anything else is a JSON file. ``read_only`` opens segmented logs as a
+    lazy memory-mapped view and SQLite databases without write access (a file
+    from an older version is migrated first); JSON files are always loaded
+    in full.
+    
+    ``compression`` ("none", "gzip" or "zstd") applies to JSON files and
+    log segments written from now on; None keeps the existing format.
+    Compressed files are recognised on load whatever it is set to.
+    """
+    if backend == "auto":
+        path = Path(db_path)
+        if path.suffix == ".xwl" or path.is_dir():
+            backend = "log"
+        elif path.suffix in SQLITE_SUFFIXES:
+            backend = "sqlite"
+        else:
+            backend = "json"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown database backend: {backend}")
+    if backend == "sqlite" and check_codec(compression):
+        raise ValueError("SQLite inventories cannot be compressed")
+    if read_only:
+        if not Path(db_path).exists():
+            # An empty in-memory inventory; nothing is written until a save
+            return InventoryDB(db_path)
+        if backend == "log":
+            return LazyInventoryDB(db_path)
+        if backend == "sqlite":
+            return SQLiteInventoryDB(db_path, read_only=True)
+    if backend == "sqlite":
+        return SQLiteInventoryDB(db_path)
+    return BACKENDS[backend](db_path, compression=compression)
+
+
+def load_json_inventory(json_path: str) -> Dict[str, Any]:
+    """Read a legacy ``xwirless_inventory.json`` document (plain or compressed)."""
+    with open(json_path, 'rb') as f:
+        return json.loads(decompress(f.read()))
@@ -0,0 +1,128 @@
+"""
+Streaming scan diffs and per-BSSID change events.
+
+``iter_scan_diffs`` walks scans in save order and yields a ``ChangeEvent``
+for every network that appeared, disappeared, or changed SSID, channel,
+encryption or signal (beyond a threshold) between consecutive scans. Only
+the previous scan's networks are kept, so a range of any length is diffed
+in one pass.
+
+``state_changes`` compares one observation with the last known state of
+its BSSID; the inventory logs its results as networks are saved.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from pydantic import BaseModel, Field
+
+from .indexes import INDEXED_FIELDS, latest_state
+
+DEFAULT_SIGNAL_THRESHOLD = 10
+
+CHANGE_KINDS = ("appeared", "disappeared", "ssid", "signal", "encryption", "channel")
+
+# Relative strength of encryption labels, for spotting downgrades
+ENCRYPTION_STRENGTH = {"Open": 0, "WEP": 1, "WPA": 2, "WPA2": 3, "WPA3": 4}
+
+
+class ChangeEvent(BaseModel):
+    """One network change between two scans."""
+    
+    kind: str = Field(..., description="appeared, disappeared, ssid, signal, encryption or channel")
+    bssid: str = Field(..., description="Access point MAC address")
+    timestamp: str = Field(..., description="Timestamp of the scan the change was seen in")
+    scan_id: str = Field(..., description="Scan the change was seen in")
+    previous_scan_id: Optional[str] = Field(default=None, description="Scan compared against (None for logged events)")
+    old: Optional[Any] = Field(default=None, description="Previous value")
+    new: Optional[Any] = Field(default=None, description="New value")
+    
+    @property
+    def is_downgrade(self) -> bool:
+        """Whether this is an encryption change to a weaker scheme."""
+        if self.kind != "encryption":
+            return False
+        return ENCRYPTION_STRENGTH.get(self.new, 0) < ENCRYPTION_STRENGTH.get(self.old, 0)
+    
+    def describe(self) -> str:
+        """Human-readable summary, as used by ``compare_scans``."""
+        if self.kind == "appeared":
+            return f"Appeared: {self.new or '<hidden>'}"
+        if self.kind == "disappeared":
+            return f"Disappeared: {self.old or '<hidden>'}"
+        if self.kind == "signal":
+            return f"Signal: {self.old} → {self.new} dBm"
+        label = "SSID" if self.kind == "ssid" else self.kind.capitalize()
+        return f"{label}: {self.old} → {self.new}"
+
+
+def diff_networks(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]],
+                  previous_scan: Dict[str, Any], scan: Dict[str, Any],
+                  signal_threshold: int = DEFAULT_SIGNAL_THRESHOLD) -> Iterator[ChangeEvent]:
+    """Yield the changes between two scans' networks, keyed by BSSID."""
+    context = {
+        "timestamp": scan["timestamp"],
+        "scan_id": scan["id"],
+        "previous_scan_id": previous_scan["id"]
+    }
+    for bssid, network in after.items():
+        old = before.get(bssid)
+        if old is None:
+            yield ChangeEvent(kind="appeared", bssid=bssid, new=network["ssid"], **context)
+            continue
+        if old["ssid"] != network["ssid"]:
+            yield ChangeEvent(kind="ssid", bssid=bssid, old=old["ssid"], new=network["ssid"], **context)
+        delta = network["signal_level"] - old["signal_level"]
+        if delta and abs(delta) >= signal_threshold:
+            yield ChangeEvent(kind="signal", bssid=bssid, old=old["signal_level"],
+                              new=network["signal_level"], **context)
+        if old["encryption"] != network["encryption"]:
+            yield ChangeEvent(kind="encryption", bssid=bssid, old=old["encryption"],
+                              new=network["encryption"], **context)
+        if old["channel"] != network["channel"]:
+            yield ChangeEvent(kind="channel", bssid=bssid, old=old["channel"],
+                              new=network["channel"], **context)
+    for bssid, old in before.items():
+        if bssid not in after:
+            yield ChangeEvent(kind="disappeared", bssid=bssid, old=old["ssid"], **context)
+
+
+def iter_scan_diffs(scans: Iterable[Dict[str, Any]],
+                    signal_threshold: int = DEFAULT_SIGNAL_THRESHOLD) -> Iterator[ChangeEvent]:
+    """Yield the changes between every consecutive pair of scans."""
+    previous_scan = None
+    previous_networks: Dict[str, Dict[str, Any]] = {}
+    for scan in scans:
+        networks = {network["bssid"]: network for network in scan["networks"]}
+        if previous_scan is not None:
+            yield from diff_networks(previous_networks, networks, previous_scan, scan, signal_threshold)
+        previous_scan, previous_networks = scan, networks
+
+
+def state_changes(previous: Optional[Dict[str, Any]], network: Dict[str, Any],
+                  timestamp: str, scan_id: str) -> List[Dict[str, Any]]:
+    """Change events (as stored dicts) of one observation against the last known state."""
+    context = {"bssid": network["bssid"], "timestamp": timestamp, "scan_id": scan_id}
+    if previous is None:
+        return [{"kind": "appeared", "old": None, "new": network["ssid"], **context}]
+    return [
+        {"kind": field, "old": previous[field], "new": network[field], **context}
+        for field in INDEXED_FIELDS if previous[field] != network[field]
+    ]
+
+
+def iter_state_changes(scans: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Replay scans and yield every logged change event, e.g. to backfill the log.
+    
+    As when saving, observations older than a BSSID's last one log nothing.
+    """
+    states: Dict[str, Dict[str, Any]] = {}
+    last_seen: Dict[str, str] = {}
+    for scan in scans:
+        timestamp = scan["timestamp"]
+        for network in scan["networks"]:
+            bssid = network["bssid"]
+            if bssid in last_seen and timestamp < last_seen[bssid]:
+                continue
+            yield from state_changes(states.get(bssid), network, timestamp, scan["id"])
+            states[bssid] = latest_state(network)
+            last_seen[bssid] = timestamp
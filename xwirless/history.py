@@ -0,0 +1,327 @@
+"""
+Signal history retention and downsampling.
+
+Each network keeps raw signal points for a recent window; older points are
+rolled up into hourly and then daily min/max/mean/count buckets as new
+points arrive, so a network's history stays bounded however long it is
+observed. Raw points are held column-wise in a ``SignalSeries``.
+
+Points may arrive out of order (bulk ingestion, merged inventories): the
+raw window is measured from the newest point seen, and late points are
+inserted into the series or merged into their bucket by start time.
+"""
+
+import base64
+import bisect
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+TIERS = ("hour", "day")
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+class RetentionPolicy(BaseModel):
+    """Retention policy for per-network signal history."""
+    
+    raw_hours: int = Field(default=24, description="Hours of raw signal points to keep")
+    hourly_days: int = Field(default=30, description="Days of hourly buckets to keep")
+    daily_days: Optional[int] = Field(default=None, description="Days of daily buckets to keep (None keeps all)")
+
+
+def utc_naive(value: datetime) -> datetime:
+    """Convert an aware datetime to naive UTC, the form timestamps are stored in."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def to_epoch_us(timestamp: str) -> int:
+    """Convert an ISO timestamp to integer microseconds since the epoch.
+    
+    Aware timestamps are converted to UTC; ``from_epoch_us`` gives back
+    naive UTC, so callers store naive UTC timestamps (see ``utc_naive``).
+    """
+    return (utc_naive(datetime.fromisoformat(timestamp)) - EPOCH) // MICROSECOND
+
+
+def from_epoch_us(epoch_us: int) -> str:
+    """Convert epoch microseconds back to an ISO timestamp."""
+    return (EPOCH + timedelta(microseconds=epoch_us)).isoformat()
+
+
+def _encode_varints(values: Iterable[int]) -> str:
+    """Zigzag/varint-encode integers and return them as base64."""
+    out = bytearray()
+    for value in values:
+        value = (value << 1) ^ (value >> 63)
+        while value > 0x7F:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return base64.b64encode(bytes(out)).decode("ascii")
+
+
+def _decode_varints(encoded: str) -> Iterator[int]:
+    """Decode integers written by ``_encode_varints``."""
+    value = shift = 0
+    for byte in base64.b64decode(encoded):
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        yield (value >> 1) ^ -(value & 1)
+        value = shift = 0
+
+
+class SignalSeries:
+    """Raw signal points for one network, stored column-wise.
+    
+    Timestamps are epoch microseconds in an ``array('q')``, signal levels
+    are int8 dBm (clamped to -128..127) and quality strings are interned in
+    a small palette. On disk the timestamps are delta-encoded varints.
+    Iterating yields the same point dicts the inventory has always stored.
+    """
+    
+    def __init__(self) -> None:
+        self.timestamps = array("q")
+        self.levels = array("b")
+        self.quality_index = array("H")
+        self.qualities: List[str] = []
+    
+    @classmethod
+    def from_points(cls, points: Iterable[Dict[str, Any]]) -> "SignalSeries":
+        """Build a series from point dicts."""
+        series = cls()
+        for point in points:
+            series.append(point)
+        return series
+    
+    @classmethod
+    def from_json(cls, value: Any) -> "SignalSeries":
+        """Load a series from its disk form or a legacy list of point dicts."""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, list):
+            return cls.from_points(value)
+        series = cls()
+        epoch_us = 0
+        for delta in _decode_varints(value["dt"]):
+            epoch_us += delta
+            series.timestamps.append(epoch_us)
+        series.levels.frombytes(base64.b64decode(value["s"]))
+        series.quality_index.extend(_decode_varints(value["qi"]))
+        series.qualities = list(value["q"])
+        return series
+    
+    def to_json(self) -> Dict[str, Any]:
+        """Delta-encoded disk form of the series."""
+        previous = 0
+        deltas = []
+        for epoch_us in self.timestamps:
+            deltas.append(epoch_us - previous)
+            previous = epoch_us
+        return {
+            "dt": _encode_varints(deltas),
+            "s": base64.b64encode(self.levels.tobytes()).decode("ascii"),
+            "q": self.qualities,
+            "qi": _encode_varints(self.quality_index)
+        }
+    
+    def append(self, point: Dict[str, Any]) -> None:
+        """Add a point dict, keeping the series in time order."""
+        self.append_raw(to_epoch_us(point["timestamp"]), point["signal_level"], point["quality"])
+    
+    def append_raw(self, epoch_us: int, signal_level: int, quality: str) -> None:
+        """Add a point from its column values, keeping the series in time order."""
+        try:
+            quality_id = self.qualities.index(quality)
+        except ValueError:
+            quality_id = len(self.qualities)
+            self.qualities.append(quality)
+        level = max(-128, min(127, signal_level))
+        if not self.timestamps or self.timestamps[-1] <= epoch_us:
+            self.timestamps.append(epoch_us)
+            self.levels.append(level)
+            self.quality_index.append(quality_id)
+            return
+        position = bisect.bisect_right(self.timestamps, epoch_us)
+        self.timestamps.insert(position, epoch_us)
+        self.levels.insert(position, level)
+        self.quality_index.insert(position, quality_id)
+    
+    def evict_before(self, cutoff_us: int) -> List[Tuple[int, int]]:
+        """Remove points older than ``cutoff_us`` and return (epoch_us, level) pairs."""
+        count = 0
+        for epoch_us in self.timestamps:
+            if epoch_us >= cutoff_us:
+                break
+            count += 1
+        evicted = list(zip(self.timestamps[:count], self.levels[:count]))
+        if count:
+            del self.timestamps[:count]
+            del self.levels[:count]
+            del self.quality_index[:count]
+        return evicted
+    
+    def to_points(self) -> List[Dict[str, Any]]:
+        """Materialize the series as a list of point dicts."""
+        return list(self)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for epoch_us, level, quality_id in zip(self.timestamps, self.levels, self.quality_index):
+            yield {
+                "timestamp": from_epoch_us(epoch_us),
+                "signal_level": level,
+                "quality": self.qualities[quality_id]
+            }
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SignalSeries):
+            return NotImplemented
+        return (self.timestamps == other.timestamps and self.levels == other.levels
+                and [self.qualities[i] for i in self.quality_index]
+                == [other.qualities[i] for i in other.quality_index])
+
+
+def json_default(value: Any) -> Any:
+    """``json.dump`` hook that writes signal series in their compact form."""
+    if isinstance(value, SignalSeries):
+        return value.to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def load_network(network_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a stored network record's signal history to a ``SignalSeries``."""
+    network_data["signal_history"] = SignalSeries.from_json(network_data.get("signal_history", []))
+    network_data.setdefault("signal_rollups", {tier: [] for tier in TIERS})
+    return network_data
+
+
+def dump_network(network_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Shallow copy of a network record in its compact disk form."""
+    record = dict(network_data)
+    record["signal_history"] = SignalSeries.from_json(network_data["signal_history"]).to_json()
+    return record
+
+
+def public_network(network_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Shallow copy of a network record with signal history as point dicts."""
+    record = dict(network_data)
+    record["signal_history"] = list(network_data["signal_history"])
+    return record
+
+
+def bucket_start(timestamp: datetime, tier: str) -> str:
+    """Start of the hour or day bucket containing ``timestamp``."""
+    if tier == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0).isoformat()
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+
+
+def _merge_into(buckets: List[Dict[str, Any]], start: str, count: int,
+                low: int, high: int, total: int) -> None:
+    """Merge aggregate values into the bucket starting at ``start``, keeping buckets sorted."""
+    if not buckets or buckets[-1]["start"] <= start:
+        position = len(buckets) - 1 if buckets and buckets[-1]["start"] == start else len(buckets)
+    else:
+        position = bisect.bisect_left(buckets, start, key=lambda bucket: bucket["start"])
+    if position < len(buckets) and buckets[position]["start"] == start:
+        bucket = buckets[position]
+        bucket["count"] += count
+        bucket["min"] = min(bucket["min"], low)
+        bucket["max"] = max(bucket["max"], high)
+        bucket["sum"] += total
+    else:
+        bucket = {"start": start, "count": count, "min": low, "max": high, "sum": total}
+        buckets.insert(position, bucket)
+    bucket["mean"] = round(bucket["sum"] / bucket["count"], 2)
+
+
+def record_signal(network_data: Dict[str, Any], point: Dict[str, Any],
+                  policy: RetentionPolicy) -> None:
+    """Add a raw signal point and roll up points that left the raw window.
+    
+    The windows end at the newest point recorded, so a late point older
+    than the raw window goes straight to its hourly (or daily) bucket.
+    """
+    raw = network_data["signal_history"]
+    if not isinstance(raw, SignalSeries):
+        raw = network_data["signal_history"] = SignalSeries.from_json(raw)
+    rollups = network_data.setdefault("signal_rollups", {tier: [] for tier in TIERS})
+    raw.append_raw(to_epoch_us(point["timestamp"]), point["signal_level"], point["quality"])
+    latest_us = raw.timestamps[-1]  # The newest point is never evicted
+    latest = EPOCH + timedelta(microseconds=latest_us)
+    
+    # Raw points -> hourly buckets
+    for epoch_us, level in raw.evict_before(latest_us - policy.raw_hours * 3600 * 10 ** 6):
+        timestamp = EPOCH + timedelta(microseconds=epoch_us)
+        _merge_into(rollups["hour"], bucket_start(timestamp, "hour"), 1, level, level, level)
+    
+    # Hourly buckets -> daily buckets
+    hour_cutoff = latest - timedelta(days=policy.hourly_days)
+    evicted = 0
+    for bucket in rollups["hour"]:
+        start = datetime.fromisoformat(bucket["start"])
+        if start + timedelta(hours=1) > hour_cutoff:
+            break
+        _merge_into(rollups["day"], bucket_start(start, "day"), bucket["count"],
+                    bucket["min"], bucket["max"], bucket["sum"])
+        evicted += 1
+    if evicted:
+        del rollups["hour"][:evicted]
+    
+    # Expire daily buckets
+    if policy.daily_days is not None:
+        day_cutoff = latest - timedelta(days=policy.daily_days)
+        rollups["day"] = [
+            bucket for bucket in rollups["day"]
+            if datetime.fromisoformat(bucket["start"]) + timedelta(days=1) > day_cutoff
+        ]
+
+
+def build_signal_history(points: Iterable[Dict[str, Any]],
+                         policy: RetentionPolicy) -> Dict[str, Any]:
+    """Apply a retention policy to a full series of raw points."""
+    network_data: Dict[str, Any] = {"signal_history": SignalSeries()}
+    for point in points:
+        record_signal(network_data, point, policy)
+    network_data.setdefault("signal_rollups", {tier: [] for tier in TIERS})
+    return network_data
+
+
+def signal_series(network_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return the tiered signal history as one chronological series.
+    
+    Every entry has ``timestamp``, ``tier`` (``day``, ``hour`` or ``raw``),
+    ``mean``, ``min``, ``max`` and ``count``; raw points have a count of 1.
+    """
+    series = []
+    rollups = network_data.get("signal_rollups", {})
+    for tier in reversed(TIERS):
+        for bucket in rollups.get(tier, []):
+            series.append({
+                "timestamp": bucket["start"],
+                "tier": tier,
+                "mean": bucket["mean"],
+                "min": bucket["min"],
+                "max": bucket["max"],
+                "count": bucket["count"]
+            })
+    for point in network_data.get("signal_history", []):
+        level = point["signal_level"]
+        series.append({
+            "timestamp": point["timestamp"],
+            "tier": "raw",
+            "mean": level,
+            "min": level,
+            "max": level,
+            "count": 1
+        })
+    return series
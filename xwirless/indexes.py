@@ -0,0 +1,179 @@
+"""
+Secondary indexes over the inventory.
+
+``InventoryIndex`` maps the latest SSID, channel and encryption of every
+BSSID, and the hour it was last seen, to the set of BSSIDs with that value.
+It is updated per observation as scans are saved, so counts per value and
+lookups such as "WEP networks" or "seen in the last 24 hours" cost a
+dictionary access instead of a walk over every network record.
+
+``EventIndex`` orders the change event log by time, per BSSID and per kind,
+so "encryption changes in the last month" is a bisect instead of a replay.
+"""
+
+import bisect
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .history import utc_naive
+
+INDEXED_FIELDS = ("ssid", "channel", "encryption")
+
+
+def latest_state(network: Dict[str, Any]) -> Dict[str, Any]:
+    """The indexed fields of one observation."""
+    return {field: network.get(field) for field in INDEXED_FIELDS}
+
+
+def state_from_history(network_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Best guess of the latest state of a record saved before states were tracked."""
+    return {
+        "ssid": network_data["ssid_history"][-1] if network_data.get("ssid_history") else None,
+        "channel": None,
+        "encryption": network_data["encryption_history"][-1] if network_data.get("encryption_history") else None
+    }
+
+
+def hour_bucket(timestamp: str) -> str:
+    """The hour an ISO timestamp falls in ("YYYY-MM-DDTHH")."""
+    return timestamp[:13]
+
+
+def to_timestamp(value: Union[str, datetime]) -> str:
+    """Accept an ISO string (UTC) or a datetime; aware datetimes are converted to UTC."""
+    return utc_naive(value).isoformat() if isinstance(value, datetime) else value
+
+
+class InventoryIndex:
+    """Value -> BSSIDs indexes on the latest state of each network."""
+    
+    def __init__(self):
+        self._latest: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        self._by_field: Dict[str, Dict[Any, Set[str]]] = {field: {} for field in INDEXED_FIELDS}
+        self._by_hour: Dict[str, Set[str]] = {}
+        self._hours: List[str] = []
+    
+    def __len__(self) -> int:
+        return len(self._latest)
+    
+    @classmethod
+    def from_states(cls, states: Iterable[Tuple[str, Dict[str, Any], str]]) -> "InventoryIndex":
+        """Build an index from (bssid, latest state, last_seen) triples."""
+        index = cls()
+        for bssid, state, last_seen in states:
+            index.update(bssid, state, last_seen)
+        return index
+    
+    def update(self, bssid: str, state: Dict[str, Any], last_seen: str) -> None:
+        """Record the latest state of a BSSID, moving it between index entries."""
+        previous = self._latest.get(bssid)
+        if previous is not None:
+            old_state, old_seen = previous
+            if old_seen > last_seen:
+                return  # Older observation (e.g. an out-of-order import)
+            for field in INDEXED_FIELDS:
+                if old_state[field] != state[field]:
+                    self._discard(self._by_field[field], old_state[field], bssid)
+            if hour_bucket(old_seen) != hour_bucket(last_seen):
+                self._discard_hour(hour_bucket(old_seen), bssid)
+        
+        self._latest[bssid] = (state, last_seen)
+        for field in INDEXED_FIELDS:
+            self._by_field[field].setdefault(state[field], set()).add(bssid)
+        hour = hour_bucket(last_seen)
+        if hour not in self._by_hour:
+            self._by_hour[hour] = set()
+            bisect.insort(self._hours, hour)
+        self._by_hour[hour].add(bssid)
+    
+    def lookup(self, field: str, value: Any) -> Set[str]:
+        """BSSIDs whose latest ``field`` equals ``value``."""
+        return set(self._by_field[field].get(value, ()))
+    
+    def counts(self, field: str) -> Dict[Any, int]:
+        """Number of BSSIDs per latest value of ``field``."""
+        return {value: len(bssids) for value, bssids in self._by_field[field].items()}
+    
+    def seen_since(self, since: Union[str, datetime]) -> Set[str]:
+        """BSSIDs last seen at or after ``since``."""
+        since = to_timestamp(since)
+        start = bisect.bisect_left(self._hours, hour_bucket(since))
+        bssids: Set[str] = set()
+        for position, hour in enumerate(self._hours[start:]):
+            if position == 0 and hour == hour_bucket(since):
+                # Partial first hour: check each timestamp
+                bssids.update(bssid for bssid in self._by_hour[hour] if self._latest[bssid][1] >= since)
+            else:
+                bssids.update(self._by_hour[hour])
+        return bssids
+    
+    def find(self, ssid: Optional[str] = None, channel: Optional[int] = None,
+             encryption: Optional[str] = None,
+             seen_since: Optional[Union[str, datetime]] = None) -> List[str]:
+        """BSSIDs matching every given criterion, sorted."""
+        result: Optional[Set[str]] = None
+        for field, value in (("ssid", ssid), ("channel", channel), ("encryption", encryption)):
+            if value is not None:
+                matches = self.lookup(field, value)
+                result = matches if result is None else result & matches
+        if seen_since is not None:
+            recent = self.seen_since(seen_since)
+            result = recent if result is None else result & recent
+        return sorted(self._latest if result is None else result)
+    
+    def _discard(self, entries: Dict[Any, Set[str]], value: Any, bssid: str) -> None:
+        """Remove a BSSID from an entry, dropping the entry when it empties."""
+        bssids = entries.get(value)
+        if bssids is not None:
+            bssids.discard(bssid)
+            if not bssids:
+                del entries[value]
+    
+    def _discard_hour(self, hour: str, bssid: str) -> None:
+        """Remove a BSSID from an hour bucket, dropping the bucket when it empties."""
+        self._discard(self._by_hour, hour, bssid)
+        if hour not in self._by_hour:
+            position = bisect.bisect_left(self._hours, hour)
+            if position < len(self._hours) and self._hours[position] == hour:
+                del self._hours[position]
+
+
+class EventIndex:
+    """Time-ordered views of the change event log, per BSSID and per kind."""
+    
+    def __init__(self, events: Iterable[Dict[str, Any]] = ()):
+        self._events: List[Dict[str, Any]] = []
+        self._by_time: List[Tuple[str, int]] = []
+        self._by_bssid: Dict[str, List[Tuple[str, int]]] = {}
+        self._by_kind: Dict[str, List[Tuple[str, int]]] = {}
+        for event in events:
+            self.add(event)
+    
+    def __len__(self) -> int:
+        return len(self._events)
+    
+    def add(self, event: Dict[str, Any]) -> None:
+        """Index a logged event."""
+        key = (event["timestamp"], len(self._events))
+        self._events.append(event)
+        for keys in (self._by_time, self._by_bssid.setdefault(event["bssid"], []),
+                     self._by_kind.setdefault(event["kind"], [])):
+            if not keys or keys[-1] <= key:
+                keys.append(key)  # Events usually arrive in time order
+            else:
+                bisect.insort(keys, key)
+    
+    def query(self, bssid: Optional[str] = None, kind: Optional[str] = None,
+              since: Optional[Union[str, datetime]] = None,
+              until: Optional[Union[str, datetime]] = None) -> List[Dict[str, Any]]:
+        """Events matching every given criterion with ``since <= timestamp < until``, oldest first."""
+        if bssid is not None:
+            keys = self._by_bssid.get(bssid, [])
+        elif kind is not None:
+            keys = self._by_kind.get(kind, [])
+        else:
+            keys = self._by_time
+        start = 0 if since is None else bisect.bisect_left(keys, (to_timestamp(since), -1))
+        end = len(keys) if until is None else bisect.bisect_left(keys, (to_timestamp(until), -1))
+        events = (self._events[position] for _, position in keys[start:end])
+        return [event for event in events if kind is None or event["kind"] == kind]
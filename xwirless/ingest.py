@@ -0,0 +1,154 @@
+"""
+Bulk ingestion of archived scan captures.
+
+Capture files are parsed across a process pool and written to the inventory
+by a single writer, one ``save_scans`` call per batch. Scans are timestamped
+with their file's modification time and saved oldest first, whatever the
+directory layout. Every stored scan records the capture it came from, so
+an interrupted ingestion resumes by skipping files whose scans are already
+in the database.
+"""
+
+import itertools
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from .db import InventoryDB
+from .parser import ScanResult, WiFiParser
+
+logger = logging.getLogger(__name__)
+
+# First line of an ``iwlist <interface> scanning`` capture
+PREAMBLE_PATTERN = re.compile(r'^(\S+)\s+Scan completed')
+
+
+class IngestReport(BaseModel):
+    """Outcome of an ingestion run."""
+    
+    discovered: int = Field(default=0, description="Capture files found")
+    skipped: int = Field(default=0, description="Files already ingested")
+    ingested: int = Field(default=0, description="Files saved in this run")
+    failed: int = Field(default=0, description="Files that could not be parsed")
+    networks: int = Field(default=0, description="Networks saved in this run")
+    elapsed: float = Field(default=0.0, description="Wall time in seconds")
+    
+    @property
+    def files_per_second(self) -> float:
+        """Ingested files per second."""
+        return self.ingested / self.elapsed if self.elapsed else 0.0
+    
+    @property
+    def networks_per_second(self) -> float:
+        """Saved networks per second."""
+        return self.networks / self.elapsed if self.elapsed else 0.0
+
+
+def discover_captures(root: str, pattern: str = "*") -> List[Path]:
+    """Return capture files under ``root`` matching ``pattern``, sorted."""
+    return sorted(path.resolve() for path in Path(root).rglob(pattern) if path.is_file())
+
+
+def parse_capture(path: str, interface: str = "unknown") -> ScanResult:
+    """Parse one capture file into a scan result.
+    
+    The interface is taken from the iwlist preamble when present and the
+    scan is timestamped with the file's modification time.
+    """
+    parser = WiFiParser()
+    with open(path, encoding='utf-8', errors='replace') as f:
+        first_line = f.readline()
+        preamble = PREAMBLE_PATTERN.match(first_line)
+        networks = list(parser.iter_networks(itertools.chain([first_line], f)))
+    
+    return ScanResult(
+        interface=preamble.group(1) if preamble else interface,
+        networks=networks,
+        timestamp=datetime.utcfromtimestamp(os.path.getmtime(path)),
+        source=path
+    )
+
+
+@contextmanager
+def _parsed_captures(tasks: List[Tuple[str, str]], workers: int,
+                     chunksize: int) -> Iterator[Iterator[Tuple[str, Optional[ScanResult]]]]:
+    """Yield an iterator of parsed captures in task order, in-process or from a pool."""
+    if workers <= 1 or len(tasks) <= 1:
+        yield map(_parse_worker, tasks)
+        return
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        yield pool.map(_parse_worker, tasks, chunksize=chunksize)
+    finally:
+        # On interruption drop queued files; committed batches are kept
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _parse_worker(task: Tuple[str, str]) -> Tuple[str, Optional[ScanResult]]:
+    """Process pool entry point; returns None for unreadable captures."""
+    path, interface = task
+    try:
+        return path, parse_capture(path, interface)
+    except Exception as e:
+        logger.error(f"Failed to parse capture {path}: {e}")
+        return path, None
+
+
+def ingest_directory(db: InventoryDB, root: str, pattern: str = "*",
+                     workers: Optional[int] = None, batch_size: int = 50,
+                     interface: str = "unknown",
+                     progress: Optional[Callable[[IngestReport], None]] = None) -> IngestReport:
+    """Parse every new capture under ``root`` and save it to ``db``.
+    
+    ``workers`` sets the process pool size (CPU count by default, 1 parses
+    in-process). ``progress`` is called with the running report after each
+    committed batch.
+    """
+    start = time.perf_counter()
+    report = IngestReport()
+    captures = discover_captures(root, pattern)
+    done = db.ingested_sources()
+    # Oldest capture first, so scans reach the inventory in time order
+    pending = sorted((str(path) for path in captures if str(path) not in done),
+                     key=lambda path: (os.path.getmtime(path), path))
+    report.discovered = len(captures)
+    report.skipped = len(captures) - len(pending)
+    logger.info(f"Ingesting {len(pending)} of {len(captures)} captures from {root}")
+    
+    def commit(batch: List[ScanResult]) -> None:
+        db.save_scans(sorted(batch, key=lambda scan_result: scan_result.timestamp))
+        report.ingested += len(batch)
+        report.networks += sum(scan_result.total_networks for scan_result in batch)
+        report.elapsed = time.perf_counter() - start
+        if progress:
+            progress(report)
+    
+    tasks = [(path, interface) for path in pending]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(batch_size, len(tasks) // (workers * 4)))
+    batch: List[ScanResult] = []
+    
+    with _parsed_captures(tasks, workers, chunksize) as results:
+        for _, scan_result in results:
+            if scan_result is None:
+                report.failed += 1
+                continue
+            batch.append(scan_result)
+            if len(batch) >= batch_size:
+                commit(batch)
+                batch = []
+    if batch:
+        commit(batch)
+    
+    report.elapsed = time.perf_counter() - start
+    logger.info(f"Ingested {report.ingested} captures ({report.networks} networks) "
+                f"in {report.elapsed:.2f}s")
+    return report
@@ -0,0 +1,188 @@
+"""
+Continuous monitor mode.
+
+A ``ScanMonitor`` keeps one scanner, parser and inventory database open and
+scans on a fixed schedule through the scanner's backends, saving each scan
+as it completes. Inventories that rewrite the whole file on every save
+(JSON) are instead written every ``flush_interval`` seconds, batching the
+scans in between. SIGTERM and SIGINT stop the loop after the current cycle
+and flush, so no write is cut short.
+"""
+
+import logging
+import signal
+import threading
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Callable, Optional
+
+from pydantic import BaseModel, Field
+
+from .backends import get_backend
+from .db import InventoryDB
+from .parser import ScanResult, WiFiParser
+from .scanner import WiFiScanner
+from .scheduler import AdaptiveScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class CycleStats(BaseModel):
+    """Timing and outcome of one monitor cycle."""
+    
+    cycle: int = Field(..., description="Cycle number, starting at 1")
+    started_at: datetime = Field(..., description="Cycle start time (UTC)")
+    scan_time: float = Field(default=0.0, description="Seconds spent scanning")
+    parse_time: float = Field(default=0.0, description="Seconds spent parsing a sandbox file "
+                                                       "(backends parse while they scan)")
+    save_time: float = Field(default=0.0, description="Seconds spent writing the database")
+    networks: int = Field(default=0, description="Networks found")
+    scan_id: Optional[str] = Field(default=None, description="Saved scan ID")
+    error: Optional[str] = Field(default=None, description="Error that ended the cycle")
+    next_delay: Optional[float] = Field(default=None, description="Adaptive delay before the next cycle")
+    decision: Optional[str] = Field(default=None, description="Adaptive scheduler decision")
+    
+    @property
+    def total_time(self) -> float:
+        """Seconds for the whole cycle."""
+        return self.scan_time + self.parse_time + self.save_time
+
+
+class ScanMonitor:
+    """Scan an interface periodically and save every scan to the inventory.
+    
+    A comma separated ``interface`` scans those radios concurrently and
+    saves the merged result.
+    """
+    
+    def __init__(self, scanner: WiFiScanner, parser: WiFiParser, db: InventoryDB,
+                 interface: str, interval: float = 60.0, sandbox: Optional[str] = None,
+                 scheduler: Optional[AdaptiveScheduler] = None, backend: str = "auto",
+                 flush_interval: float = 300.0):
+        self.scanner = scanner
+        self.parser = parser
+        self.db = db
+        self.interface = interface
+        self.interval = interval
+        self.sandbox = sandbox
+        self.scheduler = scheduler
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.cycles = 0
+        self._stop = threading.Event()
+    
+    def stop(self) -> None:
+        """Ask the loop to exit after the current cycle."""
+        self._stop.set()
+    
+    @property
+    def stopping(self) -> bool:
+        """Whether a stop has been requested."""
+        return self._stop.is_set()
+    
+    def install_signal_handlers(self) -> None:
+        """Stop cleanly on SIGTERM and SIGINT (main thread only)."""
+        def handle(signum, frame):
+            logger.info(f"Received {signal.Signals(signum).name}, stopping after this cycle")
+            self.stop()
+        
+        signal.signal(signal.SIGTERM, handle)
+        signal.signal(signal.SIGINT, handle)
+    
+    def run_cycle(self) -> CycleStats:
+        """Scan, parse and save once."""
+        self.cycles += 1
+        stats = CycleStats(cycle=self.cycles, started_at=datetime.utcnow())
+        scan_result: Optional[ScanResult] = None
+        try:
+            start = time.perf_counter()
+            if self.sandbox and self.backend != "auto":
+                scan_result = get_backend(self.backend).parse_file(self.sandbox, self.interface)
+                stats.parse_time = time.perf_counter() - start
+            elif self.sandbox:
+                with self.scanner.open_scan_file(self.sandbox) as capture:
+                    scan_result = self.parser.parse_scan_stream(capture, self.interface)
+                stats.parse_time = time.perf_counter() - start
+            elif "," in self.interface:
+                scan_result = self.scanner.scan_interfaces(self.interface.split(","), self.backend)
+            else:
+                scan_result = self.scanner.scan(self.interface, self.backend)
+                stats.scan_time = time.perf_counter() - start
+            
+            stats.networks = scan_result.total_networks
+            self._schedule(stats, scan_result=scan_result)
+            start = time.perf_counter()
+            stats.scan_id = self.db.save_scan(scan_result)
+            stats.save_time = time.perf_counter() - start
+        except Exception as e:
+            logger.error(f"Monitor cycle {stats.cycle} failed: {e}")
+            stats.error = str(e)
+            if scan_result is None:
+                self._schedule(stats, error=e)
+        return stats
+    
+    def _schedule(self, stats: CycleStats, scan_result: Optional[ScanResult] = None,
+                  error: Optional[Exception] = None) -> None:
+        """Let the adaptive scheduler pick the next delay from this scan's outcome."""
+        if self.scheduler is None:
+            return
+        if scan_result is not None:
+            stats.next_delay = self.scheduler.record_success(
+                self.interface, stats.scan_time + stats.parse_time,
+                (network.bssid for network in scan_result.networks)
+            )
+        else:
+            stats.next_delay = self.scheduler.record_failure(self.interface, error)
+        stats.decision = self.scheduler.metrics(self.interface).decision
+    
+    def run(self, max_cycles: Optional[int] = None,
+            on_cycle: Optional[Callable[[CycleStats], None]] = None) -> int:
+        """Run cycles every ``interval`` seconds until stopped.
+        
+        Cycles start on a fixed schedule; a cycle that overruns the interval
+        is followed immediately by the next one instead of drifting. With a
+        scheduler, each cycle's start is its predecessor's plus the delay
+        the scheduler chose. Returns the number of cycles run.
+        
+        Unless the inventory saves incrementally, scans are batched and
+        written once ``flush_interval`` seconds have passed since the last
+        write, and when the loop ends.
+        """
+        logger.info(f"Monitoring {self.interface} every {self.interval}s")
+        next_start = time.monotonic()
+        batched = self.flush_interval > 0 and not self.db.incremental_saves
+        pending = ExitStack()
+        flush_at = 0.0
+        ran = 0
+        try:
+            while not self.stopping:
+                if batched and flush_at == 0.0:
+                    pending.enter_context(self.db.batch())
+                    flush_at = time.monotonic() + self.flush_interval
+                stats = self.run_cycle()
+                ran += 1
+                if on_cycle:
+                    on_cycle(stats)
+                if batched and time.monotonic() >= flush_at:
+                    pending.close()
+                    flush_at = 0.0
+                
+                next_start += self.interval if stats.next_delay is None else stats.next_delay
+                now = time.monotonic()
+                if next_start < now:
+                    next_start = now
+                if max_cycles is not None and ran >= max_cycles:
+                    break
+                self._stop.wait(next_start - now)
+        finally:
+            try:
+                pending.close()
+            finally:
+                self.close()
+        logger.info(f"Monitor stopped after {ran} cycles")
+        return ran
+    
+    def close(self) -> None:
+        """Flush and release the inventory database."""
+        self.db.close()
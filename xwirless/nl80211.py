@@ -0,0 +1,275 @@
+"""
+Passive nl80211 scan-dump reader.
+
+Reads the kernel's cached BSS list over a generic netlink socket
+(``NL80211_CMD_GET_SCAN`` with ``NLM_F_DUMP``), the same data ``iw dev
+<iface> scan dump`` prints. Nothing is transmitted: no scan is triggered,
+only results the kernel already holds are returned. Messages are decoded
+straight into ``WiFiNetwork`` objects, so there is no subprocess and no
+text parsing.
+
+Raw dumps can be saved with ``NL80211Reader.dump`` and decoded later with
+``parse_scan_dump``, which is how the reader is tested without a radio.
+"""
+
+import logging
+import os
+import socket
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .parser import (
+    WiFiNetwork, classify_security, frequency_to_channel, protocol_label, quality_from_signal
+)
+
+logger = logging.getLogger(__name__)
+
+# Netlink
+NETLINK_GENERIC = 16
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x001
+NLM_F_DUMP = 0x300
+NLA_TYPE_MASK = 0x3FFF
+NLMSG_HEADER = struct.Struct("=IHHII")
+GENL_HEADER = struct.Struct("=BBH")
+NLA_HEADER = struct.Struct("=HH")
+
+# Generic netlink controller
+GENL_ID_CTRL = 0x10
+CTRL_CMD_GETFAMILY = 3
+CTRL_ATTR_FAMILY_ID = 1
+CTRL_ATTR_FAMILY_NAME = 2
+
+# nl80211 commands and attributes
+NL80211_CMD_GET_SCAN = 32
+NL80211_ATTR_IFINDEX = 3
+NL80211_ATTR_BSS = 47
+NL80211_BSS_BSSID = 1
+NL80211_BSS_FREQUENCY = 2
+NL80211_BSS_CAPABILITY = 5
+NL80211_BSS_INFORMATION_ELEMENTS = 6
+NL80211_BSS_SIGNAL_MBM = 7
+NL80211_BSS_SIGNAL_UNSPEC = 8
+NL80211_BSS_BEACON_IES = 11
+
+# 802.11 capability bits and information element tags
+CAPABILITY_ESS = 0x0001
+CAPABILITY_IBSS = 0x0002
+CAPABILITY_PRIVACY = 0x0010
+IE_SSID = 0
+IE_HT_CAPABILITIES = 45
+IE_RSN = 48
+IE_VHT_CAPABILITIES = 191
+IE_VENDOR = 221
+IE_EXTENSION = 255
+IE_EXT_HE_CAPABILITIES = 35
+
+RSN_OUI = b"\x00\x0f\xac"
+WPA_OUI = b"\x00\x50\xf2"
+CIPHER_SUITES = {1: "WEP", 2: "TKIP", 4: "CCMP", 5: "WEP", 8: "GCMP", 9: "GCMP", 10: "CCMP"}
+AKM_SUITES = {1: "EAP", 2: "PSK", 3: "EAP", 4: "PSK", 5: "EAP", 6: "PSK", 8: "SAE", 9: "SAE"}
+
+
+def iter_messages(data: bytes) -> Iterator[Tuple[int, int, bytes]]:
+    """Yield (type, flags, payload) for each netlink message in a buffer."""
+    offset = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        length, msg_type, flags, _, _ = NLMSG_HEADER.unpack_from(data, offset)
+        if length < NLMSG_HEADER.size or offset + length > len(data):
+            raise ValueError(f"Truncated netlink message at offset {offset}")
+        yield msg_type, flags, data[offset + NLMSG_HEADER.size:offset + length]
+        offset += (length + 3) & ~3
+
+
+def parse_attrs(data: bytes) -> Dict[int, bytes]:
+    """Decode a run of netlink attributes into {type: payload}."""
+    attrs = {}
+    offset = 0
+    while offset + NLA_HEADER.size <= len(data):
+        length, attr_type = NLA_HEADER.unpack_from(data, offset)
+        if length < NLA_HEADER.size:
+            break
+        attrs[attr_type & NLA_TYPE_MASK] = data[offset + NLA_HEADER.size:offset + length]
+        offset += (length + 3) & ~3
+    return attrs
+
+
+def encode_attr(attr_type: int, payload: bytes) -> bytes:
+    """Encode one netlink attribute, padded to 4 bytes."""
+    length = NLA_HEADER.size + len(payload)
+    return NLA_HEADER.pack(length, attr_type) + payload + b"\0" * (-length % 4)
+
+
+def encode_message(msg_type: int, flags: int, seq: int, cmd: int, attrs: bytes = b"",
+                   version: int = 1) -> bytes:
+    """Encode a generic netlink message."""
+    payload = GENL_HEADER.pack(cmd, version, 0) + attrs
+    return NLMSG_HEADER.pack(NLMSG_HEADER.size + len(payload), msg_type, flags, seq, 0) + payload
+
+
+def _iter_ies(data: bytes) -> Iterator[Tuple[int, bytes]]:
+    """Yield (tag, body) for each information element."""
+    offset = 0
+    while offset + 2 <= len(data):
+        tag, length = data[offset], data[offset + 1]
+        yield tag, data[offset + 2:offset + 2 + length]
+        offset += 2 + length
+
+
+def _parse_suites(body: bytes, oui: bytes) -> Tuple[List[str], List[str]]:
+    """Decode cipher and AKM suites of an RSN or WPA element (after the version)."""
+    ciphers: List[str] = []
+    akms: List[str] = []
+    try:
+        offset = 2
+        if body[offset:offset + 3] == oui:
+            ciphers.append(CIPHER_SUITES.get(body[offset + 3], ""))
+        offset += 4
+        for target, table in ((ciphers, CIPHER_SUITES), (akms, AKM_SUITES)):
+            (count,) = struct.unpack_from("<H", body, offset)
+            offset += 2
+            for _ in range(count):
+                if body[offset:offset + 3] == oui:
+                    target.append(table.get(body[offset + 3], ""))
+                offset += 4
+    except (IndexError, struct.error):
+        pass  # Elements may stop after any field
+    return ciphers, akms
+
+
+def parse_bss(bss: Dict[int, bytes]) -> Optional[WiFiNetwork]:
+    """Build a network from the nested attributes of ``NL80211_ATTR_BSS``."""
+    raw_bssid = bss.get(NL80211_BSS_BSSID)
+    if raw_bssid is None or len(raw_bssid) != 6:
+        return None
+    bssid = ":".join(f"{byte:02X}" for byte in raw_bssid)
+    
+    frequency_mhz = struct.unpack("<I", bss[NL80211_BSS_FREQUENCY])[0] if NL80211_BSS_FREQUENCY in bss else 0
+    capability = struct.unpack("<H", bss[NL80211_BSS_CAPABILITY])[0] if NL80211_BSS_CAPABILITY in bss else 0
+    if NL80211_BSS_SIGNAL_MBM in bss:
+        signal_level = round(struct.unpack("<i", bss[NL80211_BSS_SIGNAL_MBM])[0] / 100)
+    elif NL80211_BSS_SIGNAL_UNSPEC in bss:
+        signal_level = bss[NL80211_BSS_SIGNAL_UNSPEC][0] // 2 - 100
+    else:
+        signal_level = -100
+    
+    ssid = "Hidden"
+    rsn = wpa = None
+    ht = vht = he = False
+    ies = bss.get(NL80211_BSS_INFORMATION_ELEMENTS) or bss.get(NL80211_BSS_BEACON_IES, b"")
+    for tag, body in _iter_ies(ies):
+        if tag == IE_SSID:
+            ssid = body.decode("utf-8", errors="replace").strip("\0")
+        elif tag == IE_RSN:
+            rsn = _parse_suites(body, RSN_OUI)
+        elif tag == IE_VENDOR and body[:4] == WPA_OUI + b"\x01":
+            wpa = _parse_suites(body[4:], WPA_OUI)
+        elif tag == IE_HT_CAPABILITIES:
+            ht = True
+        elif tag == IE_VHT_CAPABILITIES:
+            vht = True
+        elif tag == IE_EXTENSION and body[:1] == bytes([IE_EXT_HE_CAPABILITIES]):
+            he = True
+    
+    encryption, cipher, authentication = classify_security(rsn, wpa, bool(capability & CAPABILITY_PRIVACY))
+    
+    return WiFiNetwork.trusted(
+        bssid=bssid,
+        ssid=ssid,
+        channel=frequency_to_channel(frequency_mhz),
+        frequency=frequency_mhz / 1000,
+        signal_level=signal_level,
+        quality=quality_from_signal(signal_level),
+        encryption=encryption,
+        cipher=cipher,
+        authentication=authentication,
+        mode="Ad-Hoc" if capability & CAPABILITY_IBSS and not capability & CAPABILITY_ESS else "Master",
+        protocol=protocol_label(frequency_mhz, ht, vht, he)
+    )
+
+
+def parse_scan_dump(data: bytes) -> List[WiFiNetwork]:
+    """Decode the networks in a raw ``NL80211_CMD_GET_SCAN`` dump."""
+    networks = []
+    for msg_type, _, payload in iter_messages(data):
+        if msg_type == NLMSG_DONE:
+            break
+        if msg_type == NLMSG_ERROR:
+            _raise_for_error(payload)
+            continue
+        attrs = parse_attrs(payload[GENL_HEADER.size:])
+        if NL80211_ATTR_BSS not in attrs:
+            continue
+        try:
+            network = parse_bss(parse_attrs(attrs[NL80211_ATTR_BSS]))
+        except (struct.error, IndexError, KeyError) as e:
+            logger.warning(f"Skipping malformed BSS entry: {e}")
+            continue
+        if network:
+            networks.append(network)
+    return networks
+
+
+def _raise_for_error(payload: bytes) -> None:
+    """Raise for a netlink error message (error 0 is an acknowledgement)."""
+    (error,) = struct.unpack_from("=i", payload)
+    if error:
+        raise RuntimeError(f"nl80211 request failed: {os.strerror(-error)}")
+
+
+class NL80211Reader:
+    """Reads the kernel's cached scan results over generic netlink."""
+    
+    def __init__(self, timeout: float = 5.0):
+        if not hasattr(socket, "AF_NETLINK"):
+            raise RuntimeError("nl80211 requires Linux netlink sockets")
+        self.timeout = timeout
+        self._seq = 0
+        self._family_id: Optional[int] = None
+    
+    def _request(self, msg_type: int, flags: int, cmd: int, attrs: bytes) -> bytes:
+        """Send one request and return every reply until the dump completes."""
+        self._seq += 1
+        chunks = []
+        with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_GENERIC) as sock:
+            sock.settimeout(self.timeout)
+            sock.bind((0, 0))
+            sock.send(encode_message(msg_type, NLM_F_REQUEST | flags, self._seq, cmd, attrs))
+            while True:
+                chunk = sock.recv(65536)
+                chunks.append(chunk)
+                types = [message[0] for message in iter_messages(chunk)]
+                if NLMSG_DONE in types or NLMSG_ERROR in types or not flags & NLM_F_DUMP:
+                    break
+        return b"".join(chunks)
+    
+    def family_id(self) -> int:
+        """Resolve (once) the generic netlink family ID of nl80211."""
+        if self._family_id is None:
+            reply = self._request(GENL_ID_CTRL, 0, CTRL_CMD_GETFAMILY,
+                                  encode_attr(CTRL_ATTR_FAMILY_NAME, b"nl80211\0"))
+            for msg_type, _, payload in iter_messages(reply):
+                if msg_type == NLMSG_ERROR:
+                    break
+                attrs = parse_attrs(payload[GENL_HEADER.size:])
+                if CTRL_ATTR_FAMILY_ID in attrs:
+                    self._family_id = struct.unpack("=H", attrs[CTRL_ATTR_FAMILY_ID][:2])[0]
+            if self._family_id is None:
+                raise RuntimeError("nl80211 family not available (no cfg80211 driver loaded)")
+        return self._family_id
+    
+    def dump(self, interface: str) -> bytes:
+        """Return the raw netlink dump of cached scan results for an interface."""
+        try:
+            ifindex = socket.if_nametoindex(interface)
+        except OSError:
+            raise RuntimeError(f"Unknown interface: {interface}")
+        return self._request(self.family_id(), NLM_F_DUMP, NL80211_CMD_GET_SCAN,
+                             encode_attr(NL80211_ATTR_IFINDEX, struct.pack("=I", ifindex)))
+    
+    def get_networks(self, interface: str) -> List[WiFiNetwork]:
+        """Return the networks the kernel currently has cached for an interface."""
+        networks = parse_scan_dump(self.dump(interface))
+        logger.info(f"Read {len(networks)} cached BSS entries for {interface} via nl80211")
+        return networks
@@ -4,12 +4,28 @@ Wi-Fi parser module with Pydantic models.
 
 import re
 import logging
-from typing import List, Optional, Dict, Any
+from abc import ABC, abstractmethod
+from typing import (
+    List, Optional, Dict, Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Tuple, Union
+)
 from datetime import datetime
 from pydantic import BaseModel, Field, validator
 
 logger = logging.getLogger(__name__)
 
+MAC_PATTERN = re.compile(r'^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$')
+
+# Cell fields. Every pattern starts with a literal, so ``re`` can skip to
+# candidate positions with its fast prefix search instead of trying the
+# pattern at every character of the cell.
+CELL_HEADER_PATTERN = re.compile(r'Cell \d+ - Address:')
+BSSID_PATTERN = re.compile(r'Address: ((?:[0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2})')
+SSID_PATTERN = re.compile(r'ESSID:"([^"]*)"')
+CHANNEL_PATTERN = re.compile(r'Channel (\d+)')
+SIGNAL_PATTERN = re.compile(r'Signal level=(-?\d+) dBm')
+QUALITY_PATTERN = re.compile(r'Quality=(\d+/\d+)')
+PROTOCOL_PATTERN = re.compile(r'Protocol:(IEEE 802\.11[a-z]*)')
+
 class WiFiNetwork(BaseModel):
     """Wi-Fi network information model."""
     
@@ -24,21 +40,71 @@ class WiFiNetwork(BaseModel):
     authentication: Optional[str] = Field(default=None, description="Authentication method")
     mode: str = Field(default="Master", description="AP mode")
     protocol: str = Field(default="IEEE 802.11", description="Protocol version")
+    radio: Optional[str] = Field(default=None, description="Interface that heard the AP best (multi-radio scans)")
     
     @validator('bssid')
     def validate_bssid(cls, v):
         """Validate MAC address format."""
-        mac_pattern = r'^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$'
-        if not re.match(mac_pattern, v):
+        if not MAC_PATTERN.match(v):
             raise ValueError('Invalid MAC address format')
         return v.upper().replace('-', ':')
     
     @validator('signal_level')
     def validate_signal_level(cls, v):
         """Validate signal level range."""
-        if v > 0 or v < -100:
-            logger.warning(f"Unusual signal level: {v} dBm")
+        _check_signal_level(v)
         return v
+    
+    @classmethod
+    def trusted(cls, bssid: str, ssid: str, channel: int, frequency: float, signal_level: int,
+                quality: str, encryption: str = "Open", cipher: Optional[str] = None,
+                authentication: Optional[str] = None, mode: str = "Master",
+                protocol: str = "IEEE 802.11", radio: Optional[str] = None) -> "WiFiNetwork":
+        """Build a network from well-formed parser output, skipping validation.
+        
+        The caller guarantees the field types and an upper-case, colon
+        separated BSSID. Externally supplied data must go through the normal
+        constructor so the validators run.
+        """
+        return cls.trusted_many([(bssid, ssid, channel, frequency, signal_level, quality, encryption,
+                                  cipher, authentication, mode, protocol, radio)])[0]
+    
+    @classmethod
+    def trusted_many(cls, rows: Iterable[Tuple[Any, ...]]) -> List["WiFiNetwork"]:
+        """Build networks from rows of field values in declaration order, skipping validation.
+        
+        Same contract as ``trusted``, for bulk decoding. Every network shares
+        one fields-set (all fields are always set, so pydantic's own
+        ``add`` on assignment is a no-op) and gets its ``__dict__`` straight
+        from ``zip``: the per-network cost is one dict and the object itself.
+        """
+        networks = []
+        append = networks.append
+        for row in rows:
+            _check_signal_level(row[4])
+            network = _new_model(cls)
+            _set_model_attr(network, '__dict__', dict(zip(_NETWORK_FIELD_NAMES, row)))
+            _set_model_attr(network, '__pydantic_fields_set__', _ALL_FIELDS_SET)
+            _set_model_attr(network, '__pydantic_extra__', None)
+            _set_model_attr(network, '__pydantic_private__', None)
+            append(network)
+        return networks
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Field values as a plain dict; a fast equivalent of ``model_dump()``."""
+        return dict(self.__dict__)
+
+
+_NETWORK_FIELD_NAMES = tuple(WiFiNetwork.model_fields)
+_ALL_FIELDS_SET = set(_NETWORK_FIELD_NAMES)
+_new_model = object.__new__
+_set_model_attr = object.__setattr__
+
+
+def _check_signal_level(signal_level: int) -> None:
+    """Warn about signal levels outside the usual dBm range."""
+    if signal_level > 0 or signal_level < -100:
+        logger.warning(f"Unusual signal level: {signal_level} dBm")
 
 class ScanResult(BaseModel):
     """Complete scan result model."""
@@ -48,10 +114,87 @@ class ScanResult(BaseModel):
     networks: List[WiFiNetwork] = Field(default_factory=list)
     total_networks: int = Field(default=0)
     scan_duration: Optional[float] = Field(default=None, description="Scan duration in seconds")
+    source: Optional[str] = Field(default=None, description="Capture file the scan was loaded from")
+    interface_timings: Dict[str, float] = Field(default_factory=dict,
+                                                description="Scan seconds per interface (multi-radio scans)")
+    cache_age: Optional[float] = Field(default=None,
+                                       description="Age in seconds when served from the scan cache")
     
     def __init__(self, **data):
         super().__init__(**data)
         self.total_networks = len(self.networks)
+    
+    def to_bytes(self) -> bytes:
+        """Compact binary encoding for shipping scans between hosts (see ``xwirless.binary``)."""
+        from .binary import encode_scan_result
+        return encode_scan_result(self)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ScanResult":
+        """Decode a scan result produced by ``to_bytes``; raises ValueError on malformed data."""
+        from .binary import decode_scan_result
+        return decode_scan_result(data)
+
+
+def merge_scan_results(scan_results: List[ScanResult]) -> ScanResult:
+    """Merge scans taken on several radios into one result.
+    
+    Each BSSID is kept once, as reported by the radio that heard it with the
+    strongest signal, and its ``radio`` field names that interface. The
+    merge counts as cached, aged like its oldest part, only when every part
+    came from the scan cache.
+    """
+    best: Dict[str, WiFiNetwork] = {}
+    timings: Dict[str, float] = {}
+    for scan_result in scan_results:
+        timings[scan_result.interface] = scan_result.scan_duration or 0.0
+        for network in scan_result.networks:
+            key = network.bssid.upper()
+            current = best.get(key)
+            if current is None or network.signal_level > current.signal_level:
+                best[key] = network.model_copy(update={"radio": network.radio or scan_result.interface})
+    
+    return ScanResult(
+        timestamp=min(scan_result.timestamp for scan_result in scan_results),
+        interface=",".join(scan_result.interface for scan_result in scan_results),
+        networks=list(best.values()),
+        interface_timings=timings,
+        cache_age=(max(scan_result.cache_age for scan_result in scan_results)
+                   if all(scan_result.cache_age is not None for scan_result in scan_results) else None)
+    )
+
+class CellSplitter:
+    """Incrementally split ``iwlist`` output lines into cell blocks.
+    
+    Lines are pushed with ``feed``, which returns the previous cell once a
+    new "Cell XX - Address:" header arrives; ``flush`` returns the last one.
+    """
+    
+    def __init__(self):
+        self.lines: List[str] = []
+    
+    def feed(self, line: Union[str, bytes]) -> Optional[str]:
+        """Add one line; return a completed cell, if any."""
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        header = CELL_HEADER_PATTERN.search(line) if "Cell " in line else None
+        if header:
+            cell = None
+            if self.lines:
+                self.lines.append(line[:header.start()])
+                cell = "".join(self.lines)
+            self.lines = [line[header.start():]]
+            return cell
+        if self.lines:
+            self.lines.append(line)
+        return None
+    
+    def flush(self) -> Optional[str]:
+        """Return the cell still being collected, if any."""
+        cell = "".join(self.lines) if self.lines else None
+        self.lines = []
+        return cell
+
 
 class WiFiParser:
     """Parser for iwlist scan output."""
@@ -64,9 +207,8 @@ class WiFiParser:
         logger.info("Parsing scan output...")
         
         networks = []
-        cells = self._split_cells(output)
         
-        for cell in cells:
+        for cell in self._iter_cells(output):
             try:
                 network = self._parse_cell(cell)
                 if network:
@@ -83,52 +225,101 @@ class WiFiParser:
             timestamp=datetime.utcnow()
         )
     
-    def _split_cells(self, output: str) -> List[str]:
-        """Split output into individual cell blocks."""
-        # Split by "Cell XX - Address:"
-        pattern = r'Cell \d+ - Address:'
-        cells = re.split(pattern, output)
-        
-        # Remove empty first element and reconstruct cells
-        if cells and not cells[0].strip():
-            cells = cells[1:]
+    def parse_scan_stream(self, stream: Iterable[Union[str, bytes]], interface: str) -> ScanResult:
+        """Parse scan output from a file object or pipe without reading it whole."""
+        logger.info("Parsing scan stream...")
+        networks = list(self.iter_networks(stream))
+        logger.info(f"Parsed {len(networks)} networks")
         
-        # Reconstruct cell blocks
-        reconstructed_cells = []
-        cell_addresses = re.findall(pattern, output)
+        return ScanResult(
+            interface=interface,
+            networks=networks,
+            timestamp=datetime.utcnow()
+        )
+    
+    def iter_networks(self, stream: Iterable[Union[str, bytes]]) -> Iterator[WiFiNetwork]:
+        """Yield networks from a line iterable as soon as each cell completes.
         
-        for i, cell_content in enumerate(cells):
-            if i < len(cell_addresses):
-                reconstructed_cells.append(cell_addresses[i] + cell_content)
+        ``stream`` may be an open file, ``sys.stdin``, a subprocess stdout
+        pipe (text or binary) or any iterable of lines. Only the current
+        cell is held in memory, so captures of any size parse in constant
+        memory.
+        """
+        for cell in self._iter_stream_cells(stream):
+            try:
+                network = self._parse_cell(cell)
+                if network:
+                    yield network
+            except Exception as e:
+                logger.warning(f"Failed to parse cell: {e}")
+                continue
+    
+    def _iter_stream_cells(self, stream: Iterable[Union[str, bytes]]) -> Iterator[str]:
+        """Yield cell blocks from a line iterable, one cell at a time."""
+        splitter = CellSplitter()
+        for line in stream:
+            cell = splitter.feed(line)
+            if cell is not None:
+                yield cell
+        cell = splitter.flush()
+        if cell is not None:
+            yield cell
+    
+    async def aiter_networks(self, stream: AsyncIterable[Union[str, bytes]]) -> AsyncIterator[WiFiNetwork]:
+        """Async counterpart of ``iter_networks``, e.g. for an asyncio subprocess stdout."""
+        splitter = CellSplitter()
+        async for line in stream:
+            cell = splitter.feed(line)
+            if cell is not None:
+                network = self._parse_cell(cell)
+                if network:
+                    yield network
+        cell = splitter.flush()
+        if cell is not None:
+            network = self._parse_cell(cell)
+            if network:
+                yield network
+    
+    def _split_cells(self, output: str) -> List[str]:
+        """Split output into individual cell blocks."""
+        return list(self._iter_cells(output))
         
-        return reconstructed_cells
+    def _iter_cells(self, output: str) -> Iterator[str]:
+        """Yield cell blocks, locating each "Cell XX - Address:" header once."""
+        starts = [match.start() for match in CELL_HEADER_PATTERN.finditer(output)]
+        starts.append(len(output))
+        for start, end in zip(starts, starts[1:]):
+            yield output[start:end]
     
     def _parse_cell(self, cell: str) -> Optional[WiFiNetwork]:
-        """Parse individual cell data."""
+        """Parse individual cell data.
+        
+        Each field is one search over the cell with a precompiled pattern
+        that starts with a literal; this is not a single pass over the cell.
+        """
         try:
             # Extract BSSID
-            bssid_match = re.search(r'Address: ([0-9A-Fa-f:]{17})', cell)
+            bssid_match = BSSID_PATTERN.search(cell)
             if not bssid_match:
                 return None
-            bssid = bssid_match.group(1)
+            bssid = bssid_match.group(1).upper()
             
             # Extract SSID
-            ssid_match = re.search(r'ESSID:"([^"]*)"', cell)
+            ssid_match = SSID_PATTERN.search(cell)
             ssid = ssid_match.group(1) if ssid_match else "Hidden"
             
             # Extract channel and frequency
-            channel_match = re.search(r'Channel (\d+)', cell)
+            channel_match = CHANNEL_PATTERN.search(cell)
             channel = int(channel_match.group(1)) if channel_match else 0
             
-            freq_match = re.search(r'(\d+\.\d+) GHz', cell)
-            frequency = float(freq_match.group(1)) if freq_match else 0.0
+            frequency = _find_frequency(cell)
             
             # Extract signal level
-            signal_match = re.search(r'Signal level=(-?\d+) dBm', cell)
+            signal_match = SIGNAL_PATTERN.search(cell)
             signal_level = int(signal_match.group(1)) if signal_match else -100
             
             # Extract quality
-            quality_match = re.search(r'Quality=(\d+/\d+)', cell)
+            quality_match = QUALITY_PATTERN.search(cell)
             quality = quality_match.group(1) if quality_match else "0/70"
             
             # Determine encryption
@@ -143,8 +334,6 @@ class WiFiParser:
                     encryption = "WPA"
                 elif "WEP" in cell:
                     encryption = "WEP"
-                elif "WPA3" in cell:
-                    encryption = "WPA3"
                 
                 # Extract cipher information
                 if "CCMP" in cell:
@@ -159,10 +348,10 @@ class WiFiParser:
                     authentication = "EAP"
             
             # Extract protocol
-            protocol_match = re.search(r'Protocol:(IEEE 802\.11[a-z]*)', cell)
+            protocol_match = PROTOCOL_PATTERN.search(cell)
             protocol = protocol_match.group(1) if protocol_match else "IEEE 802.11"
             
-            return WiFiNetwork(
+            return WiFiNetwork.trusted(
                 bssid=bssid,
                 ssid=ssid,
                 channel=channel,
@@ -178,4 +367,307 @@ class WiFiParser:
             
         except Exception as e:
             logger.error(f"Error parsing cell: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+def _find_frequency(cell: str) -> float:
+    """Return the first ``<digits>.<digits> GHz`` value in a cell.
+    
+    Equivalent to searching for ``(\\d+\\.\\d+) GHz`` but anchored on the
+    literal " GHz", which is much cheaper than a pattern starting with a
+    digit class.
+    """
+    pos = cell.find(" GHz")
+    while pos != -1:
+        start = pos
+        while start > 0 and cell[start - 1].isdecimal():
+            start -= 1
+        if start < pos and start > 0 and cell[start - 1] == ".":
+            begin = start - 1
+            while begin > 0 and cell[begin - 1].isdecimal():
+                begin -= 1
+            if begin < start - 1:
+                return float(cell[begin:pos])
+        pos = cell.find(" GHz", pos + 1)
+    return 0.0
+
+
+def frequency_to_channel(frequency_mhz: float) -> int:
+    """Channel number for a centre frequency in MHz."""
+    frequency_mhz = int(frequency_mhz)
+    if frequency_mhz == 2484:
+        return 14
+    if 2407 < frequency_mhz < 2484:
+        return (frequency_mhz - 2407) // 5
+    if 5950 < frequency_mhz <= 7125:
+        return (frequency_mhz - 5950) // 5
+    if 4910 <= frequency_mhz <= 5895:
+        return (frequency_mhz - 5000) // 5
+    return 0
+
+
+def quality_from_signal(signal_level: int) -> str:
+    """iwlist-style quality (out of 70) for a signal level in dBm."""
+    return f"{min(70, max(0, signal_level + 110))}/70"
+
+
+def classify_security(rsn: Optional[Tuple[List[str], List[str]]],
+                      wpa: Optional[Tuple[List[str], List[str]]],
+                      privacy: bool) -> Tuple[str, Optional[str], Optional[str]]:
+    """Return (encryption, cipher, authentication) from decoded security elements.
+    
+    ``rsn`` and ``wpa`` are (ciphers, authentication suites) from the RSN and
+    WPA elements, using the names CCMP/GCMP/TKIP and PSK/EAP/SAE. Follows
+    the iwlist parser's classification, plus WPA3 for SAE-only RSN.
+    """
+    suites = rsn or wpa
+    if suites:
+        ciphers, akms = suites
+        if rsn:
+            encryption = "WPA3" if akms and set(akms) == {"SAE"} else "WPA2"
+        else:
+            encryption = "WPA"
+        cipher = next((name for name in ("CCMP", "GCMP", "TKIP") if name in ciphers), None)
+        authentication = next((name for name in ("PSK", "EAP", "SAE") if name in akms), None)
+        return encryption, cipher, authentication
+    if privacy:
+        return "WEP", None, None
+    return "Open", None, None
+
+
+def protocol_label(frequency_mhz: float, ht: bool = False, vht: bool = False, he: bool = False) -> str:
+    """iwlist-style protocol string such as ``IEEE 802.11bgn``."""
+    protocol = "IEEE 802.11" + ("a" if frequency_mhz >= 4900 else "bg")
+    for supported, suffix in ((ht, "n"), (vht, "ac"), (he, "ax")):
+        if supported:
+            protocol += suffix
+    return protocol
+
+
+class _LineFormatParser(ABC):
+    """Base class for the parsers of non-iwlist scan tools."""
+    
+    name = ""
+    
+    @abstractmethod
+    def parse_networks(self, output: str) -> List[WiFiNetwork]:
+        """Parse tool output into networks."""
+    
+    def parse_scan_output(self, output: str, interface: str) -> ScanResult:
+        """Parse tool output into structured data."""
+        networks = self.parse_networks(output)
+        logger.info(f"Parsed {len(networks)} networks from {self.name} output")
+        
+        return ScanResult(
+            interface=interface,
+            networks=networks,
+            timestamp=datetime.utcnow()
+        )
+
+
+IW_BSS_PATTERN = re.compile(r'^BSS ([0-9A-Fa-f:]{17})', re.MULTILINE)
+IW_FREQ_PATTERN = re.compile(r'^\s+freq: (\d+(?:\.\d+)?)', re.MULTILINE)
+IW_SIGNAL_PATTERN = re.compile(r'^\s+signal: (-?\d+(?:\.\d+)?) dBm', re.MULTILINE)
+IW_SSID_PATTERN = re.compile(r'^\s+SSID: ?(.*)$', re.MULTILINE)
+IW_CAPABILITY_PATTERN = re.compile(r'^\s+capability: (.*)$', re.MULTILINE)
+IW_CHANNEL_PATTERN = re.compile(r'(?:DS Parameter set: channel|\* primary channel:) (\d+)')
+IW_SECTION_PATTERN = re.compile(r'^\s+(RSN|WPA):(.*?)(?=^\s+[A-Za-z][^:\n]*:|\Z)', re.MULTILINE | re.DOTALL)
+IW_SUITES_PATTERN = re.compile(r'\* (Group cipher|Pairwise ciphers|Authentication suites): (.*)')
+IW_AKM_PATTERN = re.compile(r'(?:FT/)?IEEE 802\.1X(?:/SHA-256)?|\S+')
+IW_AKM_NAMES = {"PSK": "PSK", "PSK/SHA-256": "PSK", "FT/PSK": "PSK", "IEEE 802.1X": "EAP",
+                "IEEE 802.1X/SHA-256": "EAP", "FT/IEEE 802.1X": "EAP", "SAE": "SAE", "FT/SAE": "SAE"}
+
+
+class IwScanParser(_LineFormatParser):
+    """Parser for ``iw dev <iface> scan dump`` output."""
+    
+    name = "iw"
+    
+    def parse_networks(self, output: str) -> List[WiFiNetwork]:
+        """Parse iw scan output into networks."""
+        networks = []
+        headers = list(IW_BSS_PATTERN.finditer(output))
+        for header, following in zip(headers, headers[1:] + [None]):
+            block = output[header.start():following.start() if following else len(output)]
+            try:
+                networks.append(self._parse_block(header.group(1), block))
+            except Exception as e:
+                logger.warning(f"Failed to parse iw BSS {header.group(1)}: {e}")
+        return networks
+    
+    def _parse_block(self, bssid: str, block: str) -> WiFiNetwork:
+        """Parse one ``BSS`` block."""
+        freq_match = IW_FREQ_PATTERN.search(block)
+        frequency_mhz = float(freq_match.group(1)) if freq_match else 0.0
+        channel_match = IW_CHANNEL_PATTERN.search(block)
+        signal_match = IW_SIGNAL_PATTERN.search(block)
+        signal_level = round(float(signal_match.group(1))) if signal_match else -100
+        ssid_match = IW_SSID_PATTERN.search(block)
+        capability_match = IW_CAPABILITY_PATTERN.search(block)
+        capability = capability_match.group(1) if capability_match else ""
+        
+        sections = {}
+        for section in IW_SECTION_PATTERN.finditer(block):
+            ciphers: List[str] = []
+            akms: List[str] = []
+            for field, values in IW_SUITES_PATTERN.findall(section.group(2)):
+                if field == "Authentication suites":
+                    akms.extend(IW_AKM_NAMES.get(value, value) for value in IW_AKM_PATTERN.findall(values))
+                else:
+                    ciphers.extend(values.split())
+            sections[section.group(1)] = (ciphers, akms)
+        encryption, cipher, authentication = classify_security(
+            sections.get("RSN"), sections.get("WPA"), "Privacy" in capability
+        )
+        
+        return WiFiNetwork(
+            bssid=bssid,
+            ssid=ssid_match.group(1) if ssid_match else "Hidden",
+            channel=int(channel_match.group(1)) if channel_match else frequency_to_channel(frequency_mhz),
+            frequency=round(frequency_mhz / 1000, 3),
+            signal_level=signal_level,
+            quality=quality_from_signal(signal_level),
+            encryption=encryption,
+            cipher=cipher,
+            authentication=authentication,
+            mode="Ad-Hoc" if "IBSS" in capability.split() else "Master",
+            protocol=protocol_label(frequency_mhz, "HT capabilities:" in block,
+                                    "VHT capabilities:" in block, "HE capabilities:" in block)
+        )
+
+
+NMCLI_FIELDS = ("BSSID", "SSID", "MODE", "CHAN", "FREQ", "SIGNAL", "SECURITY")
+
+
+def split_terse(line: str) -> List[str]:
+    """Split an ``nmcli -t`` line on unescaped colons and unescape the fields."""
+    fields = []
+    current = []
+    escaped = False
+    for char in line:
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == ":":
+            fields.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    fields.append("".join(current))
+    return fields
+
+
+class NmcliParser(_LineFormatParser):
+    """Parser for ``nmcli -t -f BSSID,SSID,MODE,CHAN,FREQ,SIGNAL,SECURITY device wifi list``.
+    
+    NetworkManager reports signal as a 0-100 percentage; it is converted
+    back to dBm with the inverse of NetworkManager's own mapping. nmcli does
+    not report the cipher.
+    """
+    
+    name = "nmcli"
+    
+    def parse_networks(self, output: str) -> List[WiFiNetwork]:
+        """Parse nmcli terse output into networks."""
+        networks = []
+        for line in output.splitlines():
+            fields = split_terse(line)
+            if len(fields) != len(NMCLI_FIELDS):
+                continue
+            try:
+                networks.append(self._parse_fields(dict(zip(NMCLI_FIELDS, fields))))
+            except Exception as e:
+                logger.warning(f"Failed to parse nmcli line {line!r}: {e}")
+        return networks
+    
+    def _parse_fields(self, fields: Dict[str, str]) -> WiFiNetwork:
+        """Build a network from one nmcli row."""
+        frequency_mhz = float(fields["FREQ"].split()[0])
+        percent = int(fields["SIGNAL"])
+        signal_level = round(-40 - (100 - percent) * 0.6)
+        security = fields["SECURITY"].split()
+        
+        authentication = None
+        if "WPA2" in security or ("WPA3" in security and "WPA1" in security):
+            encryption = "WPA2"
+        elif "WPA3" in security:
+            encryption = "WPA3"
+            authentication = "SAE"
+        elif "WPA1" in security or "WPA" in security:
+            encryption = "WPA"
+        elif "WEP" in security:
+            encryption = "WEP"
+        else:
+            encryption = "Open"
+        if encryption in ("WPA", "WPA2"):
+            authentication = "EAP" if "802.1X" in security else "PSK"
+        
+        return WiFiNetwork(
+            bssid=fields["BSSID"],
+            ssid=fields["SSID"],
+            channel=int(fields["CHAN"]),
+            frequency=round(frequency_mhz / 1000, 3),
+            signal_level=signal_level,
+            quality=quality_from_signal(signal_level),
+            encryption=encryption,
+            authentication=authentication,
+            mode="Ad-Hoc" if fields["MODE"] == "Ad-Hoc" else "Master",
+            protocol=protocol_label(frequency_mhz)
+        )
+
+
+WPA_CLI_FLAG_PATTERN = re.compile(r'\[([^\]]*)\]')
+
+
+class WpaCliParser(_LineFormatParser):
+    """Parser for ``wpa_cli -i <iface> scan_results`` output."""
+    
+    name = "wpa_cli"
+    
+    def parse_networks(self, output: str) -> List[WiFiNetwork]:
+        """Parse wpa_cli scan results into networks."""
+        networks = []
+        for line in output.splitlines():
+            columns = line.split("\t")
+            if len(columns) < 4 or not MAC_PATTERN.match(columns[0]):
+                continue
+            try:
+                networks.append(self._parse_columns(columns))
+            except Exception as e:
+                logger.warning(f"Failed to parse wpa_cli line {line!r}: {e}")
+        return networks
+    
+    def _parse_columns(self, columns: List[str]) -> WiFiNetwork:
+        """Build a network from one tab-separated result row."""
+        frequency_mhz = float(columns[1])
+        signal_level = int(columns[2])
+        flags = WPA_CLI_FLAG_PATTERN.findall(columns[3])
+        
+        sections: Dict[str, Tuple[List[str], List[str]]] = {}
+        for flag in flags:
+            parts = flag.split("-")
+            if parts[0] in ("WPA", "WPA2", "RSN") and len(parts) >= 2:
+                key = "WPA" if parts[0] == "WPA" else "RSN"
+                akms = [{"EAP": "EAP", "PSK": "PSK", "SAE": "SAE"}.get(name, name)
+                        for name in parts[1].split("+")]
+                ciphers = parts[2].split("+") if len(parts) > 2 else []
+                sections[key] = (ciphers, akms)
+        encryption, cipher, authentication = classify_security(
+            sections.get("RSN"), sections.get("WPA"), "WEP" in flags
+        )
+        
+        return WiFiNetwork(
+            bssid=columns[0],
+            ssid=columns[4] if len(columns) > 4 else "Hidden",
+            channel=frequency_to_channel(frequency_mhz),
+            frequency=round(frequency_mhz / 1000, 3),
+            signal_level=signal_level,
+            quality=quality_from_signal(signal_level),
+            encryption=encryption,
+            cipher=cipher,
+            authentication=authentication,
+            mode="Ad-Hoc" if "IBSS" in flags else "Master",
+            protocol=protocol_label(frequency_mhz)
+        )
@@ -11,6 +11,7 @@ from pathlib import Path
 import requests
 
 from .parser import ScanResult, WiFiNetwork
+from .history import signal_series
 from .utils import get_version_info
 
 logger = logging.getLogger(__name__)
@@ -32,8 +33,12 @@ class ReportGenerator:
                 "total_networks": scan_result.total_networks,
                 "scan_duration": scan_result.scan_duration
             },
-            "networks": [network.dict() for network in scan_result.networks]
+            "networks": [network.to_dict() for network in scan_result.networks]
         }
+        if scan_result.interface_timings:
+            report_data["scan_info"]["interface_timings"] = scan_result.interface_timings
+        if scan_result.cache_age is not None:
+            report_data["scan_info"]["cache_age"] = scan_result.cache_age
         
         json_output = json.dumps(report_data, indent=2, ensure_ascii=False)
         
@@ -64,6 +69,8 @@ class ReportGenerator:
         md_lines.append(f"- **Total Networks**: {scan_result.total_networks}")
         if scan_result.scan_duration:
             md_lines.append(f"- **Scan Duration**: {scan_result.scan_duration:.2f} seconds")
+        if scan_result.cache_age is not None:
+            md_lines.append(f"- **Cached**: yes, {scan_result.cache_age:.1f} seconds old")
         md_lines.append(f"- **Tool Version**: {self.version_info['version']}")
         md_lines.append("")
         
@@ -141,6 +148,37 @@ class ReportGenerator:
         
         return csv_output
     
+    def generate_signal_history_csv(self, bssid: str, network_data: Dict[str, Any], output_file: Optional[str] = None) -> str:
+        """Generate CSV of a network's tiered signal history for plotting."""
+        import io
+        
+        output = io.StringIO()
+        writer = csv.writer(output)
+        
+        # Header
+        writer.writerow(["BSSID", "Timestamp", "Tier", "Mean", "Min", "Max", "Count"])
+        
+        # Data rows, oldest first: daily buckets, hourly buckets, raw points
+        for point in signal_series(network_data):
+            writer.writerow([
+                bssid,
+                point["timestamp"],
+                point["tier"],
+                point["mean"],
+                point["min"],
+                point["max"],
+                point["count"]
+            ])
+        
+        csv_output = output.getvalue()
+        output.close()
+        
+        if output_file:
+            Path(output_file).write_text(csv_output, encoding='utf-8')
+            logger.info(f"Signal history CSV saved to: {output_file}")
+        
+        return csv_output
+    
     def upload_to_gist(self, content: str, filename: str, token: str, description: str = "X WIRELESS Scan Report") -> Optional[str]:
         """Upload report to GitHub Gist."""
         try:
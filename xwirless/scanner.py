@@ -2,71 +2,145 @@
 Wi-Fi scanner module using system tools.
 """
 
+import os
 import subprocess
 import logging
-from typing import List, Optional, Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, TextIO, Tuple
 from pathlib import Path
 
+from .backends import available_backends, get_backend
+from .cache import ScanCache
+from .parser import ScanResult, WiFiParser, merge_scan_results
+
 logger = logging.getLogger(__name__)
 
+SYSFS_NET = Path("/sys/class/net")
+
+
+def list_wireless_interfaces(sysfs_root: Path = SYSFS_NET) -> List[str]:
+    """List wireless interfaces from sysfs, interfaces that are up first.
+    
+    A network device is wireless when its sysfs entry has a ``wireless``
+    directory or a ``phy80211`` link. No subprocess is started.
+    """
+    up, down = [], []
+    try:
+        names = sorted(os.listdir(sysfs_root))
+    except OSError:
+        return []
+    for name in names:
+        device = sysfs_root / name
+        if not (device / "wireless").exists() and not (device / "phy80211").exists():
+            continue
+        try:
+            operstate = (device / "operstate").read_text().strip()
+        except OSError:
+            operstate = "unknown"
+        (up if operstate == "up" else down).append(name)
+    return up + down
+
+
+def _interface_from_nmcli(output: str) -> Optional[str]:
+    """First connected Wi-Fi device in ``nmcli device status``."""
+    for line in output.split('\n'):
+        if 'wifi' in line.lower() and 'connected' in line.lower():
+            return line.split()[0]
+    return None
+
+
+def _interface_from_iwconfig(output: str) -> Optional[str]:
+    """First wireless interface listed by ``iwconfig``."""
+    for line in output.split('\n'):
+        if 'IEEE 802.11' in line:
+            return line.split()[0]
+    return None
+
+
+def _interface_from_ip_link(output: str) -> Optional[str]:
+    """First wlan/wifi device in ``ip link show``."""
+    for line in output.split('\n'):
+        if 'wlan' in line or 'wifi' in line:
+            return line.split(':')[1].strip().split(':')[0]
+    return None
+
+
+# Commands tried, in order, when sysfs has no wireless interface
+INTERFACE_PROBES = (
+    (["nmcli", "device", "status"], _interface_from_nmcli),
+    (["iwconfig"], _interface_from_iwconfig),
+    (["ip", "link", "show"], _interface_from_ip_link),
+)
+
 class WiFiScanner:
     """Wi-Fi scanner using safe system tools."""
     
-    def __init__(self, dry_run: bool = False):
+    def __init__(self, dry_run: bool = False, sysfs_root: Path = SYSFS_NET, backend: str = "auto",
+                 cache: Optional[ScanCache] = None):
         self.dry_run = dry_run
+        self.backend = backend
+        self.cache = cache
         self.interface = None
+        self.sysfs_root = Path(sysfs_root)
+        self._interface_cache: Optional[Tuple[Tuple[str, ...], str]] = None
     
     def detect_interface(self) -> Optional[str]:
-        """Auto-detect available wireless interface."""
+        """Auto-detect available wireless interface.
+        
+        Reads sysfs first and only falls back to nmcli/iwconfig/ip when that
+        finds nothing. A detected interface is cached until a network device
+        is added or removed; failing to find one is not cached, so an adapter
+        plugged in later is picked up.
+        """
         if self.dry_run:
             logger.info("DRY-RUN: Would detect wireless interface")
             return "wlan0"  # Mock interface for dry run
         
+        devices = self._network_devices()
+        if self._interface_cache is not None and self._interface_cache[0] == devices:
+            return self._interface_cache[1]
+        
+        wireless = list_wireless_interfaces(self.sysfs_root)
+        if wireless:
+            interface = wireless[0]
+            logger.info(f"Detected interface via sysfs: {interface}")
+        else:
+            interface = self._detect_interface_with_tools()
+        
+        if interface is not None and devices is not None:
+            self._interface_cache = (devices, interface)
+        return interface
+    
+    def invalidate_interface_cache(self) -> None:
+        """Forget the detected interface."""
+        self._interface_cache = None
+    
+    def _network_devices(self) -> Optional[Tuple[str, ...]]:
+        """Names of all network devices in sysfs, or None without sysfs."""
         try:
-            # Try nmcli first (NetworkManager)
-            result = subprocess.run(
-                ["nmcli", "device", "status"], 
-                capture_output=True, 
-                text=True, 
-                timeout=10
-            )
-            if result.returncode == 0:
-                for line in result.stdout.split('\n'):
-                    if 'wifi' in line.lower() and 'connected' in line.lower():
-                        interface = line.split()[0]
-                        logger.info(f"Detected interface via nmcli: {interface}")
-                        return interface
-            
-            # Fallback to iwconfig
-            result = subprocess.run(
-                ["iwconfig"], 
-                capture_output=True, 
-                text=True, 
-                timeout=10
-            )
-            if result.returncode == 0:
-                for line in result.stdout.split('\n'):
-                    if 'IEEE 802.11' in line:
-                        interface = line.split()[0]
-                        logger.info(f"Detected interface via iwconfig: {interface}")
-                        return interface
-            
-            # Fallback to ip link
-            result = subprocess.run(
-                ["ip", "link", "show"], 
-                capture_output=True, 
-                text=True, 
-                timeout=10
-            )
+            return tuple(sorted(os.listdir(self.sysfs_root)))
+        except OSError:
+            return None
+    
+    def _detect_interface_with_tools(self) -> Optional[str]:
+        """Detect a wireless interface with nmcli, iwconfig and ip."""
+        for command, extract in INTERFACE_PROBES:
+            try:
+                result = subprocess.run(
+                    command, 
+                    capture_output=True, 
+                    text=True, 
+                    timeout=10
+                )
+            except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+                logger.debug(f"Error detecting interface with {command[0]}: {e}")
+                continue
             if result.returncode == 0:
-                for line in result.stdout.split('\n'):
-                    if 'wlan' in line or 'wifi' in line:
-                        interface = line.split(':')[1].strip().split(':')[0]
-                        logger.info(f"Detected interface via ip link: {interface}")
-                        return interface
-                        
-        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-            logger.error(f"Error detecting interface: {e}")
+                interface = extract(result.stdout)
+                if interface:
+                    logger.info(f"Detected interface via {command[0]}: {interface}")
+                    return interface
         
         return None
     
@@ -107,6 +181,103 @@ class WiFiScanner:
             logger.error("iwlist not found - install wireless-tools")
             raise RuntimeError("iwlist command not available")
     
+    def scan(self, interface: Optional[str] = None, backend: Optional[str] = None) -> ScanResult:
+        """Scan with a registered backend and return parsed results.
+        
+        With ``backend`` "auto" (the default) the available backends are
+        tried cheapest first and the first one that finds networks is used;
+        an empty cache read falls through to a backend that scans.
+        """
+        if not interface:
+            interface = self.detect_interface()
+        
+        if not interface:
+            raise RuntimeError("No wireless interface detected")
+        
+        self.interface = interface
+        return self._scan_interface(interface, backend or self.backend)
+    
+    def resolve_interfaces(self, spec: str) -> List[str]:
+        """Expand an interface argument: one name, a comma separated list or "all".
+        
+        The list is empty when "all" finds no wireless device.
+        """
+        if spec != "all":
+            return [name.strip() for name in spec.split(",") if name.strip()]
+        if self.dry_run:
+            return ["wlan0"]
+        return list_wireless_interfaces(self.sysfs_root)
+    
+    def scan_interfaces(self, interfaces: List[str], backend: Optional[str] = None) -> ScanResult:
+        """Scan several radios concurrently and merge the results by BSSID.
+        
+        Each radio runs in its own thread, so the wall time is that of the
+        slowest one. Radios that fail are logged and left out; an error is
+        raised only when every radio fails.
+        """
+        if not interfaces:
+            raise RuntimeError("No wireless interface detected")
+        backend = backend or self.backend
+        
+        def timed_scan(interface: str) -> ScanResult:
+            start = time.perf_counter()
+            scan_result = self._scan_interface(interface, backend)
+            scan_result.scan_duration = time.perf_counter() - start
+            return scan_result
+        
+        start = time.perf_counter()
+        results = []
+        with ThreadPoolExecutor(max_workers=len(interfaces)) as pool:
+            futures = {pool.submit(timed_scan, interface): interface for interface in interfaces}
+            for future, interface in futures.items():
+                try:
+                    results.append(future.result())
+                except RuntimeError as e:
+                    logger.error(f"Scan failed on {interface}: {e}")
+        if not results:
+            raise RuntimeError(f"Scan failed on every interface: {', '.join(interfaces)}")
+        
+        merged = merge_scan_results(results)
+        merged.scan_duration = time.perf_counter() - start
+        self.interface = merged.interface
+        logger.info(f"Merged {merged.total_networks} networks from {len(results)} interfaces "
+                    f"in {merged.scan_duration:.2f}s")
+        return merged
+    
+    def _scan_interface(self, interface: str, backend: str) -> ScanResult:
+        """Scan one interface, served from the scan cache when one is set and fresh."""
+        if self.cache is not None and not self.dry_run:
+            return self.cache.get_or_scan(interface, lambda: self._run_backends(interface, backend))
+        return self._run_backends(interface, backend)
+    
+    def _run_backends(self, interface: str, backend: str) -> ScanResult:
+        """Scan one interface with the given backend (or "auto")."""
+        if self.dry_run:
+            logger.info(f"DRY-RUN: Would scan networks on {interface} ({backend} backend)")
+            return WiFiParser().parse_scan_output(self._get_mock_scan_output(), interface)
+        
+        if backend != "auto":
+            return get_backend(backend).scan(interface)
+        
+        candidates = available_backends()
+        if not candidates:
+            raise RuntimeError("No scan backend available - install iw or wireless-tools")
+        empty = None
+        for candidate in candidates:
+            try:
+                scan_result = candidate.scan(interface)
+            except (RuntimeError, OSError) as e:
+                logger.warning(f"{candidate.name} backend failed, trying the next one: {e}")
+                continue
+            if scan_result.networks:
+                return scan_result
+            # Cache readers (nl80211, iw dump) find nothing once the kernel has expired its BSS cache
+            logger.info(f"{candidate.name} backend found no networks, trying the next one")
+            empty = empty or scan_result
+        if empty is not None:
+            return empty
+        raise RuntimeError(f"All scan backends failed on {interface}")
+    
     def scan_from_file(self, file_path: str) -> str:
         """Load scan data from file (sandbox mode)."""
         path = Path(file_path)
@@ -116,6 +287,15 @@ class WiFiScanner:
         logger.info(f"Loading scan data from file: {file_path}")
         return path.read_text(encoding='utf-8')
     
+    def open_scan_file(self, file_path: str) -> TextIO:
+        """Open a scan capture for line-by-line parsing (sandbox mode)."""
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Sample file not found: {file_path}")
+        
+        logger.info(f"Streaming scan data from file: {file_path}")
+        return open(path, encoding='utf-8', errors='replace')
+    
     def _get_mock_scan_output(self) -> str:
         """Return mock scan output for dry-run mode."""
         return """
@@ -0,0 +1,151 @@
+"""
+Adaptive scan scheduling.
+
+``AdaptiveScheduler`` decides how long to wait before the next scan of an
+interface. It tracks per-interface latency, failure rate and BSSID churn,
+backs off exponentially (with jitter) while the radio is busy or timing
+out, scans more often while networks appear and disappear, and relaxes
+back to the base interval when things are quiet. Every decision is kept as
+metrics so the trade-off between freshness and radio load can be tuned.
+"""
+
+import errno
+import logging
+import os
+import random
+from typing import Dict, Iterable, Optional, Set
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+# Error text that means "try later" rather than "broken"
+BUSY_MARKERS = ("timeout", "timed out", os.strerror(errno.EBUSY).lower(), "ebusy")
+
+
+def is_busy_error(error: object) -> bool:
+    """Whether an error means the radio was busy (EBUSY or a scan timeout)."""
+    if isinstance(error, OSError) and error.errno == errno.EBUSY:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in BUSY_MARKERS)
+
+
+class InterfaceMetrics(BaseModel):
+    """Scheduling state and counters for one interface."""
+    
+    interface: str = Field(..., description="Network interface")
+    scans: int = Field(default=0, description="Successful scans")
+    failures: int = Field(default=0, description="Failed scans")
+    busy_failures: int = Field(default=0, description="Failures caused by EBUSY or timeouts")
+    consecutive_failures: int = Field(default=0, description="Busy failures since the last success")
+    latency: Optional[float] = Field(default=None, description="Smoothed scan latency in seconds")
+    failure_rate: float = Field(default=0.0, description="Smoothed failure rate (0-1)")
+    churn: float = Field(default=0.0, description="Smoothed share of BSSIDs that appeared or vanished")
+    interval: float = Field(..., description="Current interval before jitter and backoff")
+    next_delay: float = Field(..., description="Delay chosen for the next scan")
+    decision: str = Field(default="steady", description="Last decision: steady, faster, slower, backoff")
+
+
+class AdaptiveScheduler:
+    """Choose per-interface scan delays from latency, failures and churn."""
+    
+    def __init__(self, base_interval: float = 60.0, min_interval: float = 5.0,
+                 max_interval: float = 900.0, backoff_factor: float = 2.0, jitter: float = 0.1,
+                 churn_threshold: float = 0.2, max_duty_cycle: float = 0.5,
+                 smoothing: float = 0.3, rng: Optional[random.Random] = None):
+        if not min_interval <= base_interval <= max_interval:
+            raise ValueError("Intervals must satisfy min_interval <= base_interval <= max_interval")
+        if not 0 < max_duty_cycle <= 1:
+            raise ValueError("max_duty_cycle must be in (0, 1]")
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.churn_threshold = churn_threshold
+        self.max_duty_cycle = max_duty_cycle
+        self.smoothing = smoothing
+        self.rng = rng or random.Random()
+        self._metrics: Dict[str, InterfaceMetrics] = {}
+        self._last_bssids: Dict[str, Set[str]] = {}
+    
+    def metrics(self, interface: str) -> InterfaceMetrics:
+        """Metrics for one interface (created on first use)."""
+        if interface not in self._metrics:
+            self._metrics[interface] = InterfaceMetrics(
+                interface=interface, interval=self.base_interval, next_delay=self.base_interval
+            )
+        return self._metrics[interface]
+    
+    def snapshot(self) -> Dict[str, InterfaceMetrics]:
+        """Copies of the metrics of every interface seen so far."""
+        return {interface: metrics.model_copy() for interface, metrics in self._metrics.items()}
+    
+    def record_success(self, interface: str, latency: float, bssids: Iterable[str]) -> float:
+        """Record a completed scan and return the delay before the next one.
+        
+        High churn halves the interval (down to ``min_interval``); low churn
+        grows it back towards ``base_interval``. The interval never drops
+        below ``latency / max_duty_cycle``, which caps the share of time the
+        radio spends scanning.
+        """
+        metrics = self.metrics(interface)
+        metrics.scans += 1
+        metrics.consecutive_failures = 0
+        metrics.failure_rate = self._smooth(metrics.failure_rate, 0.0)
+        metrics.latency = latency if metrics.latency is None else self._smooth(metrics.latency, latency)
+        
+        current = {bssid.upper() for bssid in bssids}
+        previous = self._last_bssids.get(interface)
+        self._last_bssids[interface] = current
+        if previous is not None:
+            changed = len(current ^ previous) / max(1, len(current | previous))
+            metrics.churn = self._smooth(metrics.churn, changed)
+        
+        previous_interval = interval = metrics.interval
+        if metrics.churn > self.churn_threshold:
+            interval, decision = interval / 2, "faster"
+        elif metrics.churn < self.churn_threshold / 2 and interval < self.base_interval:
+            interval, decision = min(self.base_interval, interval * 1.5), "slower"
+        else:
+            decision = "steady"
+        floor = max(self.min_interval, metrics.latency / self.max_duty_cycle)
+        if interval < floor:
+            interval = floor
+        metrics.interval = min(self.max_interval, interval)
+        if metrics.interval == previous_interval:
+            decision = "steady"
+        return self._decide(metrics, metrics.interval, decision)
+    
+    def record_failure(self, interface: str, error: object) -> float:
+        """Record a failed scan and return the delay before the next attempt.
+        
+        EBUSY and timeouts back off exponentially (from at least one second)
+        up to ``max_interval``; other errors retry at the current interval.
+        """
+        metrics = self.metrics(interface)
+        metrics.failures += 1
+        metrics.failure_rate = self._smooth(metrics.failure_rate, 1.0)
+        if not is_busy_error(error):
+            return self._decide(metrics, metrics.interval, "steady")
+        
+        metrics.busy_failures += 1
+        metrics.consecutive_failures += 1
+        base = max(metrics.interval, self.min_interval, 1.0)
+        delay = base * self.backoff_factor ** metrics.consecutive_failures
+        return self._decide(metrics, min(self.max_interval, delay), "backoff")
+    
+    def _decide(self, metrics: InterfaceMetrics, delay: float, decision: str) -> float:
+        """Apply jitter, store the decision and return the delay."""
+        if self.jitter:
+            delay *= 1 + self.rng.uniform(-self.jitter, self.jitter)
+        metrics.next_delay = delay
+        metrics.decision = decision
+        logger.debug(f"{metrics.interface}: {decision}, next scan in {delay:.1f}s "
+                     f"(churn {metrics.churn:.2f}, failure rate {metrics.failure_rate:.2f})")
+        return delay
+    
+    def _smooth(self, average: float, value: float) -> float:
+        """Exponentially weighted moving average."""
+        return average + self.smoothing * (value - average)
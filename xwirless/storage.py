@@ -0,0 +1,539 @@
+"""
+Append-only segmented log storage for the inventory database.
+
+A log is a directory of numbered segment files. Each segment holds one JSON
+record per line; when a segment is full it is sealed by appending an index
+footer (record key -> byte offset) and a fixed-size trailer pointing at it.
+A separate checkpoint file, written in the same format, holds folded state so
+that loading does not have to replay the whole history.
+
+With ``compression`` set, the records of sealed segments and of the
+checkpoint are compressed once written, while their index footer and
+trailer stay plain after them, so a reader finds every record's offset
+without inflating anything. The active segment stays plain so appends
+never recompress history. Readers detect compressed files by their magic
+bytes; files compressed whole, footer included, by earlier versions are
+still read.
+
+Processes that write to the same log take turns through an exclusive lock
+on ``.lock`` in the log directory; readers do not lock, since records are
+only ever appended and sealed files are replaced atomically.
+"""
+
+import io
+import json
+import logging
+import mmap
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .compression import MAGIC_SIZE, check_codec, compress, decompress, detect_codec, file_codec
+from .utils import file_lock
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".seg"
+CHECKPOINT_NAME = "state.ckpt"
+LOCK_NAME = ".lock"
+TRAILER_MAGIC = b"XWLIDX"
+TRAILER_SIZE = len(TRAILER_MAGIC) + 18  # magic, space, 16 digits, newline
+
+
+def _encode_record(record_type: str, key: Optional[str], data: Any) -> bytes:
+    """Encode a single record as a compact JSON line."""
+    record = {"t": record_type, "k": key, "d": data}
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _encode_trailer(footer_offset: int) -> bytes:
+    """Encode the trailer that points at the index footer."""
+    return TRAILER_MAGIC + b" " + f"{footer_offset:016d}".encode("ascii") + b"\n"
+
+
+RefsFunc = Callable[[Dict[str, Any]], Iterable[str]]
+
+
+class _IndexBuilder:
+    """Accumulates the index footer of a segment.
+    
+    The footer maps each record type to ordered ``[key, offset]`` pairs (keys
+    are not required to be unique) and, when a ``refs`` function is given,
+    maps secondary references such as BSSIDs to the offsets of the records
+    that mention them.
+    """
+    
+    def __init__(self, refs: Optional[RefsFunc] = None):
+        self.refs = refs
+        self.index: Dict[str, Any] = {"count": 0, "keys": {}, "refs": {}}
+    
+    def add(self, offset: int, record: Dict[str, Any]) -> None:
+        """Register a record found at ``offset``."""
+        self.index["count"] += 1
+        key = record.get("k")
+        if key is None:
+            return
+        self.index["keys"].setdefault(record["t"], []).append([key, offset])
+        if self.refs is not None:
+            for ref in self.refs(record):
+                offsets = self.index["refs"].setdefault(ref, [])
+                if not offsets or offsets[-1] != offset:
+                    offsets.append(offset)
+
+
+def _sealed_content(body: bytes, index: Dict[str, Any], compression: Optional[str]) -> bytes:
+    """Records, index footer and trailer of a sealed file; a codec compresses only the records.
+    
+    Footer offsets are positions in the plain records; the trailer points
+    at the footer's position in the file, which follows the compressed ones.
+    """
+    body = compress(body, compression)
+    return body + _encode_record("index", None, index) + _encode_trailer(len(body))
+
+
+def _write_file(path: Path, content: bytes) -> None:
+    """Atomically replace a file with ``content``."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_sealed_file(path: Path, records: Iterable[Tuple[str, Optional[str], Any]],
+                      refs: Optional[RefsFunc] = None,
+                      compression: Optional[str] = None) -> Dict[str, Any]:
+    """Write records to a sealed segment file atomically and return its index."""
+    builder = _IndexBuilder(refs)
+    lines: List[bytes] = []
+    offset = 0
+    for record_type, key, data in records:
+        line = _encode_record(record_type, key, data)
+        builder.add(offset, {"t": record_type, "k": key, "d": data})
+        lines.append(line)
+        offset += len(line)
+    _write_file(path, _sealed_content(b"".join(lines), builder.index, compression))
+    return builder.index
+
+
+def _read_footer(f: BinaryIO, path: Path) -> Optional[Dict[str, Any]]:
+    """Index footer of an open segment, or None if it is not sealed.
+    
+    ``_footer_offset`` in the result is the footer's position in ``f``.
+    Files compressed whole have no readable footer until inflated.
+    """
+    try:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size < TRAILER_SIZE:
+            return None
+        f.seek(size - TRAILER_SIZE)
+        trailer = f.read(TRAILER_SIZE)
+        if not trailer.startswith(TRAILER_MAGIC):
+            return None
+        footer_offset = int(trailer[len(TRAILER_MAGIC) + 1:-1])
+        f.seek(footer_offset)
+        footer = json.loads(f.readline())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Unreadable segment footer in {path}: {e}")
+        return None
+    footer_data: Dict[str, Any] = footer["d"]
+    footer_data["_footer_offset"] = footer_offset
+    return footer_data
+
+
+def read_footer(path: Path) -> Optional[Dict[str, Any]]:
+    """Return the index footer of a sealed file, or None if it is not sealed.
+    
+    Compressed records are not inflated, except in files compressed whole.
+    """
+    try:
+        with open(path, "rb") as f:
+            codec = detect_codec(f.read(MAGIC_SIZE))
+            footer = _read_footer(f, path)
+        if footer is None and codec is not None:
+            with _open_records(path) as f:
+                footer = _read_footer(f, path)
+        return footer
+    except (OSError, ValueError) as e:
+        logger.warning(f"Unreadable segment {path}: {e}")
+        return None
+
+
+def _open_records(path: Path) -> BinaryIO:
+    """Open a segment or checkpoint in its plain layout, inflating compressed records."""
+    f = open(path, "rb")
+    if detect_codec(f.read(MAGIC_SIZE)) is None:
+        f.seek(0)
+        return f
+    with f:
+        footer = _read_footer(f, path)
+        f.seek(0)
+        if footer is None:  # Compressed whole
+            return io.BytesIO(decompress(f.read()))
+        body = decompress(f.read(footer["_footer_offset"]))
+        tail = f.read()
+    return io.BytesIO(body + tail[:-TRAILER_SIZE] + _encode_trailer(len(body)))
+
+
+def iter_file_records(path: Path, start: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (offset, record) pairs for every data record in a segment file."""
+    with _open_records(path) as f:
+        footer = _read_footer(f, path)
+        end = footer["_footer_offset"] if footer else None
+        f.seek(start)
+        offset = start
+        for line in f:
+            if end is not None and offset >= end:
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping corrupt record at {path}:{offset}")
+                offset += len(line)
+                continue
+            yield offset, record
+            offset += len(line)
+
+
+def read_record_at(path: Path, offset: int) -> Dict[str, Any]:
+    """Read the record starting at a byte offset."""
+    with _open_records(path) as f:
+        f.seek(offset)
+        return json.loads(f.readline())
+
+
+class SegmentLog:
+    """Directory of append-only JSON-lines segments with index footers.
+    
+    A writer tracks the active segment and its record count in memory.
+    When several processes write to the log, each write must happen inside
+    ``lock()`` after a ``refresh()``, which picks up what the others
+    appended meanwhile.
+    """
+    
+    def __init__(self, root: Path, segment_size: int = 256, refs: Optional[RefsFunc] = None,
+                 read_only: bool = False, compression: Optional[str] = None):
+        self.root = Path(root)
+        self.segment_size = segment_size
+        self.refs = refs
+        self.read_only = read_only
+        # Without an explicit codec, keep the one the existing checkpoint uses
+        self.compression = file_codec(self.checkpoint_path) if compression is None else check_codec(compression)
+        # Writers track the active segment from the last refresh() and their own appends
+        self._active: Optional[int] = None
+        self._active_count = 0
+        self._active_size = 0
+        if not read_only:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with self.lock():
+                self.refresh()
+    
+    @property
+    def checkpoint_path(self) -> Path:
+        """Path of the folded-state checkpoint file."""
+        return self.root / CHECKPOINT_NAME
+    
+    @property
+    def lock_path(self) -> Path:
+        """Path of the file writers lock while they change the log."""
+        return self.root / LOCK_NAME
+    
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold the exclusive writer lock of the log (not reentrant)."""
+        with file_lock(self.lock_path):
+            yield
+    
+    def refresh(self) -> bool:
+        """Re-read the active segment from disk; call with ``lock()`` held.
+        
+        Returns whether other writers appended to the log (or sealed its
+        active segment) since this handle last wrote to it or refreshed.
+        Only the first refresh lists the directory; later ones follow the
+        segments other writers sealed and compare the active segment's size.
+        """
+        if self._active is None:
+            active = self._find_active_number()
+        else:
+            active = self._active
+            while self.segment_path(active).exists() and self.is_sealed(active):
+                active += 1
+        path = self.segment_path(active)
+        size = path.stat().st_size if path.exists() else 0
+        if (active, size) == (self._active, self._active_size):
+            return False
+        self._active = active
+        self._active_count, self._active_size = self._recover_active_segment(active)
+        return True
+    
+    def segment_path(self, number: int) -> Path:
+        """Path of a numbered segment."""
+        return self.root / f"{number:08d}{SEGMENT_SUFFIX}"
+    
+    def segment_numbers(self) -> List[int]:
+        """Return all segment numbers in order."""
+        numbers = []
+        for path in self.root.glob(f"*{SEGMENT_SUFFIX}"):
+            try:
+                numbers.append(int(path.stem))
+            except ValueError:
+                continue
+        return sorted(numbers)
+    
+    def active_number(self) -> int:
+        """Number of the segment that receives appends."""
+        if self._active is not None:
+            return self._active
+        return self._find_active_number()
+    
+    def _find_active_number(self) -> int:
+        """Work out the active segment from the files on disk."""
+        numbers = self.segment_numbers()
+        if not numbers:
+            return 1
+        last = numbers[-1]
+        return last + 1 if self.is_sealed(last) else last
+    
+    def is_sealed(self, number: int) -> bool:
+        """Check whether a segment has an index footer."""
+        path = self.segment_path(number)
+        if file_codec(path) is not None:
+            return True  # Only sealed segments are compressed
+        return read_footer(path) is not None
+    
+    def _recover_active_segment(self, number: int) -> Tuple[int, int]:
+        """Drop a torn trailing write; return the active segment's record count and size."""
+        path = self.segment_path(number)
+        if not path.exists():
+            return 0, 0
+        with open(path, "rb+") as f:
+            content = f.read()
+            if content and not content.endswith(b"\n"):
+                keep = content.rfind(b"\n") + 1
+                logger.warning(f"Truncating torn write at {path}:{keep}")
+                f.truncate(keep)
+                content = content[:keep]
+        return content.count(b"\n"), len(content)
+    
+    def append(self, record_type: str, key: Optional[str], data: Any) -> Tuple[int, int]:
+        """Append a record to the active segment and return (segment, offset).
+        
+        The segment is sealed once it holds ``segment_size`` records.
+        """
+        number = self.active_number()
+        path = self.segment_path(number)
+        line = _encode_record(record_type, key, data)
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._active_count += 1
+        self._active_size = offset + len(line)
+        if self._active_count >= self.segment_size:
+            self.seal(number)
+        return number, offset
+    
+    def append_many(self, records: Iterable[Tuple[str, Optional[str], Any]]) -> List[Tuple[int, int]]:
+        """Append several records with one write and fsync per segment they land in."""
+        pending = list(records)
+        locations: List[Tuple[int, int]] = []
+        while pending:
+            number = self.active_number()
+            room = self.segment_size - self._active_count
+            if room <= 0:
+                # Full but unsealed: a writer stopped between its append and the seal
+                self.seal(number)
+                continue
+            chunk, pending = pending[:room], pending[room:]
+            with open(self.segment_path(number), "ab") as f:
+                offset = f.tell()
+                for record_type, key, data in chunk:
+                    line = _encode_record(record_type, key, data)
+                    f.write(line)
+                    locations.append((number, offset))
+                    offset += len(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._active_count += len(chunk)
+            self._active_size = offset
+            if self._active_count >= self.segment_size:
+                self.seal(number)
+        return locations
+    
+    def seal(self, number: Optional[int] = None) -> Optional[int]:
+        """Seal a segment by appending its index footer; returns its number.
+        
+        With compression the segment is instead replaced by its compressed
+        records followed by the footer.
+        """
+        if number is None:
+            number = self.active_number()
+        path = self.segment_path(number)
+        if not path.exists() or self.is_sealed(number):
+            return None
+        builder = _IndexBuilder(self.refs)
+        for offset, record in iter_file_records(path):
+            builder.add(offset, record)
+        if self.compression:
+            _write_file(path, _sealed_content(path.read_bytes(), builder.index, self.compression))
+        else:
+            with open(path, "ab") as f:
+                footer_offset = f.tell()
+                f.write(_encode_record("index", None, builder.index))
+                f.write(_encode_trailer(footer_offset))
+                f.flush()
+                os.fsync(f.fileno())
+        if number == self.active_number():
+            if self._active is not None:
+                self._active += 1
+            self._active_count = self._active_size = 0
+        logger.debug(f"Sealed segment {path}")
+        return number
+    
+    def write_segments(self, records: Iterable[Tuple[str, Optional[str], Any]]) -> List[int]:
+        """Bulk-write records into new sealed segments of ``segment_size``."""
+        self.seal()
+        number = self.active_number()
+        written: List[int] = []
+        batch: List[Tuple[str, Optional[str], Any]] = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.segment_size:
+                write_sealed_file(self.segment_path(number), batch, self.refs, self.compression)
+                written.append(number)
+                number += 1
+                batch = []
+        if batch:
+            write_sealed_file(self.segment_path(number), batch, self.refs, self.compression)
+            written.append(number)
+            number += 1
+        if self._active is not None:
+            self._active = number
+        self._active_count = self._active_size = 0
+        return written
+    
+    def iter_records(self, after: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (segment, record) for every record in segments after ``after``."""
+        for number in self.segment_numbers():
+            if number <= after:
+                continue
+            for _, record in iter_file_records(self.segment_path(number)):
+                yield number, record
+    
+    def read_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Load the checkpoint as {"meta": ..., "<type>": {key: data}}."""
+        if not self.checkpoint_path.exists():
+            return None
+        state: Dict[str, Any] = {}
+        for _, record in iter_file_records(self.checkpoint_path):
+            if record.get("k") is None:
+                state[record["t"]] = record["d"]
+            else:
+                state.setdefault(record["t"], {})[record["k"]] = record["d"]
+        return state
+    
+    def write_checkpoint(self, records: Iterable[Tuple[str, Optional[str], Any]]) -> None:
+        """Atomically replace the checkpoint file."""
+        write_sealed_file(self.checkpoint_path, records, compression=self.compression)
+        logger.debug(f"Checkpoint written to {self.checkpoint_path}")
+
+
+class MappedSegment:
+    """Read-only memory-mapped view of a segment or checkpoint file.
+    
+    Only the index footer is parsed when the file is opened; records are
+    decoded one at a time from their byte offsets. Compressed records cannot
+    be mapped: they are inflated into memory when a record is first read,
+    and ``release`` drops them again.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._map: Optional[Union[mmap.mmap, bytes]] = None
+        # Size of the compressed records, inflated on demand
+        self._compressed_size: Optional[int] = None
+        codec = detect_codec(self._file.read(MAGIC_SIZE))
+        self.footer = _read_footer(self._file, self.path)
+        if codec is not None and self.footer is not None:
+            self._compressed_size = self.footer["_footer_offset"]
+            self._end = 0
+        elif codec is not None:
+            # Compressed whole, footer included: inflated to reach the footer
+            self._file.seek(0)
+            self._map = decompress(self._file.read())
+            self.footer = _read_footer(io.BytesIO(self._map), self.path)
+            self._end = self.footer["_footer_offset"] if self.footer else len(self._map)
+        else:
+            size = os.fstat(self._file.fileno()).st_size
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+            self._end = self.footer["_footer_offset"] if self.footer else size
+    
+    @property
+    def sealed(self) -> bool:
+        """Whether the file carries an index footer."""
+        return self.footer is not None
+    
+    def keys(self, record_type: str) -> List[Tuple[str, int]]:
+        """Ordered (key, offset) pairs of a record type from the footer."""
+        if self.footer is None:
+            return [(record["k"], offset) for offset, record in self.records()
+                    if record["t"] == record_type]
+        return [(key, offset) for key, offset in self.footer["keys"].get(record_type, [])]
+    
+    def keys_offset(self, record_type: str) -> int:
+        """Offset of the first record of a type (keyed or not)."""
+        for _, offset in self.keys(record_type):
+            return offset
+        for offset, record in self.records():
+            if record["t"] == record_type:
+                return offset
+        raise KeyError(f"No {record_type} record in {self.path}")
+    
+    def _records(self) -> Optional[Union[mmap.mmap, bytes]]:
+        """The plain records, inflating compressed ones on first access."""
+        if self._map is None and self._compressed_size is not None:
+            self._file.seek(0)
+            self._map = decompress(self._file.read(self._compressed_size))
+            self._end = len(self._map)
+        return self._map
+    
+    def record_at(self, offset: int) -> Dict[str, Any]:
+        """Decode the record starting at ``offset``."""
+        data = self._records()
+        if data is None:
+            raise ValueError(f"Empty segment: {self.path}")
+        end = data.find(b"\n", offset)
+        return json.loads(data[offset:end if end != -1 else len(data)])
+    
+    def records(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (offset, record) for every data record."""
+        data = self._records()
+        if data is None:
+            return
+        end = self._end
+        offset = 0
+        while offset < end:
+            line_end = data.find(b"\n", offset, end)
+            if line_end == -1:
+                break
+            try:
+                yield offset, json.loads(data[offset:line_end])
+            except ValueError:
+                logger.warning(f"Skipping corrupt record at {self.path}:{offset}")
+            offset = line_end + 1
+    
+    def release(self) -> None:
+        """Drop inflated records; they are inflated again on the next access."""
+        if self._compressed_size is not None:
+            self._map = None
+    
+    def close(self) -> None:
+        """Release the mapping and file handle."""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
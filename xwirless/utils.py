@@ -5,11 +5,19 @@ Utility functions and helpers.
 import logging
 import logging.handlers
 import os
+import re
 import sys
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional, List, Union
+from datetime import datetime, timedelta
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 from . import __version__, __author__
 
 def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> None:
@@ -55,6 +63,15 @@ def format_timestamp(timestamp: datetime) -> str:
     """Format timestamp for display."""
     return timestamp.strftime("%Y-%m-%d %H:%M:%S UTC")
 
+def parse_time(value: str) -> datetime:
+    """Parse an ISO timestamp or a relative age such as ``30m``, ``24h`` or ``7d`` (UTC)."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhdw])", value.strip())
+    if match:
+        amount, unit = float(match.group(1)), match.group(2)
+        seconds = amount * {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}[unit]
+        return datetime.utcnow() - timedelta(seconds=seconds)
+    return datetime.fromisoformat(value)
+
 def format_signal_level(signal_level: int) -> str:
     """Format signal level with appropriate emoji."""
     if signal_level >= -30:
@@ -141,4 +158,47 @@ def get_system_info() -> Dict[str, Any]:
         "processor": platform.processor(),
         "python_version": platform.python_version(),
         "dependencies": check_dependencies()
-    }
\ No newline at end of file
+    }
+
+@contextmanager
+def file_lock(path: Union[str, Path], shared: bool = False) -> Iterator[None]:
+    """Hold an advisory lock on ``path`` (created if missing) shared between processes.
+    
+    Uses ``flock`` on POSIX; on Windows the lock is always exclusive. The
+    lock file is left in place: deleting it would let a process that opened
+    the old file and one that creates a new one both hold "the" lock.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as handle:
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+def atomic_write_text(path: Union[str, Path], text: str) -> None:
+    """Write a file so readers see either the old or the new content, never a partial one."""
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+def atomic_write_bytes(path: Union[str, Path], data: bytes) -> None:
+    """Binary counterpart of ``atomic_write_text``."""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()